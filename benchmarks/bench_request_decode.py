@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# benchmarks/bench_request_decode.py
+"""
+Compare full Pydantic validation of chat requests with the fast decoding path.
+
+Usage:
+    python benchmarks/bench_request_decode.py [--messages 2,20,200] [--rounds 2000] [--tools 8]
+"""
+
+import argparse
+import json
+import time
+
+from llm_wrapper.server.codec import JSON_CODEC, decode_chat_request
+from llm_wrapper.server.models import ChatCompletionRequest
+
+
+def build_body(messages: int, tools: int) -> bytes:
+    """A multi-turn request with tool definitions, tool calls and ~400-character turns."""
+    turns = [{"role": "system", "content": "You are a helpful network engineer. " * 10}]
+    for i in range(messages - 1):
+        if i % 10 == 5:
+            turns.append({"role": "assistant", "content": None, "tool_calls": [{
+                "id": f"call_{i}",
+                "type": "function",
+                "function": {"name": "lookup_route", "arguments": json.dumps({"prefix": "10.0.0.0/8"})},
+            }]})
+        else:
+            role = "user" if i % 2 == 0 else "assistant"
+            turns.append({"role": role, "content": f"Turn {i}: how does BGP pick a best path? " * 10})
+    schema = {
+        "type": "object",
+        "properties": {f"arg{j}": {"type": "string", "description": "An argument"} for j in range(6)},
+        "required": ["arg0"],
+    }
+    body = {
+        "model": "expert",
+        "messages": turns,
+        "tools": [
+            {"type": "function", "function": {"name": f"tool_{j}", "description": "A tool", "parameters": schema}}
+            for j in range(tools)
+        ],
+        "logit_bias": {str(token): -1.0 for token in range(50)},
+        "temperature": 0.7,
+        "max_tokens": 512,
+        "stream": True,
+        "user": "tenant-1",
+    }
+    return json.dumps(body).encode()
+
+
+def timed(label: str, decode, body: bytes, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        decode(body)
+    per_request_us = (time.perf_counter() - start) / rounds * 1e6
+    print(f"  {label:<22} {per_request_us:9.1f} µs/request")
+    return per_request_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", default="2,20,200", help="comma-separated message counts")
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument("--tools", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"fast path JSON codec: {JSON_CODEC}")
+    for count in (int(c) for c in args.messages.split(",")):
+        body = build_body(count, args.tools)
+        rounds = max(10, args.rounds * 2 // count)
+        print(f"{count} messages, {args.tools} tools, {len(body)} bytes, {rounds} rounds")
+        validated = timed("pydantic (json)", ChatCompletionRequest.model_validate_json, body, rounds)
+        # FastAPI decodes the body with the stdlib before validating it
+        fastapi = timed("fastapi body path", lambda b: ChatCompletionRequest(**json.loads(b)), body, rounds)
+        fast = timed("fast decode", decode_chat_request, body, rounds)
+        print(f"  speedup: {validated / fast:.1f}x vs pydantic json, {fastapi / fast:.1f}x vs fastapi body path")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# benchmarks/bench_sse.py
+"""
+Compare the parse/re-serialize SSE relay with the byte-level passthrough relay.
+
+Usage:
+    python benchmarks/bench_sse.py [--tokens 2000] [--rounds 20] [--read-size 4096]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from llm_wrapper.server.sse import ModelRewriter, relay_parsed, relay_passthrough
+
+
+def build_stream(tokens: int) -> bytes:
+    chunk = {
+        "id": "chatcmpl-bench",
+        "object": "chat.completion.chunk",
+        "created": 1700000000,
+        "model": "/models/bench",
+        "choices": [{"index": 0, "delta": {"content": " token"}, "finish_reason": None}],
+    }
+    events = [f"data: {json.dumps(chunk)}\n\n".encode() for _ in range(tokens)]
+    return b"".join(events) + b"data: [DONE]\n\n"
+
+
+class Content:
+    """Serves the stream as lines (parse path) or fixed-size reads (iter_any)."""
+
+    def __init__(self, body: bytes, read_size: int):
+        self._body = body
+        self._read_size = read_size
+
+    def __aiter__(self):
+        return self._lines()
+
+    async def _lines(self):
+        for line in self._body.splitlines(keepends=True):
+            yield line
+
+    async def _reads(self):
+        for i in range(0, len(self._body), self._read_size):
+            yield self._body[i:i + self._read_size]
+
+    def iter_any(self):
+        return self._reads()
+
+
+async def drain(agen) -> int:
+    count = 0
+    async for _ in agen:
+        count += 1
+    return count
+
+
+async def timed(label: str, make_relay, rounds: int, tokens: int):
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    for _ in range(rounds):
+        await drain(make_relay())
+    wall = time.perf_counter() - start_wall
+    cpu = time.process_time() - start_cpu
+    per_token_us = cpu / (rounds * tokens) * 1e6
+    print(f"{label:<28} wall={wall:7.3f}s cpu={cpu:7.3f}s  {per_token_us:6.2f} µs CPU/token")
+    return per_token_us
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--read-size", type=int, default=4096)
+    args = parser.parse_args()
+
+    body = build_stream(args.tokens)
+    rewrite = ModelRewriter("/models/bench", "expert")
+    print(f"{args.tokens} chunks x {args.rounds} rounds, {len(body)} bytes per stream")
+
+    parsed = await timed("parse + re-serialize", lambda: relay_parsed(Content(body, args.read_size)), args.rounds, args.tokens)
+    raw = await timed("passthrough", lambda: relay_passthrough(Content(body, args.read_size)), args.rounds, args.tokens)
+    rewritten = await timed("passthrough + model rewrite",
+                            lambda: relay_passthrough(Content(body, args.read_size), rewrite),
+                            args.rounds, args.tokens)
+    print(f"speedup: passthrough {parsed / raw:.1f}x, with rewrite {parsed / rewritten:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
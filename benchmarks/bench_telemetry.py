@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# benchmarks/bench_telemetry.py
+"""
+Measure the tracing overhead of the chat completion handler.
+
+Runs the non-streaming /v1/chat/completions handler against a canned upstream
+response with telemetry off, head-sampled and fully on. Spans go to a discarding
+exporter, so the numbers are the in-process cost without network export.
+
+Usage:
+    python benchmarks/bench_telemetry.py [--requests 20000] [--ratio 0.1]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("DISABLE_TELEMETRY", "true")
+
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor, SpanExporter, SpanExportResult
+
+import llm_wrapper.server.handlers.chat as chat_mod
+import llm_wrapper.server.main as main_mod
+from llm_wrapper.lib.telemetry.telemetry import build_sampler
+from llm_wrapper.server.models import ChatCompletionRequest, ChatCompletionResponse
+
+
+class DiscardExporter(SpanExporter):
+    def __init__(self):
+        self.spans = 0
+
+    def export(self, spans):
+        self.spans += len(spans)
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        pass
+
+
+RESPONSE = ChatCompletionResponse(
+    id="chatcmpl-bench",
+    object="chat.completion",
+    created=1700000000,
+    model="bench",
+    choices=[{"index": 0, "message": {"role": "assistant", "content": "token " * 200}, "finish_reason": "stop"}],
+    usage={"prompt_tokens": 10, "completion_tokens": 200, "total_tokens": 210},
+)
+
+REQUEST = ChatCompletionRequest(
+    model="bench",
+    messages=[{"role": "user", "content": "Summarize the benchmark results. " * 20}],
+)
+
+
+async def fake_call_completion(request, system_prompt):
+    return RESPONSE
+
+
+def tracer_for(ratio: float | None):
+    """None means telemetry off (a non-recording tracer)."""
+    if ratio is None:
+        return trace.NoOpTracer(), None
+    exporter = DiscardExporter()
+    provider = TracerProvider(sampler=build_sampler(ratio, {}))
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    return provider.get_tracer("bench"), exporter
+
+
+async def timed(label: str, ratio: float | None, requests: int) -> float:
+    tracer, exporter = tracer_for(ratio)
+    main_mod.tracer = tracer
+    chat_mod.tracer = tracer
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    for _ in range(requests):
+        await main_mod.chat_completion(REQUEST, "You are a benchmark.")
+    wall = time.perf_counter() - start_wall
+    cpu = time.process_time() - start_cpu
+    per_request_us = cpu / requests * 1e6
+    exported = exporter.spans if exporter else 0
+    print(f"{label:<24} wall={wall:7.3f}s cpu={cpu:7.3f}s  {per_request_us:7.2f} µs CPU/request  spans={exported}")
+    return per_request_us
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--ratio", type=float, default=0.1)
+    args = parser.parse_args()
+
+    main_mod.call_completion = fake_call_completion
+    print(f"{args.requests} non-streaming requests per mode")
+
+    off = await timed("telemetry off", None, args.requests)
+    sampled = await timed(f"sampled ({args.ratio:g})", args.ratio, args.requests)
+    full = await timed("fully on", 1.0, args.requests)
+    print(f"overhead vs off: sampled +{sampled - off:.2f} µs, fully on +{full - off:.2f} µs per request")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
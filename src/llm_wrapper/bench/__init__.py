@@ -0,0 +1 @@
+# Make bench a package
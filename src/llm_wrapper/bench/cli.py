@@ -0,0 +1,232 @@
+# src/bench/cli.py
+
+import asyncio
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import aiohttp
+import click
+import yaml
+from rich.console import Console
+from rich.table import Table
+
+from llm_wrapper.bench.loadgen import (
+    process_cpu_seconds,
+    request_body,
+    run_closed_loop,
+    run_open_loop,
+    send_request,
+    summarize,
+)
+from llm_wrapper.bench.mock_upstream import Distribution, MockSettings, free_port, serve_mock_upstream
+
+console = Console(stderr=True)
+
+HOST = "127.0.0.1"
+# Seconds to wait for the mock upstream and proxy to answer /health
+STARTUP_TIMEOUT = 30.0
+
+
+async def _wait_healthy(base_url: str, timeout: float = STARTUP_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            try:
+                async with session.get(f"{base_url}/health") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+    raise click.ClickException(f"{base_url} did not become healthy within {timeout:.0f}s")
+
+
+def _merge(base: dict, override: dict) -> dict:
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def _start_proxy(model: str, upstream_url: str, model_config: dict, workers: int, config_dir: str) -> tuple[subprocess.Popen, str]:
+    config = _merge({"model": {"path": "mock"}, "api": {"url": upstream_url}}, model_config)
+    Path(config_dir, f"{model}.yaml").write_text(yaml.safe_dump(config))
+    port = free_port(HOST)
+    env = {
+        **os.environ,
+        "HOST": HOST,
+        "PORT": str(port),
+        "WORKERS": str(workers),
+        "LLM_CONFIG_DIR": config_dir,
+        "CONFIG_RELOAD_INTERVAL": "0",
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-c", "from llm_wrapper.server.main import run; run()"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return process, f"http://{HOST}:{port}"
+
+
+async def _drive(url: str, model: str, stream: bool, concurrency: int, rps: float | None,
+                 requests: int, duration: float | None, pid: int | None = None) -> dict:
+    connector = aiohttp.TCPConnector(limit=0)
+    timeout = aiohttp.ClientTimeout(total=None)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        async def send(index: int):
+            return await send_request(session, url, request_body(model, index, stream))
+
+        cpu_before = process_cpu_seconds(pid) if pid else None
+        started = time.perf_counter()
+        if rps:
+            results = await run_open_loop(send, rps, requests, duration)
+        else:
+            results = await run_closed_loop(send, concurrency, requests, duration)
+        wall = time.perf_counter() - started
+        cpu_after = process_cpu_seconds(pid) if pid else None
+
+    cpu = cpu_after - cpu_before if cpu_before is not None and cpu_after is not None else None
+    return summarize(results, wall, cpu)
+
+
+def _overhead(proxy: dict, direct: dict) -> dict:
+    overhead = {}
+    for metric in ("latency_ms", "ttft_ms", "itl_ms"):
+        if proxy.get(metric) and direct.get(metric):
+            overhead[metric] = {k: round(proxy[metric][k] - direct[metric][k], 3) for k in proxy[metric]}
+    return overhead
+
+
+def _print_report(runs: dict, overhead: dict):
+    table = Table(title="llm-bench")
+    table.add_column("metric")
+    for name in runs:
+        table.add_column(name, justify="right")
+    if overhead:
+        table.add_column("overhead", justify="right")
+
+    def fmt(value):
+        return "-" if value is None else f"{value:g}"
+
+    rows = [("throughput (req/s)", "throughput_rps", None), ("tokens/s", "tokens_per_second", None),
+            ("errors", "errors", None), ("proxy CPU ms/req", "cpu_ms_per_request", None)]
+    for metric in ("latency_ms", "ttft_ms", "itl_ms"):
+        for point in ("p50", "p95", "p99"):
+            rows.append((f"{metric.removesuffix('_ms')} {point} (ms)", metric, point))
+    for label, metric, point in rows:
+        cells = []
+        for summary in runs.values():
+            value = summary.get(metric)
+            cells.append(fmt(value.get(point) if point and value else (None if point else value)))
+        if overhead:
+            cells.append(fmt(overhead.get(metric, {}).get(point)) if point else "")
+        table.add_row(label, *cells)
+    console.print(table)
+
+
+@click.command()
+@click.option("--requests", "-n", default=1000, show_default=True, help="Requests to send (upper bound with --duration).")
+@click.option("--duration", type=float, default=None, help="Stop sending after this many seconds.")
+@click.option("--concurrency", "-c", default=16, show_default=True, help="Concurrent clients (closed loop).")
+@click.option("--rps", type=float, default=None, help="Target request rate with Poisson arrivals (open loop); overrides --concurrency.")
+@click.option("--stream/--no-stream", default=True, show_default=True, help="Use streaming requests.")
+@click.option("--ttft", default="fixed:0.05", show_default=True, help="Mock time to first token in seconds (fixed:V, uniform:LO,HI, exp:MEAN, lognormal:MEDIAN,SIGMA).")
+@click.option("--output-tokens", default="fixed:64", show_default=True, help="Mock tokens per response, same distribution syntax.")
+@click.option("--tokens-per-second", default=200.0, show_default=True, help="Mock generation speed after the first token.")
+@click.option("--model", default="bench", show_default=True, help="Model id served by the proxy.")
+@click.option("--model-config", type=click.Path(exists=True, dir_okay=False), default=None, help="YAML merged into the generated model config (e.g. streaming.passthrough).")
+@click.option("--workers", default=1, show_default=True, help="Proxy worker processes.")
+@click.option("--proxy-url", default=None, help="Benchmark an already running proxy instead of starting one (its model must point at the mock upstream port given by --upstream-port).")
+@click.option("--upstream-port", type=int, default=None, help="Port for the mock upstream (default: a free port).")
+@click.option("--baseline/--no-baseline", default=True, show_default=True, help="Also run the load directly against the mock upstream and report the proxy overhead.")
+@click.option("--warmup", default=20, show_default=True, help="Warm-up requests before measuring.")
+@click.option("--output", "-o", type=click.Path(dir_okay=False), default=None, help="Write results as JSON to this file.")
+def bench(requests, duration, concurrency, rps, stream, ttft, output_tokens, tokens_per_second, model,
+          model_config, workers, proxy_url, upstream_port, baseline, warmup, output):
+    """
+    Load-test the proxy against a local mock upstream.
+
+    Starts a mock OpenAI-compatible upstream and (unless --proxy-url is given) a
+    proxy pointed at it, then reports throughput, latency, TTFT, inter-token
+    latency and proxy CPU per request.
+    """
+    try:
+        settings = MockSettings(
+            ttft=Distribution.parse(ttft),
+            output_tokens=Distribution.parse(output_tokens),
+            tokens_per_second=tokens_per_second,
+        )
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+    overrides = (yaml.safe_load(Path(model_config).read_text()) or {}) if model_config else {}
+
+    upstream_port = upstream_port or free_port(HOST)
+    upstream_base = f"http://{HOST}:{upstream_port}"
+    upstream = multiprocessing.get_context("spawn").Process(
+        target=serve_mock_upstream, args=(settings, HOST, upstream_port), daemon=True
+    )
+    upstream.start()
+    proxy = None
+    config_dir = tempfile.TemporaryDirectory(prefix="llm-bench-configs-")
+    try:
+        asyncio.run(_wait_healthy(upstream_base))
+        if proxy_url is None:
+            proxy, proxy_url = _start_proxy(model, f"{upstream_base}/v1/chat/completions", overrides, workers, config_dir.name)
+        asyncio.run(_wait_healthy(proxy_url))
+
+        load = dict(stream=stream, concurrency=concurrency, rps=rps, requests=requests, duration=duration)
+        targets = {}
+        if baseline:
+            targets["direct"] = (f"{upstream_base}/v1/chat/completions", None)
+        targets["proxy"] = (f"{proxy_url}/v1/chat/completions", proxy.pid if proxy else None)
+
+        runs = {}
+        for name, (url, pid) in targets.items():
+            if warmup:
+                asyncio.run(_drive(url, model, stream, min(concurrency, warmup), None, warmup, None))
+            console.print(f"[bold]Running {name}[/bold] → {url}")
+            runs[name] = asyncio.run(_drive(url, model, pid=pid, **load))
+        overhead = _overhead(runs["proxy"], runs["direct"]) if baseline else {}
+        _print_report(runs, overhead)
+
+        if output:
+            report = {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "settings": {
+                    **load,
+                    "ttft": str(settings.ttft),
+                    "output_tokens": str(settings.output_tokens),
+                    "tokens_per_second": tokens_per_second,
+                    "workers": workers,
+                    "model_config": overrides,
+                },
+                "results": runs,
+                "overhead_ms": overhead,
+            }
+            Path(output).write_text(json.dumps(report, indent=2))
+            console.print(f"Results written to {output}")
+    finally:
+        if proxy is not None:
+            proxy.terminate()
+            try:
+                proxy.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                proxy.kill()
+        upstream.terminate()
+        upstream.join(timeout=5)
+        config_dir.cleanup()
+
+
+if __name__ == "__main__":
+    bench()
@@ -0,0 +1,172 @@
+# src/bench/loadgen.py
+
+import asyncio
+import json
+import math
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import aiohttp
+
+
+@dataclass
+class RequestResult:
+    started: float
+    latency: float | None = None
+    # Time to the first content token (streaming only)
+    ttft: float | None = None
+    # Gaps between consecutive content tokens (streaming only)
+    gaps: list[float] = field(default_factory=list)
+    tokens: int = 0
+    status: int | None = None
+    error: str | None = None
+
+
+Sender = Callable[[int], Awaitable[RequestResult]]
+
+
+def request_body(model: str, index: int, stream: bool) -> dict:
+    # A distinct prompt per request keeps the proxy's cache and coalescing out of the way
+    return {
+        "model": model,
+        "messages": [{"role": "user", "content": f"Benchmark request {index}"}],
+        "stream": stream,
+    }
+
+
+async def send_request(session: aiohttp.ClientSession, url: str, body: dict) -> RequestResult:
+    """Send one chat completion and time it, token by token when streaming."""
+    result = RequestResult(started=time.perf_counter())
+    try:
+        async with session.post(url, json=body) as response:
+            result.status = response.status
+            if response.status != 200:
+                result.error = f"HTTP {response.status}: {(await response.text())[:200]}"
+                return result
+            if not body.get("stream"):
+                data = await response.json()
+                result.tokens = data.get("usage", {}).get("completion_tokens", 0)
+            else:
+                last = None
+                async for line in response.content:
+                    if not line.startswith(b"data: ") or line.startswith(b"data: [DONE]"):
+                        continue
+                    chunk = json.loads(line[6:])
+                    if "error" in chunk:
+                        result.error = str(chunk["error"])[:200]
+                        break
+                    choices = chunk.get("choices") or [{}]
+                    if not choices[0].get("delta", {}).get("content"):
+                        continue
+                    now = time.perf_counter()
+                    if last is None:
+                        result.ttft = now - result.started
+                    else:
+                        result.gaps.append(now - last)
+                    last = now
+                    result.tokens += 1
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+        result.error = f"{type(e).__name__}: {e}"
+    result.latency = time.perf_counter() - result.started
+    return result
+
+
+async def run_closed_loop(send: Sender, concurrency: int, requests: int, duration: float | None) -> list[RequestResult]:
+    """`concurrency` clients each send their next request as soon as the last one finishes."""
+    results: list[RequestResult] = []
+    issued = 0
+    deadline = time.perf_counter() + duration if duration else None
+
+    async def client():
+        nonlocal issued
+        while issued < requests and (deadline is None or time.perf_counter() < deadline):
+            index = issued
+            issued += 1
+            results.append(await send(index))
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return results
+
+
+async def run_open_loop(send: Sender, rps: float, requests: int, duration: float | None) -> list[RequestResult]:
+    """Send requests at Poisson arrival times averaging `rps`, regardless of responses."""
+    tasks = []
+    started = time.perf_counter()
+    next_at = started
+    for index in range(requests):
+        if duration and next_at - started >= duration:
+            break
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(send(index)))
+        next_at += random.expovariate(rps)
+    return list(await asyncio.gather(*tasks))
+
+
+def percentiles(values: list[float], points=(50, 95, 99), scale: float = 1000.0) -> dict | None:
+    """Nearest-rank percentiles (in ms by default), or None without samples."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    summary = {}
+    for p in points:
+        rank = max(1, math.ceil(p / 100 * len(ordered)))
+        summary[f"p{p}"] = round(ordered[rank - 1] * scale, 3)
+    summary["mean"] = round(sum(ordered) / len(ordered) * scale, 3)
+    return summary
+
+
+def summarize(results: list[RequestResult], wall: float, cpu_seconds: float | None = None) -> dict:
+    ok = [r for r in results if r.error is None]
+    errors = [r.error for r in results if r.error is not None]
+    summary = {
+        "requests": len(results),
+        "errors": len(errors),
+        "error_samples": sorted(set(errors))[:5],
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(len(ok) / wall, 2) if wall > 0 else None,
+        "tokens_per_second": round(sum(r.tokens for r in ok) / wall, 1) if wall > 0 else None,
+        "latency_ms": percentiles([r.latency for r in ok if r.latency is not None]),
+        "ttft_ms": percentiles([r.ttft for r in ok if r.ttft is not None]),
+        "itl_ms": percentiles([g for r in ok for g in r.gaps]),
+    }
+    if cpu_seconds is not None:
+        summary["cpu_seconds"] = round(cpu_seconds, 3)
+        summary["cpu_ms_per_request"] = round(cpu_seconds * 1000 / len(ok), 3) if ok else None
+    return summary
+
+
+def _stat_fields(pid: int) -> list[str]:
+    text = Path(f"/proc/{pid}/stat").read_text()
+    # The command name may contain spaces; fields after it are space separated
+    return text[text.rindex(")") + 2:].split()
+
+
+def process_cpu_seconds(pid: int) -> float | None:
+    """User+system CPU of a process and its direct children (e.g. workers), via /proc."""
+    if not Path("/proc").is_dir():
+        return None
+    ticks = os.sysconf("SC_CLK_TCK")
+    pids = [pid]
+    for entry in Path("/proc").iterdir():
+        if entry.name.isdigit():
+            try:
+                # Field 4 of /proc/<pid>/stat is the parent pid (index 1 after the name)
+                if int(_stat_fields(int(entry.name))[1]) == pid:
+                    pids.append(int(entry.name))
+            except (OSError, ValueError, IndexError):
+                continue
+    total = 0
+    for p in pids:
+        try:
+            fields = _stat_fields(p)
+        except OSError:
+            continue
+        # utime and stime are fields 14 and 15 (indexes 11 and 12 after the name)
+        total += int(fields[11]) + int(fields[12])
+    return total / ticks
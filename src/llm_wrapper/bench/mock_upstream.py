@@ -0,0 +1,141 @@
+# src/bench/mock_upstream.py
+
+import asyncio
+import json
+import random
+import socket
+import time
+import uuid
+from dataclasses import dataclass
+
+from aiohttp import web
+
+# Number of parameters each distribution kind takes
+_DISTRIBUTION_PARAMS = {"fixed": 1, "uniform": 2, "exp": 1, "lognormal": 2}
+
+
+@dataclass(frozen=True)
+class Distribution:
+    """
+    A sampled quantity, written as `kind:params`.
+
+    fixed:V, uniform:LO,HI, exp:MEAN or lognormal:MEDIAN,SIGMA. A bare number
+    means fixed. Samples are never negative.
+    """
+    kind: str
+    params: tuple[float, ...]
+
+    @classmethod
+    def parse(cls, spec: str) -> "Distribution":
+        kind, sep, args = spec.strip().partition(":")
+        if not sep:
+            kind, args = "fixed", kind
+        try:
+            params = tuple(float(a) for a in args.split(","))
+        except ValueError:
+            raise ValueError(f"Invalid distribution '{spec}'")
+        if _DISTRIBUTION_PARAMS.get(kind) != len(params):
+            raise ValueError(f"Invalid distribution '{spec}'; use fixed:V, uniform:LO,HI, exp:MEAN or lognormal:MEDIAN,SIGMA")
+        return cls(kind, params)
+
+    def sample(self, rng: random.Random = random) -> float:
+        if self.kind == "uniform":
+            value = rng.uniform(*self.params)
+        elif self.kind == "exp":
+            value = rng.expovariate(1.0 / self.params[0]) if self.params[0] > 0 else 0.0
+        elif self.kind == "lognormal":
+            median, sigma = self.params
+            value = median * rng.lognormvariate(0.0, sigma)
+        else:
+            value = self.params[0]
+        return max(0.0, value)
+
+    def __str__(self) -> str:
+        return f"{self.kind}:{','.join(f'{p:g}' for p in self.params)}"
+
+
+@dataclass(frozen=True)
+class MockSettings:
+    # Seconds before the first token (or before the whole non-streaming body)
+    ttft: Distribution
+    # Tokens generated per request
+    output_tokens: Distribution
+    # Generation speed after the first token
+    tokens_per_second: float
+    token_text: str = " token"
+
+
+def _chunk(chat_id: str, model: str, delta: dict, finish_reason: str | None = None) -> bytes:
+    chunk = {
+        "id": chat_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(chunk)}\n\n".encode("utf-8")
+
+
+async def _sleep_until(deadline: float):
+    delay = deadline - time.monotonic()
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+
+def create_app(settings: MockSettings) -> web.Application:
+    """An OpenAI-compatible upstream that generates tokens at a configured pace."""
+    interval = 1.0 / settings.tokens_per_second if settings.tokens_per_second > 0 else 0.0
+
+    async def chat_completions(request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        model = body.get("model", "mock")
+        chat_id = f"chatcmpl-{uuid.uuid4().hex}"
+        tokens = max(1, round(settings.output_tokens.sample()))
+        started = time.monotonic()
+        first_token_at = started + settings.ttft.sample()
+
+        if not body.get("stream"):
+            await _sleep_until(first_token_at + (tokens - 1) * interval)
+            return web.json_response({
+                "id": chat_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": settings.token_text * tokens},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 1, "completion_tokens": tokens, "total_tokens": tokens + 1},
+            })
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        token_event = _chunk(chat_id, model, {"content": settings.token_text})
+        for i in range(tokens):
+            # Pace against a schedule so slow wakeups don't stretch the whole stream
+            await _sleep_until(first_token_at + i * interval)
+            await response.write(token_event)
+        await response.write(_chunk(chat_id, model, {}, "stop"))
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    async def health(request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok"})
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    app.router.add_get("/health", health)
+    return app
+
+
+def serve_mock_upstream(settings: MockSettings, host: str, port: int):
+    """Run the mock upstream until the process is terminated."""
+    web.run_app(create_app(settings), host=host, port=port, print=None, access_log=None)
+
+
+def free_port(host: str = "127.0.0.1") -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
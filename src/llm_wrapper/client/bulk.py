@@ -0,0 +1,244 @@
+# src/client/bulk.py
+
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Iterable
+
+from rich.progress import BarColumn, MofNCompleteColumn, Progress, TextColumn, TimeElapsedColumn
+from rich.table import Table
+
+from llm_wrapper.bench.loadgen import percentiles
+
+# Per-line overrides of the command-line request parameters
+LINE_PARAMETERS = ("model", "temperature", "max_tokens")
+
+
+@dataclass
+class Prompt:
+    index: int
+    id: str
+    messages: list[dict]
+    params: dict = field(default_factory=dict)
+
+
+def parse_prompts(lines: Iterable[str], input_format: str = "auto") -> list[Prompt]:
+    """
+    Parse a prompt file.
+
+    `text` files hold one prompt per line. `jsonl` lines are either a JSON string
+    or an object with `prompt` (plus an optional `system`) or `messages`, an
+    optional `id`/`custom_id` and optional `model`, `temperature` and `max_tokens`.
+    `auto` picks `jsonl` when the first non-blank line starts with `{` or `"`.
+    Blank lines are skipped; prompts without an ID are named by their line number.
+    Raises ValueError on malformed or duplicate lines.
+    """
+    prompts, seen = [], set()
+    for number, raw in enumerate(lines, start=1):
+        line = raw.strip()
+        if not line:
+            continue
+        if input_format == "auto":
+            input_format = "jsonl" if line[0] in '{"' else "text"
+        prompt = _parse_line(line, input_format, number, len(prompts))
+        if prompt.id in seen:
+            raise ValueError(f"line {number}: duplicate id {prompt.id!r}")
+        seen.add(prompt.id)
+        prompts.append(prompt)
+    return prompts
+
+
+def _parse_line(line: str, input_format: str, number: int, index: int) -> Prompt:
+    if input_format == "text":
+        return Prompt(index, str(number), [{"role": "user", "content": line}])
+    try:
+        data = json.loads(line)
+    except ValueError as e:
+        raise ValueError(f"line {number}: invalid JSON ({e})") from None
+    if isinstance(data, str):
+        return Prompt(index, str(number), [{"role": "user", "content": data}])
+    if not isinstance(data, dict):
+        raise ValueError(f"line {number}: expected a string or an object")
+    if isinstance(data.get("messages"), list) and data["messages"]:
+        messages = data["messages"]
+    elif isinstance(data.get("prompt"), str):
+        messages = [{"role": "user", "content": data["prompt"]}]
+        if data.get("system"):
+            messages.insert(0, {"role": "system", "content": data["system"]})
+    else:
+        raise ValueError(f"line {number}: needs a 'prompt' string or a non-empty 'messages' list")
+    prompt_id = data.get("id", data.get("custom_id", number))
+    params = {k: data[k] for k in LINE_PARAMETERS if data.get(k) is not None}
+    return Prompt(index, str(prompt_id), messages, params)
+
+
+def completed_ids(path: Path) -> set[str]:
+    """
+    Prepare an earlier output file for resuming and return the IDs it completed.
+
+    Successful records are kept; failed ones and a partial last line (from an
+    interrupted run) are dropped so those prompts are sent again. The file is
+    rewritten atomically only when something was dropped.
+    """
+    if not path.exists():
+        return set()
+    kept, ids, dropped = [], set(), False
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                dropped = True
+                continue
+            if not isinstance(record, dict) or record.get("error") is not None or "id" not in record:
+                dropped = True
+                continue
+            kept.append(line if line.endswith("\n") else line + "\n")
+            ids.add(str(record["id"]))
+    if dropped:
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text("".join(kept), encoding="utf-8")
+        os.replace(tmp, path)
+    return ids
+
+
+class OrderedWriter:
+    """Writes records in input order, holding back the ones that finish early."""
+
+    def __init__(self, out: IO[str], indexes: list[int]):
+        self.out = out
+        self._order = indexes
+        self._next = 0
+        self._pending: dict[int, dict] = {}
+
+    def write(self, index: int, record: dict):
+        self._pending[index] = record
+        while self._next < len(self._order) and self._order[self._next] in self._pending:
+            _write_record(self.out, self._pending.pop(self._order[self._next]))
+            self._next += 1
+
+
+class CompletionWriter:
+    """Writes records as they complete."""
+
+    def __init__(self, out: IO[str]):
+        self.out = out
+
+    def write(self, index: int, record: dict):
+        _write_record(self.out, record)
+
+
+def _write_record(out: IO[str], record: dict):
+    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    out.flush()
+
+
+@dataclass
+class BulkStats:
+    total: int
+    skipped: int = 0
+    ok: int = 0
+    errors: int = 0
+    tokens: int = 0
+    latencies: list[float] = field(default_factory=list)
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def throughput(self) -> float:
+        elapsed = self.elapsed
+        return (self.ok + self.errors) / elapsed if elapsed > 0 else 0.0
+
+    def latency_ms(self) -> dict | None:
+        return percentiles(self.latencies)
+
+    def describe(self) -> str:
+        latency = self.latency_ms()
+        text = f"ok {self.ok}  errors {self.errors}  {self.throughput:.1f} req/s"
+        if latency:
+            text += f"  p50 {latency['p50']:.0f} ms  p95 {latency['p95']:.0f} ms"
+        return text
+
+    def table(self) -> Table:
+        elapsed = self.elapsed
+        table = Table(title="llm-cli bulk")
+        table.add_column("metric")
+        table.add_column("value", justify="right")
+        table.add_row("prompts", str(self.total))
+        table.add_row("resumed (skipped)", str(self.skipped))
+        table.add_row("completed", str(self.ok))
+        table.add_row("errors", str(self.errors))
+        table.add_row("wall (s)", f"{elapsed:.2f}")
+        table.add_row("throughput (req/s)", f"{self.throughput:.2f}")
+        table.add_row("tokens/s", f"{self.tokens / elapsed:.1f}" if elapsed > 0 else "-")
+        latency = self.latency_ms() or {}
+        for point in ("p50", "p95", "p99", "mean"):
+            table.add_row(f"latency {point} (ms)", f"{latency[point]:g}" if point in latency else "-")
+        return table
+
+
+async def send_prompt(client, prompt: Prompt, model: str, temperature: float) -> tuple[dict, float]:
+    """Send one prompt and build its output record (errors are recorded, not raised)."""
+    params = {"model": model, "temperature": temperature, **prompt.params}
+    started = time.monotonic()
+    try:
+        response = await client.chat.completions.create(messages=prompt.messages, stream=False, **params)
+        latency = time.monotonic() - started
+        # Malformed replies (e.g. no choices) become error records too
+        choice = response.choices[0]
+        usage = getattr(response, "usage", None)
+        record = {
+            "id": prompt.id,
+            "model": getattr(response, "model", params["model"]),
+            "content": choice.message.content,
+            "finish_reason": getattr(choice, "finish_reason", None),
+            "usage": usage.model_dump() if hasattr(usage, "model_dump") else usage,
+            "latency_ms": round(latency * 1000, 1),
+            "error": None,
+        }
+    except Exception as e:
+        latency = time.monotonic() - started
+        return {"id": prompt.id, "error": {"type": type(e).__name__, "message": str(e)},
+                "latency_ms": round(latency * 1000, 1)}, latency
+    return record, latency
+
+
+async def run_bulk(client, prompts: list[Prompt], writer, stats: BulkStats, model: str, temperature: float,
+                   concurrency: int, progress: Progress | None = None) -> BulkStats:
+    """Send prompts with at most `concurrency` requests in flight, writing each result."""
+    queue = iter(prompts)
+    task = progress.add_task("bulk", total=len(prompts), stats=stats.describe()) if progress else None
+
+    async def worker():
+        for prompt in queue:
+            record, latency = await send_prompt(client, prompt, model, temperature)
+            if record["error"] is None:
+                stats.ok += 1
+                stats.latencies.append(latency)
+                stats.tokens += (record.get("usage") or {}).get("completion_tokens") or 0
+            else:
+                stats.errors += 1
+            writer.write(prompt.index, record)
+            if progress:
+                progress.update(task, advance=1, stats=stats.describe())
+
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, len(prompts))))))
+    return stats
+
+
+def bulk_progress(console) -> Progress:
+    return Progress(
+        TextColumn("[bold yellow]Bulk[/bold yellow]"),
+        BarColumn(),
+        MofNCompleteColumn(),
+        TimeElapsedColumn(),
+        TextColumn("{task.fields[stats]}"),
+        console=console,
+        transient=False,
+    )
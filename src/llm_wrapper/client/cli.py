@@ -1,7 +1,10 @@
 # src/client/client.py
 
+import asyncio
 import sys
 import os
+from pathlib import Path
+
 import openai
 import click
 from dotenv import load_dotenv
@@ -9,6 +12,16 @@ from rich.console import Console
 from rich.markdown import Markdown
 from rich.panel import Panel
 
+from llm_wrapper.client.bulk import (
+    BulkStats,
+    CompletionWriter,
+    OrderedWriter,
+    bulk_progress,
+    completed_ids,
+    parse_prompts,
+    run_bulk,
+)
+from llm_wrapper.client.render import LiveMarkdown
 from llm_wrapper.lib.logging import setup_logger
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -24,13 +37,13 @@ console = Console(stderr=True)
 # ─────────────────────────────────────────────────────────────────────────────
 # 🧠 Unified Response Dispatcher
 # ─────────────────────────────────────────────────────────────────────────────
-def dispatch_response(client, model, query, temperature, render_markdown, stream):
+def dispatch_response(client, model, query, temperature, render_markdown, stream, live=False):
     """
     Handle both stream and non-stream query responses.
     """
-    logger.debug(f"Dispatching query to model={model}, stream={stream}, temp={temperature}")
+    logger.debug(f"Dispatching query to model={model}, stream={stream}, temp={temperature}, live={live}")
     if stream:
-        stream_response(client, model, query, temperature, render_markdown)
+        stream_response(client, model, query, temperature, render_markdown, live)
     else:
         single_response(client, model, query, temperature, render_markdown)
 
@@ -38,8 +51,8 @@ def dispatch_response(client, model, query, temperature, render_markdown, stream
 # ─────────────────────────────────────────────────────────────────────────────
 # 📤 Streaming Response
 # ─────────────────────────────────────────────────────────────────────────────
-def stream_response(client, model, query, temperature, render_markdown):
-    full_response = ""
+def stream_response(client, model, query, temperature, render_markdown, live=False):
+    parts = []
     try:
         stream = client.chat.completions.create(
             model=model,
@@ -49,17 +62,22 @@ def stream_response(client, model, query, temperature, render_markdown):
         )
 
         console.print("[bold yellow]Assistant:[/bold yellow] ", end="")
-        for chunk in stream:
-            if chunk.choices and chunk.choices[0].delta.content:
-                part = chunk.choices[0].delta.content
-                full_response += part
-                console.print(part, end="")
-                sys.stdout.flush()
-        print()
+        if live:
+            console.print()
+            with LiveMarkdown(console) as view:
+                for part in _deltas(stream):
+                    view.feed(part)
+            logger.info("Streamed response complete.")
+            return
+
+        for part in _deltas(stream):
+            parts.append(part)
+            console.print(part, end="", markup=False, highlight=False)
+        console.print()
 
         if render_markdown:
             console.print("\n[bold blue]Rendered Markdown:[/bold blue]")
-            console.print(Markdown(full_response))
+            console.print(Markdown("".join(parts)))
 
         logger.info("Streamed response complete.")
     except Exception as e:
@@ -68,6 +86,12 @@ def stream_response(client, model, query, temperature, render_markdown):
         sys.exit(1)
 
 
+def _deltas(stream):
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # 📦 Non-streaming Response
 # ─────────────────────────────────────────────────────────────────────────────
@@ -98,7 +122,7 @@ def single_response(client, model, query, temperature, render_markdown):
 # ─────────────────────────────────────────────────────────────────────────────
 # 🧑‍💻 Interactive CLI Loop
 # ─────────────────────────────────────────────────────────────────────────────
-def interactive_mode(client, model, temperature, render_markdown, stream):
+def interactive_mode(client, model, temperature, render_markdown, stream, live=False):
     console.print("[bold green]Interactive LLM Chat[/bold green]")
     console.print("Type 'exit' or 'quit' to end.\n")
 
@@ -109,39 +133,109 @@ def interactive_mode(client, model, temperature, render_markdown, stream):
             logger.info("User exited interactive mode.")
             break
 
-        dispatch_response(client, model, query, temperature, render_markdown, stream)
+        dispatch_response(client, model, query, temperature, render_markdown, stream, live)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 🚪 Main CLI
 # ─────────────────────────────────────────────────────────────────────────────
-@click.command()
+@click.group(invoke_without_command=True)
 @click.option("--query", "-q", type=str, help="Prompt to send to the model")
 @click.option("--model", "-m", default="expert", help="Model name (default: expert)")
 @click.option("--temperature", "-t", default=0.7, help="Sampling temperature (default: 0.7)")
 @click.option("--markdown", is_flag=True, help="Render output in Markdown")
 @click.option("--stream/--no-stream", default=True, help="Stream output (default: stream)")
+@click.option("--live", is_flag=True, help="Render streamed output as live Markdown (redrawn at most 10 times a second)")
 @click.option("--base-url", default="http://localhost:8000/v1", help="LLM server URL")
-
-def client(query, model, temperature, markdown, stream, base_url):
+@click.pass_context
+def client(ctx, query, model, temperature, markdown, stream, live, base_url):
     """
     Interact with the LLM API in interactive or one-shot query mode.
+
+    Use the `bulk` subcommand to send a file of prompts concurrently.
     """
+    if live and not stream:
+        raise click.UsageError("--live renders streamed output; it cannot be combined with --no-stream")
     # Validate required environment variables
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         console.print("[bold red]Error:[/bold red] Missing required environment variable OPENAI_API_KEY")
         sys.exit(1)
     logger.info("CLI started.")
+    if ctx.invoked_subcommand is not None:
+        ctx.obj = {"model": model, "temperature": temperature, "base_url": base_url, "api_key": api_key}
+        return
     openai_client = openai.OpenAI(base_url=base_url, api_key=api_key)
 
     # Dispatch mode selection
     mode = "interactive" if not query else "query"
     {
-        "interactive": lambda: interactive_mode(openai_client, model, temperature, markdown, stream),
-        "query": lambda: dispatch_response(openai_client, model, query, temperature, markdown, stream)
+        "interactive": lambda: interactive_mode(openai_client, model, temperature, markdown, stream, live),
+        "query": lambda: dispatch_response(openai_client, model, query, temperature, markdown, stream, live)
     }[mode]()
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# 📚 Bulk Mode
+# ─────────────────────────────────────────────────────────────────────────────
+async def bulk_mode(settings, prompts, writer, stats, concurrency, max_retries):
+    openai_client = openai.AsyncOpenAI(
+        base_url=settings["base_url"], api_key=settings["api_key"], max_retries=max_retries
+    )
+    try:
+        with bulk_progress(console) as progress:
+            await run_bulk(openai_client, prompts, writer, stats, settings["model"], settings["temperature"],
+                           concurrency, progress)
+    finally:
+        await openai_client.close()
+
+
+@client.command()
+@click.argument("input_file", type=click.File("r", encoding="utf-8"), default="-")
+@click.option("--output", "-o", type=click.Path(dir_okay=False, allow_dash=True), default="-", help="JSONL results file (default: stdout)")
+@click.option("--concurrency", "-c", default=8, show_default=True, help="Requests in flight at once")
+@click.option("--order", type=click.Choice(["input", "completion"]), default="input", show_default=True, help="Write results in input order or as they complete")
+@click.option("--input-format", type=click.Choice(["auto", "jsonl", "text"]), default="auto", show_default=True, help="Prompt file format")
+@click.option("--resume", is_flag=True, help="Append to --output, skipping prompts it already completed")
+@click.option("--max-retries", default=2, show_default=True, help="Client retries per prompt (429s honour Retry-After)")
+@click.pass_obj
+def bulk(settings, input_file, output, concurrency, order, input_format, resume, max_retries):
+    """
+    Send every prompt in INPUT_FILE (default: stdin) and write the results as JSONL.
+
+    Each output line has the prompt's `id`, the reply `content`, `finish_reason`,
+    `usage` and `latency_ms`, or an `error`. Failed prompts do not stop the run;
+    the exit code is 1 if any failed, and `--resume` sends them again.
+    """
+    if concurrency < 1:
+        raise click.BadParameter("must be at least 1", param_hint="--concurrency")
+    if resume and output == "-":
+        raise click.UsageError("--resume needs an --output file")
+    try:
+        prompts = parse_prompts(input_file, input_format)
+    except ValueError as e:
+        raise click.UsageError(f"{input_file.name}: {e}")
+
+    stats = BulkStats(total=len(prompts))
+    if resume:
+        done = completed_ids(Path(output))
+        stats.skipped = sum(1 for p in prompts if p.id in done)
+        prompts = [p for p in prompts if p.id not in done]
+    logger.info(f"Bulk run: {len(prompts)} prompts ({stats.skipped} resumed), concurrency={concurrency}, order={order}")
+
+    out = sys.stdout if output == "-" else open(output, "a" if resume else "w", encoding="utf-8")
+    try:
+        writer = OrderedWriter(out, [p.index for p in prompts]) if order == "input" else CompletionWriter(out)
+        asyncio.run(bulk_mode(settings, prompts, writer, stats, concurrency, max_retries))
+    finally:
+        if output != "-":
+            out.close()
+
+    console.print(stats.table())
+    logger.info(f"Bulk run finished: ok={stats.ok} errors={stats.errors} skipped={stats.skipped}")
+    if stats.errors:
+        sys.exit(1)
+
+
 if __name__ == "__main__":  # pragma: no cover
-    client()  # pragma: no cover
\ No newline at end of file
+    client()  # pragma: no cover
@@ -0,0 +1,112 @@
+# src/client/render.py
+
+import re
+import time
+
+from rich.console import Console
+from rich.live import Live
+from rich.markdown import Markdown
+
+# Default cap on live view redraws per second
+LIVE_FPS = 10.0
+# Default cap on lines in the live tail before they are printed as a block
+MAX_TAIL_LINES = 40
+
+_FENCE = re.compile(r" {0,3}(`{3,}|~{3,})")
+
+
+class LiveMarkdown:
+    """
+    Incremental Markdown view of a streamed reply.
+
+    Tokens are buffered and only split into lines when a newline arrives. A block
+    is finalized when its code fence closes, or once a blank line is followed by
+    an unindented line outside a fence; finalized blocks are printed once, above
+    the live view, which only ever re-renders the unfinished tail at most `fps`
+    times per second. Tails without such breaks (long code blocks, tight lists)
+    are printed every `max_lines` lines, code blocks as closed fences that stay
+    open in the tail, so the cost per redraw stays bounded whatever the reply.
+    """
+
+    def __init__(self, console: Console, fps: float = LIVE_FPS, clock=time.monotonic, max_lines: int = MAX_TAIL_LINES):
+        self.console = console
+        self.interval = 1.0 / fps if fps > 0 else 0.0
+        self.clock = clock
+        self.max_lines = max(1, max_lines)
+        self.blocks = 0
+        self.frames = 0
+        self._lines: list[str] = []
+        self._partial: list[str] = []
+        self._fence: str | None = None
+        # Opening line of the current fence, repeated when a long code block is split
+        self._fence_line = ""
+        self._last_frame = float("-inf")
+        self._dirty = False
+        self._closed = False
+        self._live = Live(console=console, auto_refresh=False, transient=True, vertical_overflow="visible")
+
+    def __enter__(self) -> "LiveMarkdown":
+        self._live.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def feed(self, text: str):
+        self._partial.append(text)
+        if "\n" in text:
+            *lines, rest = "".join(self._partial).split("\n")
+            self._partial = [rest] if rest else []
+            for line in lines:
+                self._add_line(line)
+        self._dirty = True
+        if self.clock() - self._last_frame >= self.interval:
+            self._render()
+
+    def close(self):
+        """Stop the live view and print the remaining tail as the last block."""
+        if self._partial:
+            self._add_line("".join(self._partial))
+            self._partial = []
+        self._live.stop()
+        self._closed = True
+        self._finalize()
+
+    def _add_line(self, line: str):
+        if self._fence is not None:
+            self._lines.append(line)
+            match = _FENCE.match(line)
+            if match and match.group(1).startswith(self._fence) and not line[match.end():].strip():
+                self._fence = None
+                self._finalize()
+            elif len(self._lines) >= self.max_lines:
+                self._lines.append(self._fence)
+                self._finalize()
+                self._lines = [self._fence_line]
+            return
+        starts_block = line.strip() and not line[0].isspace()
+        if starts_block and self._lines and (not self._lines[-1].strip() or len(self._lines) >= self.max_lines):
+            self._finalize()
+        match = _FENCE.match(line)
+        if match:
+            self._fence, self._fence_line = match.group(1), line
+        self._lines.append(line)
+
+    def _finalize(self):
+        text = "\n".join(self._lines).strip("\n")
+        self._lines = []
+        if text:
+            self.console.print(Markdown(text))
+            self.blocks += 1
+            # Drop the finalized block from the live view right away
+            self._dirty = True
+            self._render()
+
+    def _render(self):
+        if self._closed or not self._dirty:
+            return
+        tail = "\n".join([*self._lines, "".join(self._partial)]).strip("\n")
+        self._live.update(Markdown(tail), refresh=True)
+        self._last_frame = self.clock()
+        self._dirty = False
+        self.frames += 1
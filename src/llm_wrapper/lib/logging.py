@@ -1,9 +1,206 @@
+import atexit
+import copy
 import logging
+import logging.handlers
 import os
 import json
+import queue
+import threading
 from pathlib import Path
 from typing import Optional
 
+# Background writer tuning (see _BatchingListener)
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "256"))
+# Rotation: size-based by default, time-based when LOG_ROTATE_WHEN is set (e.g. "midnight")
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN", "").strip()
+# Set by the multi-worker supervisor (server/workers.py) in each worker process
+WORKER_ID_ENV = "LLM_WORKER_ID"
+
+
+class lazy:
+    """
+    Defer an expensive log argument until the record is actually formatted.
+
+    Usage: logger.debug("Payload: %s", lazy(json.dumps, payload, indent=2))
+    Nothing is computed when the logger's level filters the record out.
+    """
+    __slots__ = ("fn", "args", "kwargs")
+
+    def __init__(self, fn, *args, **kwargs):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+
+    def __str__(self) -> str:
+        return str(self.fn(*self.args, **self.kwargs))
+
+
+class _DeferredFlushMixin:
+    """Skip the per-record flush while the writer is handling a batch."""
+    deferring = False
+
+    def flush(self):
+        if not self.deferring:
+            super().flush()
+
+
+class _BatchedStreamHandler(_DeferredFlushMixin, logging.StreamHandler):
+    pass
+
+
+class _BatchedRotatingFileHandler(_DeferredFlushMixin, logging.handlers.RotatingFileHandler):
+    pass
+
+
+class _BatchedTimedRotatingFileHandler(_DeferredFlushMixin, logging.handlers.TimedRotatingFileHandler):
+    pass
+
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueue records without touching disk or console on the calling thread.
+
+    The message is merged with its args here (so mutable args are snapshotted),
+    but formatting and I/O happen on the writer thread. When the queue is full
+    the record is dropped and counted instead of blocking the event loop.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _BatchingListener:
+    """Background thread that drains the log queue and writes records in batches."""
+
+    _STOP = object()
+
+    def __init__(self, log_queue: queue.Queue, handlers: list[logging.Handler], batch_size: int = LOG_BATCH_SIZE):
+        self.queue = log_queue
+        self.handlers = handlers
+        self.batch_size = max(1, batch_size)
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = self._write(batch)
+            if stop:
+                return
+
+    def _write(self, batch: list) -> bool:
+        stop = False
+        for handler in self.handlers:
+            handler.deferring = True
+        try:
+            for item in batch:
+                if item is self._STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    # Flush marker: set once everything queued before it is written
+                    self._flush_handlers()
+                    item.set()
+                else:
+                    for handler in self.handlers:
+                        if item.levelno >= handler.level:
+                            handler.handle(item)
+        finally:
+            self._flush_handlers()
+        return stop
+
+    def _flush_handlers(self):
+        for handler in self.handlers:
+            handler.deferring = False
+            try:
+                handler.flush()
+            except (OSError, ValueError):
+                # e.g. a console stream closed under us; keep the writer alive
+                pass
+            handler.deferring = True
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until records queued so far have been written."""
+        if not self._thread.is_alive():
+            return True
+        marker = threading.Event()
+        self.queue.put(marker)
+        return marker.wait(timeout)
+
+    def stop(self):
+        if self._thread.is_alive():
+            self.queue.put(self._STOP)
+            self._thread.join(timeout=5.0)
+        for handler in self.handlers:
+            handler.deferring = False
+            handler.close()
+
+
+_listeners: dict[str, _BatchingListener] = {}
+
+
+def flush_logger(logger: logging.Logger, timeout: float = 5.0) -> bool:
+    """Wait for a logger's queued records to reach its file/console handlers."""
+    listener = _listeners.get(logger.name)
+    return listener.flush(timeout) if listener else True
+
+
+def output_handlers(logger: logging.Logger) -> list[logging.Handler]:
+    """The file/console handlers behind a logger's queue."""
+    listener = _listeners.get(logger.name)
+    return list(listener.handlers) if listener else list(logger.handlers)
+
+
+@atexit.register
+def _stop_listeners():
+    for listener in list(_listeners.values()):
+        listener.stop()
+    _listeners.clear()
+
+
+def worker_log_file(log_file: str) -> str:
+    """
+    The log file for this process: `server.log` becomes `server.worker-<id>.log` in workers.
+
+    Rotation renames files from the writing process, so every process needs a
+    file of its own; workers sharing one file would race on rollover and keep
+    writing to already rotated files.
+    """
+    worker_id = os.getenv(WORKER_ID_ENV)
+    if not worker_id:
+        return log_file
+    path = Path(log_file)
+    return str(path.with_name(f"{path.stem}.worker-{worker_id}{path.suffix}"))
+
+
+def _file_handler(log_file: str) -> logging.Handler:
+    if LOG_ROTATE_WHEN:
+        return _BatchedTimedRotatingFileHandler(log_file, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUP_COUNT)
+    return _BatchedRotatingFileHandler(log_file, mode="a", maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT)
+
+
 def setup_logger(
     name: str = "app",
     log_file: str = "logs/app.log",
@@ -13,6 +210,11 @@ def setup_logger(
     """
     Sets up and returns a logger that writes to a specified file (and optionally console).
 
+    Records are put on a queue and written by a background thread, so logging
+    calls never block on file or console I/O. Files rotate by size (or time when
+    LOG_ROTATE_WHEN is set) on that same thread. In multi-worker mode each worker
+    writes its own file (see worker_log_file).
+
     Parameters:
     - name (str): Name of the logger.
     - log_file (str): File path where logs will be written.
@@ -22,6 +224,7 @@ def setup_logger(
     Returns:
     - logging.Logger: Configured logger instance.
     """
+    log_file = worker_log_file(log_file)
     log_path = Path(log_file)
     log_path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -72,15 +275,27 @@ def setup_logger(
     else:
         formatter = JSONFormatter()
 
-    # File handler
-    file_handler = logging.FileHandler(log_file, mode="a")
+    # File handler (rotating)
+    handlers = []
+    file_handler = _file_handler(log_file)
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    handlers.append(file_handler)
 
     # Optional console handler
     if console:
-        console_handler = logging.StreamHandler()
+        console_handler = _BatchedStreamHandler()
         console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+        handlers.append(console_handler)
+
+    # Queue in front of the handlers; a background thread does the writing
+    log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    listener = _BatchingListener(log_queue, handlers)
+    # A logger whose handlers were removed may still have a writer thread
+    previous = _listeners.pop(name, None)
+    if previous is not None:
+        previous.stop()
+    _listeners[name] = listener
+    listener.start()
+    logger.addHandler(_NonBlockingQueueHandler(log_queue))
 
-    return logger
\ No newline at end of file
+    return logger
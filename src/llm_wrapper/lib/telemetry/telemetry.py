@@ -1,6 +1,8 @@
 import time
 import logging
 import socket
+from pathlib import Path
+from typing import Callable, Optional, Sequence
 from urllib.parse import urlparse
 
 from opentelemetry import trace, metrics
@@ -8,11 +10,85 @@ from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.metrics import MeterProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from opentelemetry.sdk.trace.sampling import ParentBased, Sampler, SamplingResult, TraceIdRatioBased
 from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
 from opentelemetry.exporter.prometheus import PrometheusMetricReader
 from prometheus_client import start_http_server
 import os
 
+# Span attribute the per-route sampler keys on (falls back to the span name)
+ROUTE_ATTRIBUTE = "http.route"
+
+
+def _ratio(value) -> float:
+    return min(1.0, max(0.0, float(value)))
+
+
+def parse_route_ratios(value: str) -> dict[str, float]:
+    """Parse "route=ratio,route=ratio" (e.g. TRACE_SAMPLE_ROUTES) into a dict."""
+    ratios = {}
+    for item in (value or "").split(","):
+        route, sep, ratio = item.strip().rpartition("=")
+        if not sep or not route:
+            continue
+        try:
+            ratios[route.strip()] = _ratio(ratio)
+        except ValueError:
+            logging.getLogger(__name__).warning(f"Ignoring invalid trace sample ratio '{item}'")
+    return ratios
+
+
+class RouteRatioSampler(Sampler):
+    """
+    Head sampler with a trace-id ratio per route and a default ratio for the rest.
+
+    The route is read from the span's `http.route` attribute, or its name when unset.
+    Wrap in ParentBased so child spans follow the root span's decision.
+    """
+
+    def __init__(self, default_ratio: float = 1.0, route_ratios: Optional[dict[str, float]] = None):
+        self._default = TraceIdRatioBased(_ratio(default_ratio))
+        self._routes = {route: TraceIdRatioBased(_ratio(r)) for route, r in (route_ratios or {}).items()}
+
+    def should_sample(
+        self,
+        parent_context,
+        trace_id: int,
+        name: str,
+        kind=None,
+        attributes=None,
+        links: Optional[Sequence] = None,
+        trace_state=None,
+    ) -> SamplingResult:
+        route = (attributes or {}).get(ROUTE_ATTRIBUTE, name)
+        sampler = self._routes.get(route, self._default)
+        return sampler.should_sample(parent_context, trace_id, name, kind, attributes, links, trace_state)
+
+    def get_description(self) -> str:
+        routes = ",".join(f"{route}={s.rate}" for route, s in self._routes.items())
+        return f"RouteRatioSampler{{default={self._default.rate},routes={{{routes}}}}}"
+
+
+def build_sampler(
+    sample_ratio: Optional[float] = None,
+    route_sample_ratios: Optional[dict[str, float]] = None
+) -> Sampler:
+    """Parent-based route sampler; unset arguments come from TRACE_SAMPLE_RATIO / TRACE_SAMPLE_ROUTES."""
+    if sample_ratio is None:
+        sample_ratio = float(os.getenv("TRACE_SAMPLE_RATIO", "1.0"))
+    if route_sample_ratios is None:
+        route_sample_ratios = parse_route_ratios(os.getenv("TRACE_SAMPLE_ROUTES", ""))
+    return ParentBased(RouteRatioSampler(sample_ratio, route_sample_ratios))
+
+
+def set_lazy_attributes(span, compute: Callable[[], dict]):
+    """
+    Set attributes computed by `compute()` only when the span is being recorded,
+    so unsampled requests skip the work of building them.
+    """
+    if span.is_recording():
+        span.set_attributes(compute())
+
 
 class TelemetrySetup:
     _instance = None
@@ -28,7 +104,9 @@ class TelemetrySetup:
         service_name: str,
         version: str = "1.0.0",
         otlp_endpoint: str = "http://localhost:4318/v1/traces",
-        prometheus_port: int = 9464
+        prometheus_port: int = 9464,
+        sample_ratio: Optional[float] = None,
+        route_sample_ratios: Optional[dict[str, float]] = None
     ):
         # Optionally disable telemetry via environment
         if os.getenv("DISABLE_TELEMETRY", "false").lower() in ("1", "true", "yes"):
@@ -46,13 +124,20 @@ class TelemetrySetup:
         self.version = version
         self.otlp_endpoint = otlp_endpoint
         self.prometheus_port = prometheus_port
+        self.sampler = build_sampler(sample_ratio, route_sample_ratios)
 
         self.resource = Resource.create({
             "service.name": self.service_name,
             "service.version": self.version,
         })
 
-        if not self._is_port_in_use(self.prometheus_port):
+        worker_id = os.getenv("LLM_WORKER_ID")
+        if worker_id is not None:
+            self._start_worker_metrics_server(worker_id)
+        elif int(os.getenv("WORKERS", "1") or 1) > 1:
+            # Multi-worker supervisor: its aggregator owns the Prometheus port
+            self.logger.info(f"Prometheus metrics of all workers served on port {self.prometheus_port}")
+        elif not self._is_port_in_use(self.prometheus_port):
             start_http_server(self.prometheus_port)
             self.logger.info(f"Prometheus server running on port {self.prometheus_port}")
         else:
@@ -63,6 +148,17 @@ class TelemetrySetup:
 
         TelemetrySetup._initialized = True
 
+    def _start_worker_metrics_server(self, worker_id: str):
+        """
+        Serve this worker's metrics on an ephemeral local port and publish the port
+        in LLM_METRICS_DIR, where the supervisor's aggregator finds it.
+        """
+        server, _ = start_http_server(0, addr="127.0.0.1")
+        metrics_dir = Path(os.environ["LLM_METRICS_DIR"])
+        metrics_dir.mkdir(parents=True, exist_ok=True)
+        (metrics_dir / f"worker-{worker_id}.port").write_text(str(server.server_port))
+        self.logger.info(f"Worker {worker_id} metrics on 127.0.0.1:{server.server_port}")
+
     def _is_port_in_use(self, port: int) -> bool:
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
             return sock.connect_ex(('localhost', port)) == 0
@@ -86,12 +182,14 @@ class TelemetrySetup:
             )
         # Initialize tracer with OTLP exporter
         try:
-            tracer_provider = TracerProvider(resource=self.resource)
+            tracer_provider = TracerProvider(resource=self.resource, sampler=self.sampler)
             tracer_provider.add_span_processor(
                 BatchSpanProcessor(OTLPSpanExporter(endpoint=self.otlp_endpoint))
             )
             trace.set_tracer_provider(tracer_provider)
-            self.logger.info(f"Tracer initialized with endpoint {self.otlp_endpoint}")
+            self.logger.info(
+                f"Tracer initialized with endpoint {self.otlp_endpoint} ({self.sampler.get_description()})"
+            )
         except Exception as init_err:
             self.logger.warning(f"Tracer already set or failed to initialize: {init_err}")
 
@@ -0,0 +1,241 @@
+# src/server/admission.py
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from fastapi import HTTPException
+from opentelemetry import metrics
+from opentelemetry.metrics import Observation
+
+from llm_wrapper.lib.logging import setup_logger
+from llm_wrapper.server.balancer import endpoints_of
+from llm_wrapper.server.config import ADMISSION_MAX_QUEUE, ADMISSION_MAX_QUEUE_WAIT
+from llm_wrapper.server.context import get_request_context
+
+logger = setup_logger("llm-server", "logs/server.log")
+meter = metrics.get_meter("llm-wrapper")
+
+# Weight of the newest sample in the slot hold-time average
+SERVICE_TIME_ALPHA = 0.2
+# Hold time assumed before any request has completed
+DEFAULT_SERVICE_SECONDS = 1.0
+
+admission_wait_histogram = meter.create_histogram(
+    name="admission_wait_seconds",
+    unit="s",
+    description="Time requests spent queued for an upstream slot"
+)
+
+admission_rejected_counter = meter.create_counter(
+    name="admission_rejected_total",
+    unit="1",
+    description="Requests rejected by admission control, by reason"
+)
+
+
+def model_limit(config: dict) -> int | None:
+    """
+    Max in-flight upstream requests for a model.
+
+    The lower of `limits.max_in_flight` and the sum of per-replica limits (when
+    every replica declares one); None when the model is unbounded.
+    """
+    limits = config.get("limits") or {}
+    candidates = []
+    if limits.get("max_in_flight"):
+        candidates.append(int(limits["max_in_flight"]))
+    replica_limits = [e["max_in_flight"] for e in endpoints_of(config["api"])]
+    if replica_limits and all(replica_limits):
+        candidates.append(sum(replica_limits))
+    return min(candidates) if candidates else None
+
+
+class Overloaded(HTTPException):
+    """A 429 from admission control (as opposed to one relayed from upstream)."""
+
+
+def overloaded(model_id: str, reason: str, retry_after: float) -> Overloaded:
+    admission_rejected_counter.add(1, {"model": model_id, "reason": reason})
+    logger.warning("Rejecting request for model '%s' (%s), retry after %.1fs", model_id, reason, retry_after)
+    return Overloaded(
+        status_code=429,
+        detail={
+            "message": f"Model '{model_id}' is overloaded ({reason}). Please retry later.",
+            "type": "server_overloaded",
+            "code": reason,
+        },
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+    )
+
+
+class AdmissionQueue:
+    """Max-in-flight limit for one model with a bounded FIFO wait queue."""
+
+    def __init__(self, model_id: str, max_in_flight: int, max_queue: int, max_wait: float):
+        self.model_id = model_id
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self.service_time = DEFAULT_SERVICE_SECONDS
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def has_capacity(self) -> bool:
+        return self.in_flight < self.max_in_flight and not self._waiters
+
+    def predicted_wait(self) -> float:
+        """Expected queueing delay for a request arriving now."""
+        if self.has_capacity():
+            return 0.0
+        return self.service_time * (len(self._waiters) + 1) / self.max_in_flight
+
+    def wait_budget(self) -> float:
+        remaining = get_request_context().remaining()
+        return self.max_wait if remaining is None else min(self.max_wait, remaining)
+
+    def check(self, budget: float):
+        """Raise a 429 if a request arriving now cannot be served within `budget`."""
+        if self.has_capacity():
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise overloaded(self.model_id, "queue_full", self.predicted_wait())
+        wait = self.predicted_wait()
+        if wait > budget:
+            raise overloaded(self.model_id, "deadline_exceeded", wait)
+
+    async def acquire(self, budget: float) -> float:
+        """Take a slot, queueing for at most `budget` seconds. Returns the time waited."""
+        self.check(budget)
+        if self.has_capacity():
+            self.in_flight += 1
+            return 0.0
+
+        started = time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout=budget)
+        except asyncio.TimeoutError:
+            raise overloaded(self.model_id, "queue_timeout", self.predicted_wait())
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we were cancelled
+                self.release(0.0)
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        return time.monotonic() - started
+
+    def release(self, held: float):
+        if held > 0:
+            self.service_time += SERVICE_TIME_ALPHA * (held - self.service_time)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # Hand the slot straight to the next waiter
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+
+class AdmissionSlot:
+    """
+    An admitted request's hold on its model's queue.
+
+    `idle` gives the slot up while the request waits (e.g. a retry backoff or an
+    upstream Retry-After), so a sleeping request does not count as in flight.
+    """
+
+    def __init__(self, model_id: str, queue: AdmissionQueue | None):
+        self.model_id = model_id
+        self.queue = queue
+        self._started: float | None = None
+
+    async def acquire(self):
+        if self.queue is None:
+            return
+        waited = await self.queue.acquire(self.queue.wait_budget())
+        admission_wait_histogram.record(waited, {"model": self.model_id})
+        self._started = time.monotonic()
+
+    def release(self):
+        if self._started is not None:
+            self.queue.release(time.monotonic() - self._started)
+            self._started = None
+
+    async def idle(self, seconds: float):
+        """Sleep without holding the slot, then queue for it again (which may raise a 429)."""
+        self.release()
+        await asyncio.sleep(seconds)
+        await self.acquire()
+
+
+class AdmissionController:
+    """Admission queues per model, created from each model's `limits` config."""
+
+    def __init__(self):
+        self._queues: dict[str, AdmissionQueue] = {}
+
+    def queue_for(self, model_id: str, config: dict) -> AdmissionQueue | None:
+        limit = model_limit(config)
+        if limit is None:
+            return None
+        limits = config.get("limits") or {}
+        max_queue = limits.get("max_queue")
+        max_wait = limits.get("max_queue_wait")
+        settings = (
+            limit,
+            ADMISSION_MAX_QUEUE if max_queue is None else int(max_queue),
+            ADMISSION_MAX_QUEUE_WAIT if max_wait is None else float(max_wait),
+        )
+        queue = self._queues.get(model_id)
+        if queue is None or (queue.max_in_flight, queue.max_queue, queue.max_wait) != settings:
+            # Requests holding slots in a replaced queue release into that queue
+            queue = AdmissionQueue(model_id, *settings)
+            self._queues[model_id] = queue
+        return queue
+
+    def check(self, model_id: str, config: dict):
+        """Fail fast with a 429 when the predicted queue wait exceeds the deadline."""
+        queue = self.queue_for(model_id, config)
+        if queue is not None:
+            queue.check(queue.wait_budget())
+
+    @asynccontextmanager
+    async def slot(self, model_id: str, config: dict) -> AsyncIterator["AdmissionSlot"]:
+        slot = AdmissionSlot(model_id, self.queue_for(model_id, config))
+        await slot.acquire()
+        try:
+            yield slot
+        finally:
+            slot.release()
+
+    def snapshot(self) -> list[AdmissionQueue]:
+        return list(self._queues.values())
+
+
+admission = AdmissionController()
+
+
+meter.create_observable_gauge(
+    name="admission_queue_depth",
+    callbacks=[lambda options: [Observation(q.queued, {"model": q.model_id}) for q in admission.snapshot()]],
+    unit="1",
+    description="Requests waiting for an upstream slot per model"
+)
+
+meter.create_observable_gauge(
+    name="admission_in_flight",
+    callbacks=[lambda options: [Observation(q.in_flight, {"model": q.model_id}) for q in admission.snapshot()]],
+    unit="1",
+    description="Admitted upstream requests in flight per model"
+)
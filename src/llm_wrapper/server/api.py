@@ -1,6 +1,7 @@
 # src/server/api.py
 
 import json
+import math
 import time
 import uuid
 import asyncio
@@ -11,16 +12,43 @@ from fastapi import HTTPException
 
 from llm_wrapper.server.models import ChatCompletionRequest, ChatCompletionResponse
 from llm_wrapper.server.config_loader import CONFIGS
-from llm_wrapper.lib.logging import setup_logger
+from llm_wrapper.lib.logging import lazy, setup_logger
 from llm_wrapper.server.config import DEFAULT_TIMEOUT, STREAMING_TIMEOUT
+from llm_wrapper.server.admission import AdmissionSlot, Overloaded, admission
+from llm_wrapper.server.balancer import ReplicaLease, ReplicaUnavailable, balancer
+from llm_wrapper.server.cache import CacheLookup, lookup_response, payload_key, store_response
+from llm_wrapper.server.coalesce import coalescing_enabled, completion_flights, stream_flights
+from llm_wrapper.server.codec import RawCompletion, check_completion, completion_model, loads, opaque_fields
+from llm_wrapper.server.conversations import (
+    ReplyCollector,
+    conversation_history,
+    record_turn,
+    reply_message,
+    turn_messages,
+)
+from llm_wrapper.server.hedging import hedger, hedging_enabled
+from llm_wrapper.server.pool import upstream_session
+from llm_wrapper.server.ratelimit import rate_limiter
+from llm_wrapper.server.retries import RetryPolicy, with_retries
+from llm_wrapper.server.sse import ModelRewriter, relay_parsed, relay_passthrough, replay_completion
+from llm_wrapper.server.stream_metrics import CLIENT_DISCONNECTED, FINISHED, StreamRecorder
 
 logger = setup_logger("llm-server", "logs/server.log")
 
 
+class UpstreamStatusError(Exception):
+    """A non-200 upstream response to a streaming request."""
+
+    def __init__(self, status: int, text: str, headers: dict | None = None):
+        super().__init__(f"Upstream returned {status}: {text}")
+        self.status = status
+        self.text = text
+        self.headers = headers
+
 
 def get_config_or_raise(model_id: str) -> dict:
     """Fetch model config or raise 404 if not found."""
-    logger.debug(f"Retrieving config for model: {model_id}")
+    logger.debug("Retrieving config for model: %s", model_id)
     config = CONFIGS.get(model_id)
     if not config:
         available = list(CONFIGS.keys())
@@ -32,20 +60,42 @@ def get_config_or_raise(model_id: str) -> dict:
     return config
 
 
+def upstream_unavailable(e: ReplicaUnavailable) -> HTTPException:
+    """503 for a model whose replicas are all ejected, instead of waiting out a timeout."""
+    logger.warning("Failing fast for model '%s': %s", e.model_id, e)
+    return HTTPException(
+        status_code=503,
+        detail={"message": str(e), "type": "service_unavailable", "code": "upstream_unavailable"},
+        headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+    )
+
+
+def check_upstream(model_id: str, config: dict):
+    """Fail fast with a 503 when no replica of the model can take a request."""
+    try:
+        balancer.check(model_id, config["api"])
+    except ReplicaUnavailable as e:
+        raise upstream_unavailable(e)
+
+
 def build_upstream_payload(
     request: ChatCompletionRequest,
     config: dict,
     system_prompt: str | None = None
 ) -> dict:
-    """Construct OpenAI-compatible upstream payload with injected system prompt."""
-    logger.debug(f"Building upstream payload for model: {request.model}")
+    """
+    Construct OpenAI-compatible upstream payload with injected system prompt.
 
-    # Extract user messages
-    user_messages = [m for m in request.messages if m.role == "user"]
-    if not user_messages:
+    The conversation is forwarded in full: earlier turns from the conversation
+    store (for requests with a `conversation_id`), then the request's messages.
+    Tools, functions, tool_choice, function_call and logit_bias are forwarded too.
+    """
+    logger.debug("Building upstream payload for model: %s", request.model)
+
+    messages = conversation_history(request) + turn_messages(request)
+    if not any(m["role"] == "user" for m in messages):
         logger.warning("No user message provided.")
         raise HTTPException(status_code=400, detail="No user message provided.")
-    user_content = user_messages[-1].content
 
     # Determine system prompt: explicit in request takes precedence, otherwise injected or config value
     system_messages = [m for m in request.messages if m.role == "system"]
@@ -61,112 +111,310 @@ def build_upstream_payload(
     params = config.get("parameters", {})
     payload = {
         "model": config["model"]["path"],
-        "messages": [
-            {"role": "system", "content": final_system_prompt},
-            {"role": "user", "content": user_content}
-        ],
+        "messages": [{"role": "system", "content": final_system_prompt}, *messages],
         "temperature": request.temperature or params.get("temperature", 0.7),
         "top_p": request.top_p or params.get("top_p", 1.0),
         "top_k": request.top_k or params.get("top_k", 40),
         "stream": request.stream,
+        # Tools, functions and logit_bias go upstream as the client sent them
+        **opaque_fields(request),
     }
 
-    logger.debug(f"Payload constructed: {json.dumps(payload, indent=2)}")
+    logger.debug("Payload constructed: %s", lazy(json.dumps, payload, indent=2))
     return payload
 
 
 async def call_completion(
     request: ChatCompletionRequest,
-    system_prompt: str = ""
-) -> ChatCompletionResponse:
-    config = get_config_or_raise(request.model)
+    system_prompt: str = "",
+    config: dict | None = None
+) -> ChatCompletionResponse | RawCompletion:
+    # Routes pass the config their dependencies already resolved
+    if config is None:
+        config = get_config_or_raise(request.model)
     # Allow stubs/tests with older build_upstream_payload signature
     try:
         payload = build_upstream_payload(request, config, system_prompt)
     except TypeError:
         payload = build_upstream_payload(request, config)
+    # Charged only once the request is valid, so 400s do not use up the tenant's quota
+    rate_limiter.check(request.model, config, request)
 
-    try:
-        logger.info(f"Calling completion endpoint for model '{request.model}'")
-        # Create session with timeout if supported
-        timeout = aiohttp.ClientTimeout(total=DEFAULT_TIMEOUT)
-        try:
-            session_ctx = aiohttp.ClientSession(timeout=timeout)
-        except TypeError:
-            session_ctx = aiohttp.ClientSession()
-        async with session_ctx as session:
-            async with session.post(
-                str(config["api"]["url"]),
-                headers={"Content-Type": "application/json"},
-                json=payload
-            ) as response:
-                if response.status != 200:
-                    text = await response.text()
-                    logger.error(f"Upstream error {response.status}: {text}")
-                    raise HTTPException(status_code=response.status, detail={"message": text})
+    completion = await _complete(request, config, payload)
+    if request.conversation_id:
+        record_turn(request, reply_message(completion))
+    return completion
+
+
+async def _complete(
+    request: ChatCompletionRequest,
+    config: dict,
+    payload: dict
+) -> ChatCompletionResponse | RawCompletion:
+    cached = lookup_response(request.model, payload, config)
+    if cached.response is not None:
+        logger.info("Serving cached completion for model '%s'", request.model)
+        return cached.response
+
+    if coalescing_enabled(config):
+        return await completion_flights.do(
+            cached.key or payload_key(request.model, payload),
+            lambda: _admitted_completion(request, config, payload, cached),
+            request.model
+        )
+    return await _admitted_completion(request, config, payload, cached)
 
-                result = await response.json()
-                logger.info(f"Received response for model '{request.model}'")
-                return ChatCompletionResponse(**result)
 
+async def _admitted_completion(
+    request: ChatCompletionRequest,
+    config: dict,
+    payload: dict,
+    cached: CacheLookup
+) -> ChatCompletionResponse | RawCompletion:
+    # Admission rejections (429) are raised before the upstream error handling
+    async with admission.slot(request.model, config) as slot:
+        return await _post_completion(request, config, payload, cached, slot)
+
+
+async def _post_completion(
+    request: ChatCompletionRequest,
+    config: dict,
+    payload: dict,
+    cached: CacheLookup,
+    slot: AdmissionSlot
+) -> ChatCompletionResponse | RawCompletion:
+    try:
+        logger.info("Calling completion endpoint for model '%s'", request.model)
+        # Backoffs release the admission slot; taking it back may be rejected with a 429
+        completion = await with_retries(
+            request.model, config, lambda tried: _post_upstream(request, config, payload, tried), slot.idle
+        )
+        store_response(cached, completion)
+        return completion
+
+    except Overloaded:
+        raise
+    except ReplicaUnavailable as e:
+        raise upstream_unavailable(e)
     except Exception as e:
         logger.exception(f"Error during completion for model '{request.model}': {e}")
         raise HTTPException(status_code=500, detail={"message": str(e)})
 
 
+async def _post_upstream(
+    request: ChatCompletionRequest,
+    config: dict,
+    payload: dict,
+    tried: set[str]
+) -> ChatCompletionResponse | RawCompletion:
+    """One (possibly hedged) completion attempt, avoiding the replicas in `tried`."""
+    def post(replica: ReplicaLease):
+        tried.add(replica.url)
+        return _post_replica(replica, request, config, payload)
+
+    if hedging_enabled(config):
+        return await hedger.call(request.model, config, post, exclude=tried, payload=payload)
+    with balancer.lease(request.model, config["api"], exclude=tried, payload=payload) as replica:
+        return await post(replica)
+
+
+async def _post_replica(
+    replica: ReplicaLease,
+    request: ChatCompletionRequest,
+    config: dict,
+    payload: dict
+) -> ChatCompletionResponse | RawCompletion:
+    """One completion call to a leased replica."""
+    async with upstream_session(replica.url, config["api"], DEFAULT_TIMEOUT) as session:
+        async with session.post(
+            replica.url,
+            headers={"Content-Type": "application/json"},
+            json=payload
+        ) as response:
+            if response.status != 200:
+                text = await response.text()
+                logger.error(f"Upstream error {response.status}: {text}")
+                raise HTTPException(status_code=response.status, detail={"message": text}, headers=_retry_after(response))
+
+            if (config.get("completion") or {}).get("passthrough"):
+                completion = _raw_completion(await response.read(), request, config)
+            else:
+                result = await response.json()
+                completion = ChatCompletionResponse(**result)
+            logger.info("Received response for model '%s' from %s", request.model, replica.url)
+            return completion
+
+
+def _retry_after(response) -> dict | None:
+    """The upstream Retry-After header, kept so retries can honour it."""
+    value = (getattr(response, "headers", None) or {}).get("Retry-After")
+    return {"Retry-After": value} if value else None
+
+
+def _raw_completion(body: bytes, request: ChatCompletionRequest, config: dict) -> RawCompletion:
+    """Check the upstream body's structure and keep it as bytes."""
+    check_completion(loads(body))
+    if config["completion"].get("rewrite_model"):
+        body = ModelRewriter(config["model"]["path"], request.model)(body)
+    return RawCompletion(body)
+
+
+def _relay_events(content, request: ChatCompletionRequest, config: dict):
+    """Pick the SSE relay for a model: raw byte passthrough or parse/re-serialize."""
+    streaming = config.get("streaming") or {}
+    if not streaming.get("passthrough"):
+        return relay_parsed(content)
+    rewrite = None
+    if streaming.get("rewrite_model"):
+        rewrite = ModelRewriter(config["model"]["path"], request.model)
+    return relay_passthrough(content, rewrite)
+
+
 async def stream_completion(
     request: ChatCompletionRequest,
-    system_prompt: str = ""
-) -> AsyncGenerator[str, None]:
-    config = get_config_or_raise(request.model)
-    # Allow stubs/tests with older build_upstream_payload signature
-    try:
-        payload = build_upstream_payload(request, config, system_prompt)
-    except TypeError:
-        payload = build_upstream_payload(request, config)
+    system_prompt: str = "",
+    config: dict | None = None,
+    payload: dict | None = None
+) -> AsyncGenerator[str | bytes, None]:
+    if config is None:
+        config = get_config_or_raise(request.model)
+    # Routes build (and validate) the payload before the response starts
+    if payload is None:
+        # Allow stubs/tests with older build_upstream_payload signature
+        try:
+            payload = build_upstream_payload(request, config, system_prompt)
+        except TypeError:
+            payload = build_upstream_payload(request, config)
     payload["stream"] = True
 
     created = int(time.time())
     chat_id = f"chatcmpl-{uuid.uuid4().hex}"
 
-    logger.info(f"Streaming response started for chat ID {chat_id} model '{request.model}'")
+    logger.info("Streaming response started for chat ID %s model '%s'", chat_id, request.model)
+    recorder = StreamRecorder(request.model)
+    reply = ReplyCollector() if request.conversation_id else None
+
+    try:
+        yield f"data: {json.dumps({'id': chat_id, 'object': 'chat.completion.chunk', 'created': created, 'model': request.model, 'choices': [{'index': 0, 'delta': {'role': 'assistant'}}]})}\n\n"
 
-    yield f"data: {json.dumps({'id': chat_id, 'object': 'chat.completion.chunk', 'created': created, 'model': request.model, 'choices': [{'index': 0, 'delta': {'role': 'assistant'}}]})}\n\n"
+        cached = lookup_response(request.model, payload, config)
+        if cached.response is not None:
+            recorder.replica = "cache"
+            if reply is not None:
+                record_turn(request, reply_message(cached.response))
+            for event in replay_completion(completion_model(cached.response), chat_id, created, request.model):
+                recorder.observe(event)
+                yield event
+            yield "data: [DONE]\n\n"
+            logger.info("Replayed cached completion for chat ID %s", chat_id)
+            return
+
+        if coalescing_enabled(config):
+            # Followers report under "coalesced"; the leader's recorder sees the replica
+            recorder.replica = "coalesced"
+            events = stream_flights.subscribe(
+                cached.key or payload_key(request.model, payload),
+                lambda: _stream_upstream(request, config, payload, chat_id, recorder),
+                request.model
+            )
+        else:
+            events = _stream_upstream(request, config, payload, chat_id, recorder)
+        async for event in events:
+            recorder.observe(event)
+            if reply is not None:
+                reply.observe(event)
+            yield event
+        if reply is not None and recorder.outcome == FINISHED:
+            record_turn(request, reply.message())
+    except (GeneratorExit, asyncio.CancelledError):
+        recorder.outcome = CLIENT_DISCONNECTED
+        raise
+    finally:
+        recorder.finish()
+
+
+async def _stream_upstream(
+    request: ChatCompletionRequest,
+    config: dict,
+    payload: dict,
+    chat_id: str,
+    recorder: StreamRecorder | None = None
+) -> AsyncGenerator[str | bytes, None]:
+    """Relay the upstream SSE stream, always ending with a [DONE] event."""
+    def open_stream(replica: ReplicaLease):
+        retry.tried.add(replica.url)
+        return _stream_replica(replica, request, config, payload, chat_id, recorder)
 
     try:
-        # Create session with streaming timeout if supported
-        timeout = aiohttp.ClientTimeout(total=STREAMING_TIMEOUT)
-        try:
-            session_ctx = aiohttp.ClientSession(timeout=timeout)
-        except TypeError:
-            session_ctx = aiohttp.ClientSession()
-        async with session_ctx as session:
-            async with session.post(
-                str(config["api"]["url"]),
-                headers={"Content-Type": "application/json"},
-                json=payload
-            ) as response:
-                if response.status != 200:
-                    text = await response.text()
-                    logger.error(f"Upstream streaming error {response.status}: {text}")
-                    yield f"data: {json.dumps({'error': text})}\n\n"
-                    yield "data: [DONE]\n\n"
-                    return
-
-                async for line in response.content:
-                    decoded = line.decode("utf-8").strip()
-                    if decoded.startswith("data: ") and decoded != "data: [DONE]":
-                        try:
-                            chunk = json.loads(decoded[6:])
-                            yield f"data: {json.dumps(chunk)}\n\n"
-                        except json.JSONDecodeError as e:
-                            logger.warning(f"Failed to decode stream chunk: {e}")
-
-                yield "data: [DONE]\n\n"
-                logger.info(f"Streaming response complete for chat ID {chat_id}")
+        async with admission.slot(request.model, config) as slot:
+            retry = RetryPolicy(request.model, config)
+            while True:
+                if hedging_enabled(config):
+                    events = hedger.stream(request.model, config, open_stream, exclude=retry.tried, payload=payload)
+                else:
+                    events = _leased_stream(request, config, payload, open_stream, exclude=retry.tried)
+                relayed = False
+                try:
+                    async for event in events:
+                        relayed = True
+                        yield event
+                    break
+                except Exception as e:
+                    # Only retry while nothing from this upstream has reached the client
+                    delay = None if relayed else retry.delay(e)
+                    if delay is None:
+                        raise
+                    # Free the admission slot while backing off
+                    await slot.idle(delay)
+            yield "data: [DONE]\n\n"
 
+    except UpstreamStatusError as e:
+        yield f"data: {json.dumps({'error': e.text})}\n\n"
+        yield "data: [DONE]\n\n"
     except Exception as e:
         error_json = json.dumps({"error": str(e)})
         logger.exception(f"Streaming error for chat ID {chat_id}: {e}")
         yield f"data: {error_json}\n\n"
-        yield "data: [DONE]\n\n"
\ No newline at end of file
+        yield "data: [DONE]\n\n"
+
+
+async def _leased_stream(
+    request: ChatCompletionRequest,
+    config: dict,
+    payload: dict,
+    open_stream,
+    exclude: set[str]
+) -> AsyncGenerator[str | bytes, None]:
+    with balancer.lease(request.model, config["api"], exclude=exclude, payload=payload) as replica:
+        async for event in open_stream(replica):
+            yield event
+
+
+async def _stream_replica(
+    replica: ReplicaLease,
+    request: ChatCompletionRequest,
+    config: dict,
+    payload: dict,
+    chat_id: str,
+    recorder: StreamRecorder | None = None
+) -> AsyncGenerator[str | bytes, None]:
+    """Relay one leased replica's SSE events (without the final [DONE])."""
+    async with upstream_session(replica.url, config["api"], STREAMING_TIMEOUT) as session:
+        async with session.post(
+            replica.url,
+            headers={"Content-Type": "application/json"},
+            json=payload
+        ) as response:
+            replica.record_latency()
+            if response.status != 200:
+                text = await response.text()
+                logger.error(f"Upstream streaming error {response.status}: {text}")
+                raise UpstreamStatusError(response.status, text, _retry_after(response))
+
+            async for event in _relay_events(response.content, request, config):
+                if recorder is not None:
+                    recorder.replica = replica.url
+                    recorder.affinity = replica.affinity or "none"
+                yield event
+
+            logger.info("Streaming response complete for chat ID %s from %s", chat_id, replica.url)
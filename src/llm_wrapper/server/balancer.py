@@ -0,0 +1,406 @@
+# src/server/balancer.py
+
+import bisect
+import hashlib
+import math
+import random
+import statistics
+import time
+from collections.abc import Collection
+from typing import NamedTuple
+
+from opentelemetry import metrics
+from opentelemetry.metrics import Observation
+
+from llm_wrapper.lib.logging import setup_logger
+from llm_wrapper.server.breaker import STATE_VALUES, BreakerSettings, CircuitBreaker, CLOSED, OPEN, failed
+
+logger = setup_logger("llm-server", "logs/server.log")
+meter = metrics.get_meter("llm-wrapper")
+
+LEAST_OUTSTANDING = "least_outstanding"
+PEAK_EWMA = "peak_ewma"
+PREFIX_HASH = "prefix_hash"
+
+# Ring points per unit of replica weight for the prefix-hash policy
+VIRTUAL_NODES = 100
+# Affinity of a prefix-routed request: on the prefix's home replica, or spilled elsewhere
+HOME = "home"
+SPILLED = "spilled"
+
+# Decay window for the peak-EWMA latency estimate
+EWMA_DECAY_SECONDS = 10.0
+# Latency assumed for replicas that have not answered yet
+DEFAULT_LATENCY_SECONDS = 0.5
+
+replica_requests_counter = meter.create_counter(
+    name="upstream_replica_requests_total",
+    unit="1",
+    description="Upstream requests sent to each replica"
+)
+
+replica_latency_histogram = meter.create_histogram(
+    name="upstream_replica_latency_seconds",
+    unit="s",
+    description="Upstream latency per replica (time to response headers for streams)"
+)
+
+
+unavailable_counter = meter.create_counter(
+    name="upstream_unavailable_total",
+    unit="1",
+    description="Requests failed fast because every replica of the model was ejected"
+)
+
+
+class ReplicaUnavailable(Exception):
+    """Every replica of a model is ejected (circuit open)."""
+
+    def __init__(self, model_id: str, retry_after: float):
+        super().__init__(f"No healthy upstream for model '{model_id}'; retry in {retry_after:.0f}s")
+        self.model_id = model_id
+        self.retry_after = retry_after
+
+
+prefix_routes_counter = meter.create_counter(
+    name="upstream_prefix_routes_total",
+    unit="1",
+    description="Prefix-hash routing decisions: home replica, or spilled over because it was busy or ejected"
+)
+
+
+class PrefixSettings(NamedTuple):
+    # Characters of the leading messages (system prompt first) hashed into the route key
+    chars: int
+    # Bounded load: a replica takes a request only below load_factor times its fair share
+    load_factor: float
+
+    @classmethod
+    def from_api_config(cls, api_config: dict) -> "PrefixSettings":
+        section = api_config.get("prefix_hash") or {}
+        return cls(
+            chars=int(section.get("prefix_chars") or 2048),
+            load_factor=float(section.get("load_factor") or 1.25),
+        )
+
+
+def prefix_key(payload: dict, chars: int) -> bytes:
+    """Route key of an upstream payload: the first `chars` characters of its messages."""
+    parts = []
+    size = 0
+    for message in payload.get("messages") or []:
+        content = str(message.get("content") or "")
+        parts.append(f"{message.get('role', '')}:{content}")
+        size += len(content)
+        if size >= chars:
+            break
+    return "\x00".join(parts)[:chars].encode("utf-8", "surrogatepass")
+
+
+def _ring_hash(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big")
+
+
+def endpoints_of(api_config: dict) -> list[dict]:
+    """Replica endpoints of a model: `api.endpoints`, or the single `api.url`."""
+    endpoints = api_config.get("endpoints")
+    if endpoints:
+        return [
+            {
+                "url": str(e["url"]),
+                "weight": float(e.get("weight", 1.0)),
+                "max_in_flight": e.get("max_in_flight"),
+            }
+            for e in endpoints
+        ]
+    return [{"url": str(api_config["url"]), "weight": 1.0, "max_in_flight": None}]
+
+
+class Replica:
+    """Load statistics for one upstream endpoint."""
+
+    def __init__(self, url: str, weight: float = 1.0, max_in_flight: int | None = None):
+        self.url = url
+        self.weight = weight if weight > 0 else 1.0
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.ewma = DEFAULT_LATENCY_SECONDS
+        self._ewma_at = time.monotonic()
+        self.samples = 0
+        self.breaker = CircuitBreaker()
+
+    def observe(self, latency: float):
+        """Fold a latency sample into the peak-sensitive EWMA."""
+        now = time.monotonic()
+        self.samples += 1
+        if latency > self.ewma:
+            # Peak sensitivity: react to slowdowns immediately, recover gradually
+            self.ewma = latency
+        else:
+            decay = math.exp(-(now - self._ewma_at) / EWMA_DECAY_SECONDS)
+            self.ewma = self.ewma * decay + latency * (1 - decay)
+        self._ewma_at = now
+
+    def saturated(self) -> bool:
+        return self.max_in_flight is not None and self.in_flight >= self.max_in_flight
+
+    def cost(self, policy: str) -> float:
+        load = (self.in_flight + 1) / self.weight
+        if policy == PEAK_EWMA:
+            return self.ewma * load
+        return load
+
+
+class ReplicaLease:
+    """Tracks one request against a replica; use as a context manager."""
+
+    def __init__(self, replica_set: "ReplicaSet", replica: Replica):
+        self.replica_set = replica_set
+        self.replica = replica
+        self.url = replica.url
+        self._started = time.monotonic()
+        self._observed = False
+        self._probe = False
+        # HOME or SPILLED under the prefix-hash policy, None otherwise
+        self.affinity: str | None = None
+
+    def record_latency(self):
+        """Record latency now (e.g. when stream headers arrive) instead of on exit."""
+        if self._observed:
+            return
+        self._observed = True
+        latency = time.monotonic() - self._started
+        self.replica.observe(latency)
+        replica_latency_histogram.record(latency, self.replica_set.attributes(self.replica))
+
+    def __enter__(self) -> "ReplicaLease":
+        self.replica.in_flight += 1
+        self._probe = self.replica.breaker.on_start()
+        replica_requests_counter.add(1, self.replica_set.attributes(self.replica))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.replica.in_flight -= 1
+        if exc_type is None:
+            self.record_latency()
+        self.replica.breaker.record(failed(exc), self._probe)
+
+
+class ReplicaSet:
+    """The replicas serving one model and the policy used to choose between them."""
+
+    def __init__(
+        self,
+        model_id: str,
+        endpoints: list[dict],
+        policy: str = LEAST_OUTSTANDING,
+        breaker: BreakerSettings | None = None,
+        prefix: PrefixSettings | None = None
+    ):
+        self.model_id = model_id
+        self.policy = policy
+        self.prefix = prefix or PrefixSettings.from_api_config({})
+        self._ring: tuple[list[int], list[Replica]] | None = None
+        self.replicas = [Replica(e["url"], e["weight"], e.get("max_in_flight")) for e in endpoints]
+        # The `api` config dict this set was built from, for a cheap identity check
+        self.source: dict | None = None
+        self.configure_breakers(breaker or BreakerSettings.from_api_config({}))
+        self._outliers_at = time.monotonic()
+
+    def configure_breakers(self, settings: BreakerSettings):
+        self.breaker_settings = settings
+        for replica in self.replicas:
+            replica.breaker.attributes = self.attributes(replica)
+            replica.breaker.configure(settings)
+
+    def signature(self) -> tuple:
+        return (self.policy, self.breaker_settings, self.prefix, tuple((r.url, r.weight, r.max_in_flight) for r in self.replicas))
+
+    def attributes(self, replica: Replica) -> dict:
+        return {"model": self.model_id, "replica": replica.url}
+
+    def available(self, now: float) -> list[Replica]:
+        """Replicas whose breaker lets a request through; raises when there are none."""
+        if self.breaker_settings.enabled and now - self._outliers_at >= self.breaker_settings.outlier_interval:
+            self._outliers_at = now
+            self.eject_outliers(now)
+        replicas = [r for r in self.replicas if r.breaker.allow(now)]
+        if not replicas:
+            unavailable_counter.add(1, {"model": self.model_id})
+            raise ReplicaUnavailable(self.model_id, min(r.breaker.retry_after(now) for r in self.replicas))
+        return replicas
+
+    def eject_outliers(self, now: float):
+        """Eject replicas whose latency is `slow_factor` times the median of the others."""
+        factor = self.breaker_settings.slow_factor
+        measured = [r for r in self.replicas if r.samples]
+        if not factor or len(measured) < 2:
+            return
+        max_ejected = int(len(self.replicas) * self.breaker_settings.max_ejected_percent / 100)
+        ejected = sum(r.breaker.state == OPEN for r in self.replicas)
+        for replica in sorted(measured, key=lambda r: r.ewma, reverse=True):
+            if ejected >= max_ejected:
+                return
+            median = statistics.median(r.ewma for r in measured if r is not replica)
+            if replica.breaker.state == CLOSED and replica.ewma > factor * median:
+                replica.breaker.trip("slow", now)
+                ejected += 1
+
+    def _cheapest(self, candidates: list[Replica]) -> Replica:
+        costs = [r.cost(self.policy) for r in candidates]
+        best = min(costs)
+        return random.choice([r for r, c in zip(candidates, costs) if c == best])
+
+    def pick(self, exclude: Collection[str] = (), key: bytes | None = None) -> Replica:
+        """
+        Cheapest replica under the policy; ties are broken randomly.
+
+        Ejected replicas are never picked. Replicas whose url is in `exclude` are
+        avoided, and replicas at their max_in_flight skipped, while any other has room.
+        Under the prefix-hash policy a `key` routes to its replica on the hash ring.
+        """
+        available = self.available(time.monotonic())
+        if len(available) == 1:
+            return available[0]
+        candidates = [r for r in available if r.url not in exclude] or available
+        candidates = [r for r in candidates if not r.saturated()] or candidates
+        if key is not None and self.policy == PREFIX_HASH:
+            return self._route(key, candidates)
+        return self._cheapest(candidates)
+
+    def routing_key(self, payload: dict | None) -> bytes | None:
+        if payload is None or self.policy != PREFIX_HASH:
+            return None
+        return prefix_key(payload, self.prefix.chars)
+
+    def _ring_points(self) -> tuple[list[int], list[Replica]]:
+        if self._ring is None:
+            points = sorted(
+                (_ring_hash(f"{r.url}#{i}".encode()), index)
+                for index, r in enumerate(self.replicas)
+                for i in range(max(1, round(VIRTUAL_NODES * r.weight)))
+            )
+            self._ring = ([h for h, _ in points], [self.replicas[i] for _, i in points])
+        return self._ring
+
+    def _walk(self, key: bytes):
+        """Distinct replicas in ring order, starting at the key's position."""
+        hashes, owners = self._ring_points()
+        start = bisect.bisect(hashes, _ring_hash(key))
+        seen = set()
+        for offset in range(len(owners)):
+            replica = owners[(start + offset) % len(owners)]
+            if replica.url not in seen:
+                seen.add(replica.url)
+                yield replica
+                if len(seen) == len(self.replicas):
+                    return
+
+    def home(self, key: bytes) -> Replica:
+        return next(self._walk(key))
+
+    def _route(self, key: bytes, candidates: list[Replica]) -> Replica:
+        """Consistent hashing with bounded loads: the first replica on the ring below its load bound."""
+        allowed = {r.url for r in candidates}
+        total = sum(r.in_flight for r in self.replicas) + 1
+        weight = sum(r.weight for r in candidates)
+        for replica in self._walk(key):
+            bound = math.ceil(self.prefix.load_factor * total * replica.weight / weight)
+            if replica.url in allowed and replica.in_flight + 1 <= bound:
+                return replica
+        return self._cheapest(candidates)
+
+    def alternate(self, exclude: Collection[str]) -> Replica | None:
+        """Cheapest healthy replica outside `exclude` with room for another request, if any."""
+        now = time.monotonic()
+        candidates = [r for r in self.replicas if r.url not in exclude and not r.saturated() and r.breaker.allow(now)]
+        return self._cheapest(candidates) if candidates else None
+
+    def lease(
+        self,
+        exclude: Collection[str] = (),
+        replica: Replica | None = None,
+        payload: dict | None = None
+    ) -> ReplicaLease:
+        key = self.routing_key(payload) if replica is None else None
+        lease = ReplicaLease(self, replica or self.pick(exclude, key))
+        if key is not None:
+            lease.affinity = HOME if lease.replica is self.home(key) else SPILLED
+            prefix_routes_counter.add(1, {"model": self.model_id, "result": lease.affinity})
+        return lease
+
+
+class Balancer:
+    """Replica sets per model, rebuilt when a model's endpoints change."""
+
+    def __init__(self):
+        self._sets: dict[str, ReplicaSet] = {}
+
+    def replica_set(self, model_id: str, api_config: dict) -> ReplicaSet:
+        current = self._sets.get(model_id)
+        if current is not None and current.source is api_config:
+            return current
+        policy = api_config.get("balancer") or LEAST_OUTSTANDING
+        candidate = ReplicaSet(
+            model_id,
+            endpoints_of(api_config),
+            policy,
+            BreakerSettings.from_api_config(api_config),
+            PrefixSettings.from_api_config(api_config)
+        )
+        candidate.source = api_config
+        if current is not None and current.signature() == candidate.signature():
+            current.source = api_config
+            return current
+        if current is not None:
+            # Keep load statistics for replicas that survive a config change
+            previous = {r.url: r for r in current.replicas}
+            candidate.replicas = [previous.get(r.url, r) for r in candidate.replicas]
+            for replica, endpoint in zip(candidate.replicas, endpoints_of(api_config)):
+                replica.weight = endpoint["weight"] if endpoint["weight"] > 0 else 1.0
+                replica.max_in_flight = endpoint.get("max_in_flight")
+            candidate.configure_breakers(candidate.breaker_settings)
+            logger.info("Replica set for model '%s' updated: %s", model_id, [r.url for r in candidate.replicas])
+        self._sets[model_id] = candidate
+        return candidate
+
+    def lease(
+        self,
+        model_id: str,
+        api_config: dict,
+        exclude: Collection[str] = (),
+        payload: dict | None = None
+    ) -> ReplicaLease:
+        return self.replica_set(model_id, api_config).lease(exclude, payload=payload)
+
+    def check(self, model_id: str, api_config: dict):
+        """Raise ReplicaUnavailable when every replica of the model is ejected."""
+        self.replica_set(model_id, api_config).available(time.monotonic())
+
+    def snapshot(self) -> list[tuple[ReplicaSet, Replica]]:
+        return [(s, r) for s in self._sets.values() for r in s.replicas]
+
+
+balancer = Balancer()
+
+
+meter.create_observable_gauge(
+    name="upstream_replica_in_flight",
+    callbacks=[lambda options: [Observation(r.in_flight, s.attributes(r)) for s, r in balancer.snapshot()]],
+    unit="1",
+    description="Requests currently outstanding per replica"
+)
+
+meter.create_observable_gauge(
+    name="upstream_replica_ewma_latency_seconds",
+    callbacks=[lambda options: [Observation(r.ewma, s.attributes(r)) for s, r in balancer.snapshot()]],
+    unit="s",
+    description="Peak-EWMA latency estimate per replica"
+)
+
+meter.create_observable_gauge(
+    name="upstream_circuit_state",
+    callbacks=[lambda options: [Observation(STATE_VALUES[r.breaker.state], s.attributes(r)) for s, r in balancer.snapshot()]],
+    unit="1",
+    description="Circuit breaker state per replica (0 closed, 1 half-open, 2 open)"
+)
@@ -0,0 +1,670 @@
+# src/server/batches.py
+
+import asyncio
+import math
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator
+
+from fastapi import HTTPException
+from opentelemetry import metrics
+from opentelemetry.metrics import Observation
+from pydantic import ValidationError
+
+from llm_wrapper.lib.logging import setup_logger
+from llm_wrapper.server.admission import admission
+from llm_wrapper.server.api import call_completion, get_config_or_raise
+from llm_wrapper.server.codec import RawCompletion, dumps, loads
+from llm_wrapper.server.context import RequestContext, _current_context
+from llm_wrapper.server.config import (
+    BATCH_DIR,
+    BATCH_JOB_CONCURRENCY,
+    BATCH_JOB_MAX_SHARE,
+    BATCH_MAX_FILE_BYTES,
+    BATCH_MAX_LINES,
+    BATCH_POLL_INTERVAL,
+)
+from llm_wrapper.server.handlers.batch import _item_error
+from llm_wrapper.server.models import (
+    BatchList,
+    BatchObject,
+    ChatCompletionRequest,
+    CreateBatchRequest,
+    FileObject,
+)
+
+# Cross-process job ownership (several WORKERS share BATCH_DIR); POSIX only
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - depends on the platform
+    fcntl = None
+
+logger = setup_logger("llm-server", "logs/server.log")
+meter = metrics.get_meter("llm-wrapper")
+
+VALIDATING = "validating"
+FAILED = "failed"
+IN_PROGRESS = "in_progress"
+FINALIZING = "finalizing"
+COMPLETED = "completed"
+EXPIRED = "expired"
+CANCELLING = "cancelling"
+CANCELLED = "cancelled"
+TERMINAL = frozenset({FAILED, COMPLETED, EXPIRED, CANCELLED})
+
+COMPLETION_WINDOW_SECONDS = 24 * 3600
+# Input problems reported before validation gives up
+MAX_VALIDATION_ERRORS = 100
+# Seconds between progress writes to a running job's state file
+CHECKPOINT_INTERVAL = 1.0
+# Seconds a job waits before re-checking a busy model
+YIELD_INTERVAL = 0.1
+# Bytes of input lines read per trip to the file thread
+READ_CHUNK_BYTES = 256 * 1024
+
+batch_requests_counter = meter.create_counter(
+    name="batch_job_requests_total",
+    unit="1",
+    description="Batch job requests processed, by model and result (completed, failed)"
+)
+
+batch_yield_counter = meter.create_counter(
+    name="batch_job_yields_total",
+    unit="1",
+    description="Times a batch job request waited for interactive traffic on a busy model"
+)
+
+
+def not_found(kind: str, object_id: str) -> HTTPException:
+    return HTTPException(
+        status_code=404,
+        detail={"message": f"No {kind} found with id '{object_id}'.", "type": "invalid_request_error"}
+    )
+
+
+def invalid_request(message: str, status_code: int = 400) -> HTTPException:
+    return HTTPException(status_code=status_code, detail={"message": message, "type": "invalid_request_error"})
+
+
+class BatchStore:
+    """
+    Uploaded files and batch job state under one directory.
+
+    `files/<id>.jsonl` holds a file's content and `files/<id>.json` its FileObject;
+    `<batch id>.json` holds a BatchObject and `<batch id>.owner` the tenant that
+    created the job (kept out of the BatchObject, which any caller can read).
+    JSON documents are replaced atomically.
+    Job output is appended to its output and error files as requests finish, which
+    makes those files the job's checkpoint.
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    @property
+    def files_dir(self) -> Path:
+        return self.root / "files"
+
+    def file_path(self, file_id: str) -> Path:
+        return self.files_dir / f"{file_id}.jsonl"
+
+    def _batch_path(self, batch_id: str) -> Path:
+        return self.root / f"{batch_id}.json"
+
+    def cancel_marker(self, batch_id: str) -> Path:
+        return self.root / f"{batch_id}.cancel"
+
+    def _owner_path(self, batch_id: str) -> Path:
+        return self.root / f"{batch_id}.owner"
+
+    @staticmethod
+    def _check_id(object_id: str, prefix: str) -> bool:
+        return object_id.startswith(prefix) and object_id[len(prefix):].isalnum()
+
+    def _write_json(self, path: Path, document: str):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(document)
+        os.replace(tmp, path)
+
+    async def create_file(self, filename: str, purpose: str, chunks: AsyncIterable[bytes]) -> FileObject:
+        """Store an upload, rejecting it once it grows past BATCH_MAX_FILE_BYTES."""
+        file = FileObject(id=f"file-{uuid.uuid4().hex}", bytes=0, created_at=int(time.time()), filename=filename, purpose=purpose)
+        path = self.file_path(file.id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".upload")
+        try:
+            with open(tmp, "wb") as out:
+                async for chunk in chunks:
+                    file.bytes += len(chunk)
+                    if file.bytes > BATCH_MAX_FILE_BYTES:
+                        raise invalid_request(f"File exceeds {BATCH_MAX_FILE_BYTES} bytes.", status_code=413)
+                    out.write(chunk)
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+        self.save_file(file)
+        return file
+
+    def save_file(self, file: FileObject):
+        self._write_json(self.files_dir / f"{file.id}.json", file.model_dump_json())
+
+    def get_file(self, file_id: str) -> FileObject:
+        path = self.files_dir / f"{file_id}.json"
+        if not self._check_id(file_id, "file-") or not path.exists():
+            raise not_found("file", file_id)
+        return FileObject.model_validate_json(path.read_bytes())
+
+    def save_batch(self, batch: BatchObject):
+        self.write_batch(batch.id, batch.model_dump_json())
+
+    def write_batch(self, batch_id: str, document: str):
+        self._write_json(self._batch_path(batch_id), document)
+
+    def get_batch(self, batch_id: str) -> BatchObject:
+        path = self._batch_path(batch_id)
+        if not self._check_id(batch_id, "batch_") or not path.exists():
+            raise not_found("batch", batch_id)
+        batch = BatchObject.model_validate_json(path.read_bytes())
+        if batch.status not in TERMINAL and self.cancel_marker(batch_id).exists():
+            # Cancelled through another worker; the owning worker is winding it down
+            batch.status = CANCELLING
+        return batch
+
+    def batch_ids(self) -> list[str]:
+        if not self.root.exists():
+            return []
+        return [p.stem for p in self.root.glob("batch_*.json")]
+
+    def list_batches(self, after: str | None = None, limit: int = 20) -> BatchList:
+        """Batches newest first, paginated by the last id of the previous page."""
+        batches = sorted(
+            (self.get_batch(batch_id) for batch_id in self.batch_ids()),
+            key=lambda b: (b.created_at, b.id),
+            reverse=True
+        )
+        if after is not None:
+            ids = [b.id for b in batches]
+            batches = batches[ids.index(after) + 1:] if after in ids else []
+        page = batches[:limit]
+        return BatchList(
+            data=page,
+            first_id=page[0].id if page else None,
+            last_id=page[-1].id if page else None,
+            has_more=len(batches) > limit
+        )
+
+    def create_batch(self, request: CreateBatchRequest, owner: str | None = None) -> BatchObject:
+        """Create a job; its requests run as `owner` (the creator's API-key tenant)."""
+        input_file = self.get_file(request.input_file_id)
+        if input_file.purpose != "batch":
+            raise invalid_request(f"File '{input_file.id}' was not uploaded with purpose 'batch'.")
+        now = int(time.time())
+        batch = BatchObject(
+            id=f"batch_{uuid.uuid4().hex}",
+            endpoint=request.endpoint,
+            input_file_id=input_file.id,
+            completion_window=request.completion_window,
+            output_file_id=f"file-{uuid.uuid4().hex}",
+            error_file_id=f"file-{uuid.uuid4().hex}",
+            created_at=now,
+            expires_at=now + COMPLETION_WINDOW_SECONDS,
+            metadata=request.metadata
+        )
+        if owner is not None:
+            # Written first: a job file without its owner would run anonymously
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._owner_path(batch.id).write_text(owner)
+        self.save_batch(batch)
+        return batch
+
+    def owner(self, batch_id: str) -> str | None:
+        """The tenant a job's requests are charged to (None for jobs created without an API key)."""
+        path = self._owner_path(batch_id)
+        return path.read_text() if path.exists() else None
+
+    def cancel_batch(self, batch_id: str) -> BatchObject:
+        batch = self.get_batch(batch_id)
+        if batch.status in TERMINAL:
+            raise invalid_request(f"Batch '{batch_id}' is already {batch.status}.", status_code=409)
+        self.cancel_marker(batch_id).touch()
+        batch.status = CANCELLING
+        return batch
+
+    def try_lock(self, batch_id: str):
+        """An open lock file owning the job for this process, or None if another process owns it."""
+        handle = open(self.root / f"{batch_id}.lock", "a")
+        if fcntl is None:
+            return handle
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return None
+        return handle
+
+    def unlock(self, batch_id: str, handle, remove: bool = False):
+        """Release a job lock, removing its file once the job is finished."""
+        if remove:
+            # Unlinked while still held, so no other process can lock the old file meanwhile
+            (self.root / f"{batch_id}.lock").unlink(missing_ok=True)
+        handle.close()
+
+
+def validate_input(path: Path, endpoint: str) -> tuple[int, list[dict]]:
+    """Count the requests of a batch input file and collect (up to 100) problems with its lines."""
+    errors = []
+    seen: set[str] = set()
+    total = 0
+
+    def error(line: int, code: str, message: str):
+        if len(errors) < MAX_VALIDATION_ERRORS:
+            errors.append({"code": code, "message": message, "line": line})
+
+    with open(path, "rb") as lines:
+        for number, raw in enumerate(lines, 1):
+            if not raw.strip():
+                continue
+            total += 1
+            try:
+                item = loads(raw)
+            except ValueError:
+                error(number, "invalid_json", "Line is not valid JSON.")
+                continue
+            if not isinstance(item, dict) or not isinstance(item.get("custom_id"), str):
+                error(number, "missing_custom_id", "Line has no string 'custom_id'.")
+                continue
+            if item["custom_id"] in seen:
+                error(number, "duplicate_custom_id", f"Duplicate custom_id '{item['custom_id']}'.")
+            seen.add(item["custom_id"])
+            if item.get("method") != "POST" or item.get("url") != endpoint:
+                error(number, "invalid_url", f"Requests must be POST {endpoint}.")
+                continue
+            try:
+                ChatCompletionRequest.model_validate(item.get("body"))
+            except ValidationError as e:
+                error(number, "invalid_request", str(e).splitlines()[0])
+    if total == 0:
+        errors.append({"code": "empty_file", "message": "Input file has no requests.", "line": None})
+    elif total > BATCH_MAX_LINES:
+        errors.append({"code": "too_many_requests", "message": f"Input has more than {BATCH_MAX_LINES} requests.", "line": None})
+    return total, errors
+
+
+def read_checkpoint(path: Path) -> set[str]:
+    """custom_ids already written to a job output file, dropping a partially written last line."""
+    done: set[str] = set()
+    if not path.exists():
+        return done
+    with open(path, "rb+") as lines:
+        offset = 0
+        for raw in lines:
+            if not raw.endswith(b"\n"):
+                break
+            try:
+                done.add(loads(raw)["custom_id"])
+            except (ValueError, KeyError, TypeError):
+                break
+            offset += len(raw)
+        lines.truncate(offset)
+    return done
+
+
+async def _items(path: Path) -> AsyncIterator[dict]:
+    """Input lines of a job, read off the event loop in chunks."""
+    lines = await asyncio.to_thread(open, path, "rb")
+    try:
+        while chunk := await asyncio.to_thread(lines.readlines, READ_CHUNK_BYTES):
+            for raw in chunk:
+                if raw.strip():
+                    yield loads(raw)
+    finally:
+        lines.close()
+
+
+def _append(target, data: bytes):
+    target.write(data)
+    target.flush()
+
+
+def _retry_after(e: HTTPException) -> float:
+    try:
+        return float((e.headers or {}).get("Retry-After", 1))
+    except ValueError:
+        return 1.0
+
+
+class BatchRunner:
+    """
+    Runs one batch job to a terminal state, resuming from its output files.
+
+    Requests run with bounded concurrency through the normal completion path, so
+    they share pooled upstream connections, caching and retries with interactive
+    traffic. Before each request the job waits while the model's admission queue
+    has waiters or is more than `max_share` full, and 429s are retried after their
+    Retry-After instead of failing the line. File reads, writes and checkpoints
+    run in threads so a slow BATCH_DIR does not stall the event loop.
+    """
+
+    def __init__(
+        self,
+        store: BatchStore,
+        batch_id: str,
+        concurrency: int = BATCH_JOB_CONCURRENCY,
+        max_share: float = BATCH_JOB_MAX_SHARE
+    ):
+        self.store = store
+        self.batch_id = batch_id
+        self.concurrency = concurrency
+        self.max_share = max_share
+        self.batch: BatchObject | None = None
+        # Tenant of the job's creator, for rate limits and conversations
+        self.owner: str | None = None
+        # custom_ids with a line in the output or error file
+        self.finished: set[str] = set()
+        self._saved_at = 0.0
+        self._saving = asyncio.Lock()
+
+    async def _checkpoint(self, force: bool = False):
+        now = time.monotonic()
+        if force or now - self._saved_at >= CHECKPOINT_INTERVAL:
+            self._saved_at = now
+            # Snapshot on the loop, write in a thread (one write at a time)
+            document = self.batch.model_dump_json()
+            async with self._saving:
+                await asyncio.to_thread(self.store.write_batch, self.batch_id, document)
+
+    async def _stopping(self) -> str | None:
+        """The terminal status to wind down to (cancelled or expired), if any."""
+        if await asyncio.to_thread(self.store.cancel_marker(self.batch_id).exists):
+            return CANCELLED
+        if self.batch.expires_at is not None and time.time() >= self.batch.expires_at:
+            return EXPIRED
+        return None
+
+    async def run(self):
+        self.batch = batch = await asyncio.to_thread(self.store.get_batch, self.batch_id)
+        self.owner = await asyncio.to_thread(self.store.owner, self.batch_id)
+        if batch.status == VALIDATING:
+            if await self._stopping() is None and not await self._validate():
+                return
+            batch.status, batch.in_progress_at = IN_PROGRESS, int(time.time())
+            await self._checkpoint(force=True)
+        if batch.status in (IN_PROGRESS, CANCELLING):
+            await self._process()
+        if batch.status not in TERMINAL:
+            await self._finalize()
+
+    async def _validate(self) -> bool:
+        total, errors = await asyncio.to_thread(
+            validate_input, self.store.file_path(self.batch.input_file_id), self.batch.endpoint
+        )
+        self.batch.request_counts.total = total
+        if errors:
+            logger.warning("Batch %s failed validation: %s", self.batch_id, errors[0]["message"])
+            self.batch.status, self.batch.failed_at = FAILED, int(time.time())
+            self.batch.errors = {"object": "list", "data": errors}
+            await self._checkpoint(force=True)
+            return False
+        return True
+
+    async def _process(self):
+        batch = self.batch
+        output = self.store.file_path(batch.output_file_id)
+        errors = self.store.file_path(batch.error_file_id)
+        await asyncio.to_thread(output.parent.mkdir, parents=True, exist_ok=True)
+        completed = await asyncio.to_thread(read_checkpoint, output)
+        failed = await asyncio.to_thread(read_checkpoint, errors)
+        batch.request_counts.completed, batch.request_counts.failed = len(completed), len(failed)
+        self.finished = completed | failed
+        if self.finished:
+            logger.info("Resuming batch %s after %d finished requests", self.batch_id, len(self.finished))
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks: set[asyncio.Task] = set()
+
+        def done(task: asyncio.Task):
+            tasks.discard(task)
+            semaphore.release()
+
+        out = await asyncio.to_thread(open, output, "ab")
+        err = await asyncio.to_thread(open, errors, "ab")
+        try:
+            async for item in _items(self.store.file_path(batch.input_file_id)):
+                if item["custom_id"] in self.finished:
+                    continue
+                await semaphore.acquire()
+                if await self._stopping() is not None:
+                    semaphore.release()
+                    break
+                task = asyncio.create_task(self._run_item(item, out, err))
+                tasks.add(task)
+                task.add_done_callback(done)
+            # Requests already sent are finished even when the job is cancelled
+            await asyncio.gather(*tasks)
+        finally:
+            out.close()
+            err.close()
+
+    async def _run_item(self, item: dict, out, err):
+        request_id = f"batch_req_{uuid.uuid4().hex}"
+        model_id = str((item.get("body") or {}).get("model"))
+        # Each line runs in its own task; charge it to the job's creator, not "anonymous"
+        _current_context.set(RequestContext(tenant=self.owner))
+        try:
+            request = ChatCompletionRequest.model_validate({**item["body"], "stream": False})
+            config = get_config_or_raise(request.model)
+            while True:
+                await self._yield_to_interactive(request.model, config)
+                try:
+                    response = await call_completion(request, config.get("system_prompt", ""))
+                    break
+                except HTTPException as e:
+                    if e.status_code != 429 or await self._stopping() is not None:
+                        raise
+                    await asyncio.sleep(_retry_after(e))
+            body = loads(response.body) if isinstance(response, RawCompletion) else response.model_dump()
+            status, target = 200, out
+            self.batch.request_counts.completed += 1
+        except Exception as e:
+            detail = _item_error(e)
+            status, target = detail.pop("status_code"), err
+            body = {"error": detail}
+            self.batch.request_counts.failed += 1
+        batch_requests_counter.add(1, {"model": model_id, "result": "completed" if status == 200 else "failed"})
+        line = {
+            "id": request_id,
+            "custom_id": item["custom_id"],
+            "response": {"status_code": status, "request_id": request_id, "body": body},
+            "error": None,
+        }
+        await asyncio.to_thread(_append, target, dumps(line) + b"\n")
+        self.finished.add(item["custom_id"])
+        await self._checkpoint()
+
+    async def _yield_to_interactive(self, model_id: str, config: dict):
+        while True:
+            queue = admission.queue_for(model_id, config)
+            if queue is None:
+                return
+            share = max(1, math.floor(queue.max_in_flight * self.max_share))
+            if queue.queued == 0 and queue.in_flight < share:
+                return
+            batch_yield_counter.add(1, {"model": model_id})
+            await asyncio.sleep(YIELD_INTERVAL)
+
+    async def _expire_rest(self):
+        """Record a `batch_expired` error for every line the job did not get to run."""
+        lines = []
+        async for item in _items(self.store.file_path(self.batch.input_file_id)):
+            if item["custom_id"] in self.finished:
+                continue
+            request_id = f"batch_req_{uuid.uuid4().hex}"
+            lines.append(dumps({
+                "id": request_id,
+                "custom_id": item["custom_id"],
+                "response": None,
+                "error": {
+                    "code": "batch_expired",
+                    "message": "This request could not be executed before the completion window expired.",
+                },
+            }) + b"\n")
+            self.finished.add(item["custom_id"])
+        if lines:
+            path = self.store.file_path(self.batch.error_file_id)
+            await asyncio.to_thread(_append_lines, path, lines)
+            self.batch.request_counts.failed += len(lines)
+
+    async def _finalize(self):
+        batch = self.batch
+        stopping = await self._stopping()
+        if stopping == EXPIRED:
+            await self._expire_rest()
+        now = int(time.time())
+        batch.finalizing_at = now
+        await asyncio.to_thread(self._save_output_files, now)
+        if stopping == CANCELLED:
+            batch.status, batch.cancelled_at = CANCELLED, now
+            batch.cancelling_at = batch.cancelling_at or now
+        elif stopping == EXPIRED:
+            batch.status, batch.expired_at = EXPIRED, now
+        else:
+            batch.status, batch.completed_at = COMPLETED, now
+        await self._checkpoint(force=True)
+        await asyncio.to_thread(self.store.cancel_marker(self.batch_id).unlink, missing_ok=True)
+        counts = batch.request_counts
+        logger.info("Batch %s %s: %d completed, %d failed", batch.id, batch.status, counts.completed, counts.failed)
+
+    def _save_output_files(self, now: int):
+        batch = self.batch
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            path = self.store.file_path(file_id)
+            path.touch()
+            self.store.save_file(FileObject(
+                id=file_id,
+                bytes=path.stat().st_size,
+                created_at=now,
+                filename=f"{batch.id}_{'output' if file_id == batch.output_file_id else 'error'}.jsonl",
+                purpose="batch_output"
+            ))
+
+
+def _append_lines(path: Path, lines: list[bytes]):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "ab") as target:
+        target.writelines(lines)
+
+
+class BatchScheduler:
+    """
+    Starts a runner for every unfinished job this process can lock.
+
+    Jobs are picked up when created and by a periodic scan, so jobs interrupted
+    by a restart (or owned by a worker that exited) resume on their own.
+    """
+
+    def __init__(self, store: BatchStore, interval: float = BATCH_POLL_INTERVAL):
+        self.store = store
+        self.interval = interval
+        self._runners: dict[str, asyncio.Task] = {}
+        # Jobs seen in a terminal state, so scans stop re-reading them
+        self._finished: set[str] = set()
+        self._wake = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._runners)
+
+    def wake(self):
+        self._wake.set()
+
+    def _lock_unfinished(self, running: set[str]) -> list[tuple[str, object]]:
+        """Lock the unfinished jobs no process owns yet (blocking; runs in a thread)."""
+        locked = []
+        for batch_id in self.store.batch_ids():
+            if batch_id in running or batch_id in self._finished:
+                continue
+            try:
+                if self.store.get_batch(batch_id).status in TERMINAL:
+                    self._finished.add(batch_id)
+                    continue
+            except (HTTPException, ValueError):
+                continue
+            lock = self.store.try_lock(batch_id)
+            if lock is not None:
+                locked.append((batch_id, lock))
+        return locked
+
+    async def adopt(self):
+        for batch_id, lock in await asyncio.to_thread(self._lock_unfinished, set(self._runners)):
+            self._runners[batch_id] = asyncio.create_task(self._run(batch_id, lock))
+
+    async def _run(self, batch_id: str, lock):
+        runner = BatchRunner(self.store, batch_id)
+        try:
+            await runner.run()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Batch %s stopped with an error; it resumes on the next scan", batch_id)
+        finally:
+            finished = runner.batch is not None and runner.batch.status in TERMINAL
+            self.store.unlock(batch_id, lock, remove=finished)
+            if finished:
+                self._finished.add(batch_id)
+            self._runners.pop(batch_id, None)
+
+    async def run(self):
+        while True:
+            try:
+                await self.adopt()
+            except Exception:
+                logger.exception("Batch job scan failed")
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def stop(self):
+        runners = list(self._runners.values())
+        for task in runners:
+            task.cancel()
+        await asyncio.gather(*runners, return_exceptions=True)
+
+
+batch_store = BatchStore(BATCH_DIR)
+_scheduler: BatchScheduler | None = None
+
+
+def wake_scheduler():
+    if _scheduler is not None:
+        _scheduler.wake()
+
+
+@asynccontextmanager
+async def batch_lifespan(store: BatchStore = batch_store) -> AsyncIterator[None]:
+    """Run (and resume) batch jobs for the duration of the application lifespan."""
+    global _scheduler
+    _scheduler = BatchScheduler(store)
+    task = asyncio.create_task(_scheduler.run())
+    try:
+        yield
+    finally:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        await _scheduler.stop()
+        _scheduler = None
+
+
+meter.create_observable_gauge(
+    name="batch_jobs_running",
+    callbacks=[lambda options: [Observation(len(_scheduler) if _scheduler is not None else 0)]],
+    unit="1",
+    description="Batch jobs run by this process"
+)
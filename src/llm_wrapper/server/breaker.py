@@ -0,0 +1,212 @@
+# src/server/breaker.py
+
+import time
+from collections import deque
+from typing import NamedTuple
+
+from opentelemetry import metrics
+
+from llm_wrapper.lib.logging import setup_logger
+from llm_wrapper.server.config import CIRCUIT_BREAKER_ENABLED
+
+logger = setup_logger("llm-server", "logs/server.log")
+meter = metrics.get_meter("llm-wrapper")
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+# Gauge values for upstream_circuit_state
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# Buckets the error-rate window is split into
+WINDOW_BUCKETS = 10
+
+circuit_transitions_counter = meter.create_counter(
+    name="upstream_circuit_transitions_total",
+    unit="1",
+    description="Circuit breaker state changes per replica, by new state and reason"
+)
+
+
+class BreakerSettings(NamedTuple):
+    enabled: bool
+    consecutive_failures: int
+    error_rate: float
+    window: float
+    min_requests: int
+    open_seconds: float
+    max_open_seconds: float
+    half_open_probes: int
+    slow_factor: float | None
+    max_ejected_percent: float
+    outlier_interval: float
+
+    @classmethod
+    def from_api_config(cls, api_config: dict) -> "BreakerSettings":
+        """Resolve breaker settings from a model's `api.circuit_breaker` section."""
+        section = api_config.get("circuit_breaker") or {}
+
+        def pick(key, default):
+            value = section.get(key)
+            return default if value is None else value
+
+        return cls(
+            enabled=bool(pick("enabled", CIRCUIT_BREAKER_ENABLED)),
+            consecutive_failures=int(pick("consecutive_failures", 5)),
+            error_rate=float(pick("error_rate", 0.5)),
+            window=float(pick("window", 30.0)),
+            min_requests=int(pick("min_requests", 20)),
+            open_seconds=float(pick("open_seconds", 10.0)),
+            max_open_seconds=float(pick("max_open_seconds", 300.0)),
+            half_open_probes=int(pick("half_open_probes", 1)),
+            slow_factor=section.get("slow_factor", 3.0),
+            max_ejected_percent=float(pick("max_ejected_percent", 50.0)),
+            outlier_interval=float(pick("outlier_interval", 10.0)),
+        )
+
+
+DISABLED = BreakerSettings.from_api_config({"circuit_breaker": {"enabled": False}})
+
+
+def failed(exc: BaseException | None) -> bool | None:
+    """
+    Classify how an upstream call ended: True for a replica failure, False for a
+    healthy answer, None when it says nothing about the replica.
+
+    5xx answers, connection errors and timeouts are failures. Other HTTP statuses
+    (4xx, including upstream 429s) are healthy answers. Cancellations (hedge losers,
+    client disconnects) are neither.
+    """
+    if exc is None:
+        return False
+    if not isinstance(exc, Exception):
+        return None
+    status = getattr(exc, "status", None) or getattr(exc, "status_code", None)
+    if isinstance(status, int):
+        if status == 429:
+            return None
+        return status >= 500
+    return True
+
+
+class _RollingCounts:
+    """Request and failure counts over a sliding window, kept in fixed buckets."""
+
+    def __init__(self, window: float):
+        self.width = window / WINDOW_BUCKETS
+        self._buckets: deque[list] = deque()
+
+    def add(self, failure: bool, now: float):
+        slot = int(now // self.width)
+        if not self._buckets or self._buckets[-1][0] != slot:
+            self._buckets.append([slot, 0, 0])
+        bucket = self._buckets[-1]
+        bucket[1] += 1
+        bucket[2] += failure
+        while self._buckets[0][0] <= slot - WINDOW_BUCKETS:
+            self._buckets.popleft()
+
+    def totals(self) -> tuple[int, int]:
+        return sum(b[1] for b in self._buckets), sum(b[2] for b in self._buckets)
+
+    def clear(self):
+        self._buckets.clear()
+
+
+class CircuitBreaker:
+    """
+    Health state of one replica.
+
+    Closed: requests flow and outcomes are counted. Too many consecutive failures,
+    or too high an error rate over the window, opens the breaker (also used to eject
+    slow outliers). Open: the replica is skipped until its ejection time is up, which
+    doubles on each repeated trip up to `max_open_seconds`. Half-open: a few probe
+    requests go through; a success closes the breaker, a failure opens it again.
+    """
+
+    def __init__(self, settings: BreakerSettings = DISABLED):
+        self.settings = settings
+        self.state = CLOSED
+        self.consecutive = 0
+        self.trips = 0
+        self.open_until = 0.0
+        self.probes = 0
+        self._counts = _RollingCounts(settings.window)
+        # (model, replica) attributes, set by the replica set that owns this breaker
+        self.attributes: dict = {}
+
+    def configure(self, settings: BreakerSettings):
+        if settings.window != self.settings.window:
+            self._counts = _RollingCounts(settings.window)
+        self.settings = settings
+        if not settings.enabled and self.state != CLOSED:
+            self._transition(CLOSED, "disabled")
+
+    def _transition(self, state: str, reason: str):
+        self.state = state
+        circuit_transitions_counter.add(1, {**self.attributes, "state": state, "reason": reason})
+        log = logger.info if state == CLOSED else logger.warning
+        log("Circuit for %s is now %s (%s)", self.attributes.get("replica"), state, reason)
+
+    def allow(self, now: float) -> bool:
+        """Whether the replica may take a request now; moves open breakers to half-open when due."""
+        if self.state == CLOSED or not self.settings.enabled:
+            return True
+        if self.state == OPEN:
+            if now < self.open_until:
+                return False
+            self.probes = 0
+            self._transition(HALF_OPEN, "probe")
+        return self.probes < self.settings.half_open_probes
+
+    def retry_after(self, now: float) -> float:
+        return max(0.0, self.open_until - now) if self.state == OPEN else 0.0
+
+    def on_start(self) -> bool:
+        """Called when a request is sent; returns whether it is a half-open probe."""
+        if self.state == HALF_OPEN:
+            self.probes += 1
+            return True
+        return False
+
+    def trip(self, reason: str, now: float | None = None):
+        """Open the breaker (eject the replica) for the current backoff period."""
+        now = time.monotonic() if now is None else now
+        duration = min(self.settings.open_seconds * 2 ** self.trips, self.settings.max_open_seconds)
+        self.trips += 1
+        self.open_until = now + duration
+        self.consecutive = 0
+        self._counts.clear()
+        self._transition(OPEN, reason)
+
+    def record(self, failure: bool | None, probe: bool = False, now: float | None = None):
+        """Fold in the outcome of a finished request (None leaves the state untouched)."""
+        if probe:
+            self.probes -= 1
+        if failure is None or not self.settings.enabled:
+            return
+        now = time.monotonic() if now is None else now
+        if self.state == HALF_OPEN:
+            if failure:
+                self.trip("probe_failed", now)
+            elif probe:
+                self.trips = 0
+                self.consecutive = 0
+                self._transition(CLOSED, "probe_succeeded")
+            return
+        if self.state == OPEN:
+            # A request that started before the breaker opened
+            return
+
+        self._counts.add(failure, now)
+        if not failure:
+            self.consecutive = 0
+            return
+        self.consecutive += 1
+        if self.consecutive >= self.settings.consecutive_failures:
+            self.trip("consecutive_failures", now)
+            return
+        total, failures = self._counts.totals()
+        if total >= self.settings.min_requests and failures / total >= self.settings.error_rate:
+            self.trip("error_rate", now)
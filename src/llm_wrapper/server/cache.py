@@ -0,0 +1,182 @@
+# src/server/cache.py
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from opentelemetry import metrics
+from opentelemetry.metrics import Observation
+
+from llm_wrapper.lib.logging import setup_logger
+from llm_wrapper.server.config import (
+    RESPONSE_CACHE_ENABLED,
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_MAX_BYTES,
+    RESPONSE_CACHE_TTL,
+)
+from llm_wrapper.server.codec import RawCompletion
+from llm_wrapper.server.context import get_request_context
+from llm_wrapper.server.models import ChatCompletionResponse
+from llm_wrapper.server.similarity import SimilarKey, find_similar, similarity_cache
+
+logger = setup_logger("llm-server", "logs/server.log")
+meter = metrics.get_meter("llm-wrapper")
+
+cache_lookup_counter = meter.create_counter(
+    name="response_cache_lookups_total",
+    unit="1",
+    description="Response cache lookups by result (hit, miss, bypass)"
+)
+
+
+def payload_key(model_id: str, payload: dict) -> str:
+    """
+    Canonical key for an upstream payload.
+
+    Keys are stable across dict ordering and ignore the `stream` flag, so a
+    streaming request can be answered from a non-streaming completion.
+    """
+    canonical = {k: v for k, v in payload.items() if k != "stream"}
+    encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(f"{model_id}\0{encoded}".encode("utf-8")).hexdigest()
+
+
+def cache_ttl(config: dict) -> float | None:
+    """TTL in seconds if caching applies to this model, otherwise None."""
+    settings = config.get("cache") or {}
+    enabled = settings.get("enabled")
+    if enabled is None:
+        enabled = RESPONSE_CACHE_ENABLED
+    if not enabled:
+        return None
+    ttl = settings.get("ttl")
+    return float(RESPONSE_CACHE_TTL if ttl is None else ttl)
+
+
+def _size(response: ChatCompletionResponse | RawCompletion) -> int:
+    if isinstance(response, RawCompletion):
+        return len(response)
+    return len(response.model_dump_json())
+
+
+class _Entry(NamedTuple):
+    response: ChatCompletionResponse | RawCompletion
+    size: int
+    expires_at: float
+
+
+class ResponseCache:
+    """In-memory LRU of completed responses, bounded by entry count and bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> ChatCompletionResponse | RawCompletion | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry.response
+
+    def put(self, key: str, response: ChatCompletionResponse | RawCompletion, ttl: float):
+        size = _size(response)
+        if size > self.max_bytes or ttl <= 0:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = _Entry(response, size, time.monotonic() + ttl)
+        self.total_bytes += size
+        while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    def clear(self):
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self.total_bytes -= entry.size
+
+
+response_cache = ResponseCache(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_MAX_BYTES)
+
+
+class CacheLookup(NamedTuple):
+    # Key to store the fresh result under; None when the result must not be stored
+    key: str | None
+    ttl: float
+    response: ChatCompletionResponse | RawCompletion | None
+    # Similarity cache key to store the fresh result under, when the model enables it
+    similar: SimilarKey | None = None
+
+
+_SKIP = CacheLookup(None, 0.0, None)
+
+
+def _similarity_scope(model_id: str, payload: dict) -> tuple[str, str]:
+    """(scope key, final user message) of a payload for the similarity cache."""
+    messages = payload.get("messages") or []
+    text = str(messages[-1].get("content") or "") if messages else ""
+    return payload_key(model_id, {**payload, "messages": messages[:-1]}), text
+
+
+def lookup_response(model_id: str, payload: dict, config: dict) -> CacheLookup:
+    """
+    Look up a payload, honouring the model's cache policy and bypass headers.
+
+    Exact matches are tried first, then near-duplicates when the model enables
+    `cache.similarity`.
+    """
+    ttl = cache_ttl(config)
+    similar_enabled = bool(((config.get("cache") or {}).get("similarity") or {}).get("enabled"))
+    if ttl is None and not similar_enabled:
+        return _SKIP
+    context = get_request_context()
+    key = payload_key(model_id, payload) if ttl is not None else None
+    cached = None
+    if ttl is not None:
+        if not context.cache_read:
+            cache_lookup_counter.add(1, {"model": model_id, "result": "bypass"})
+        else:
+            cached = response_cache.get(key)
+            cache_lookup_counter.add(1, {"model": model_id, "result": "hit" if cached else "miss"})
+    similar = None
+    if cached is None and similar_enabled and (context.cache_read or context.cache_write):
+        similar, cached = find_similar(model_id, *_similarity_scope(model_id, payload), config, context.cache_read)
+    if not context.cache_write:
+        return CacheLookup(None, ttl or 0.0, cached)
+    return CacheLookup(key, ttl or 0.0, cached, similar)
+
+
+def store_response(lookup: CacheLookup, response: ChatCompletionResponse | RawCompletion):
+    if lookup.key is not None:
+        response_cache.put(lookup.key, response, lookup.ttl)
+    if lookup.similar is not None:
+        similarity_cache.put(lookup.similar, response, _size(response))
+
+
+meter.create_observable_gauge(
+    name="response_cache_entries",
+    callbacks=[lambda options: [Observation(len(response_cache))]],
+    unit="1",
+    description="Entries held by the response cache"
+)
+
+meter.create_observable_gauge(
+    name="response_cache_size_bytes",
+    callbacks=[lambda options: [Observation(response_cache.total_bytes)]],
+    unit="bytes",
+    description="Serialized size of responses held by the response cache"
+)
@@ -0,0 +1,156 @@
+# src/server/coalesce.py
+
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, TypeVar
+
+from opentelemetry import metrics
+
+from llm_wrapper.lib.logging import setup_logger
+
+logger = setup_logger("llm-server", "logs/server.log")
+meter = metrics.get_meter("llm-wrapper")
+
+coalesced_counter = meter.create_counter(
+    name="coalesced_requests_total",
+    unit="1",
+    description="Requests served by joining an identical in-flight upstream call"
+)
+
+T = TypeVar("T")
+
+
+def coalescing_enabled(config: dict) -> bool:
+    return bool((config.get("coalesce") or {}).get("enabled"))
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class CompletionCoalescer:
+    """
+    Singleflight for awaitable upstream calls.
+
+    The first caller for a key starts the call; identical callers arriving while it
+    is in flight await the same result (or exception). The shared call is only
+    cancelled once every waiter has gone away.
+    """
+
+    def __init__(self):
+        self._flights: dict[str, _Flight] = {}
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]], model_id: str = "") -> T:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        else:
+            coalesced_counter.add(1, {"model": model_id, "mode": "completion"})
+            logger.debug("Joined in-flight completion for model '%s'", model_id)
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+
+    def _forget(self, key: str, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+
+class _Broadcast:
+    """Records every chunk of one source stream and fans it out to subscribers."""
+
+    def __init__(self, source: AsyncIterator):
+        self.chunks: list = []
+        self.done = False
+        self.error: Exception | None = None
+        self.subscribers = 0
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.ensure_future(self._pump(source))
+
+    async def _pump(self, source: AsyncIterator):
+        try:
+            async for chunk in source:
+                self.chunks.append(chunk)
+                self._notify()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+            self._notify()
+
+    def _notify(self):
+        wakeup, self._wakeup = self._wakeup, asyncio.Event()
+        wakeup.set()
+
+    async def follow(self) -> AsyncIterator:
+        """Yield every chunk from the start, then live chunks until the source ends."""
+        index = 0
+        while True:
+            wakeup = self._wakeup
+            while index < len(self.chunks):
+                yield self.chunks[index]
+                index += 1
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            await wakeup.wait()
+
+    def cancel(self):
+        self._task.cancel()
+
+
+class StreamCoalescer:
+    """
+    Singleflight for streamed upstream calls.
+
+    Later identical requests subscribe to the first one's chunk sequence, replaying
+    chunks already emitted before following live ones.
+    """
+
+    def __init__(self):
+        self._streams: dict[str, _Broadcast] = {}
+
+    def __len__(self) -> int:
+        return len(self._streams)
+
+    async def subscribe(
+        self,
+        key: str,
+        fn: Callable[[], AsyncIterator],
+        model_id: str = ""
+    ) -> AsyncIterator:
+        broadcast = self._streams.get(key)
+        if broadcast is None or broadcast.done:
+            broadcast = _Broadcast(fn())
+            self._streams[key] = broadcast
+        else:
+            coalesced_counter.add(1, {"model": model_id, "mode": "stream"})
+            logger.debug("Joined in-flight stream for model '%s'", model_id)
+
+        broadcast.subscribers += 1
+        try:
+            async for chunk in broadcast.follow():
+                yield chunk
+        finally:
+            broadcast.subscribers -= 1
+            if broadcast.subscribers == 0:
+                if self._streams.get(key) is broadcast:
+                    del self._streams[key]
+                if not broadcast.done:
+                    broadcast.cancel()
+
+
+completion_flights = CompletionCoalescer()
+stream_flights = StreamCoalescer()
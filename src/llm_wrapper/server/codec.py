@@ -0,0 +1,138 @@
+# src/server/codec.py
+
+import json
+from typing import List
+
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+from llm_wrapper.server.models import ChatCompletionRequest, ChatCompletionResponse, Message
+
+# orjson is optional (`pip install llm-wrapper[fast]`); fall back to the stdlib
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+JSON_CODEC = "orjson" if orjson is not None else "json"
+
+
+def loads(data: bytes | str):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def check_completion(data) -> None:
+    """
+    Structural check of a decoded chat completion.
+
+    Verifies the fields ChatCompletionResponse requires are present with the right
+    JSON types, without building any models. Raises ValueError on the first problem.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("completion is not a JSON object")
+    for field, kind in (("id", str), ("model", str)):
+        if not isinstance(data.get(field), kind):
+            raise ValueError(f"completion field '{field}' is missing or not a {kind.__name__}")
+    if not _is_int(data.get("created")):
+        raise ValueError("completion field 'created' is missing or not an int")
+    choices = data.get("choices")
+    if not isinstance(choices, list) or not choices:
+        raise ValueError("completion has no choices")
+    for choice in choices:
+        if not isinstance(choice, dict) or not _is_int(choice.get("index")):
+            raise ValueError("completion choice is missing its index")
+        message = choice.get("message")
+        if not isinstance(message, dict) or not isinstance(message.get("role"), str):
+            raise ValueError("completion choice has no message role")
+    usage = data.get("usage")
+    if not isinstance(usage, dict) or not all(
+        _is_int(usage.get(k)) for k in ("prompt_tokens", "completion_tokens", "total_tokens")
+    ):
+        raise ValueError("completion usage is missing token counts")
+
+
+# Request fields the proxy only forwards (or ignores), kept as decoded JSON without validation
+_OPAQUE_REQUEST_FIELDS = ("functions", "function_call", "tools", "tool_choice", "logit_bias")
+_MESSAGES = TypeAdapter(List[Message])
+
+
+def decode_chat_request(body: bytes) -> ChatCompletionRequest:
+    """
+    Decode a chat completion request body, validating only the fields the proxy uses.
+
+    Messages and scalar fields get the usual validation (in pydantic-core, with no
+    per-field Python code). Tools, functions and logit_bias are large, nested and
+    only forwarded upstream (see `opaque_fields`): they are kept as decoded JSON in
+    the request's `_passthrough` and their typed fields stay unset, so serializing
+    the request never meets unvalidated values. Raises ValueError (or its subclass
+    ValidationError) on the first problem.
+    """
+    data = loads(body)
+    if not isinstance(data, dict):
+        raise ValueError("request body is not a JSON object")
+    if data.get("functions") and data.get("tools"):
+        raise ValueError("Cannot provide both 'functions' and 'tools'")
+    if "messages" not in data:
+        raise ValueError("field 'messages' is missing")
+    opaque = {k: data.pop(k) for k in _OPAQUE_REQUEST_FIELDS if k in data}
+    messages = data.pop("messages")
+    request = ChatCompletionRequest.model_validate({**data, "messages": ()})
+    request.messages = _MESSAGES.validate_python(messages)
+    request._passthrough = opaque
+    return request
+
+
+def opaque_fields(request: ChatCompletionRequest) -> dict:
+    """
+    The request's tools, functions, tool_choice, function_call and logit_bias as JSON.
+
+    Fast-decoded requests carry them in `_passthrough` as received; validated ones
+    are serialized from their typed fields. Unset fields are left out.
+    """
+    if request._passthrough:
+        return request._passthrough
+    return request.model_dump(include=set(_OPAQUE_REQUEST_FIELDS), exclude_none=True)
+
+
+class RawCompletion:
+    """
+    A structurally validated upstream completion kept as the upstream's bytes.
+
+    Returned by the API layer for models with `completion.passthrough` so the body
+    is forwarded without building and re-serializing a ChatCompletionResponse.
+    """
+    __slots__ = ("body",)
+
+    def __init__(self, body: bytes):
+        self.body = body
+
+    def __len__(self) -> int:
+        return len(self.body)
+
+    def __str__(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+    def parse(self) -> ChatCompletionResponse:
+        return ChatCompletionResponse.model_validate_json(self.body)
+
+    def as_response(self) -> Response:
+        return Response(content=self.body, media_type="application/json")
+
+
+def completion_model(response: ChatCompletionResponse | RawCompletion) -> ChatCompletionResponse:
+    """The response as a ChatCompletionResponse, parsing raw bodies on demand."""
+    if isinstance(response, RawCompletion):
+        return response.parse()
+    return response
@@ -16,10 +16,72 @@ logger.debug("Loading configuration from environment variables.")
 DEFAULT_TIMEOUT = int(os.environ.get("DEFAULT_TIMEOUT", "60"))
 STREAMING_TIMEOUT = int(os.environ.get("STREAMING_TIMEOUT", "300"))
 
+# Decode chat requests with the fast path (type checks on used fields) instead of full Pydantic validation
+FAST_REQUEST_DECODING = os.environ.get("FAST_REQUEST_DECODING", "false").lower() in ("1", "true", "yes")
+
+# Upstream connection pool defaults (overridable per model under `api.pool`)
+UPSTREAM_POOL_LIMIT = int(os.environ.get("UPSTREAM_POOL_LIMIT", "100"))
+UPSTREAM_POOL_LIMIT_PER_HOST = int(os.environ.get("UPSTREAM_POOL_LIMIT_PER_HOST", "0"))
+UPSTREAM_KEEPALIVE_TIMEOUT = float(os.environ.get("UPSTREAM_KEEPALIVE_TIMEOUT", "30"))
+UPSTREAM_DNS_CACHE_TTL = int(os.environ.get("UPSTREAM_DNS_CACHE_TTL", "300"))
+
+# Exact-match response cache (models opt in/out under `cache`)
+RESPONSE_CACHE_ENABLED = os.environ.get("RESPONSE_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+RESPONSE_CACHE_TTL = float(os.environ.get("RESPONSE_CACHE_TTL", "300"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Near-duplicate prompt cache bounds (models opt in under `cache.similarity`)
+SIMILARITY_CACHE_MAX_ENTRIES = int(os.environ.get("SIMILARITY_CACHE_MAX_ENTRIES", "10000"))
+SIMILARITY_CACHE_MAX_BYTES = int(os.environ.get("SIMILARITY_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Server-side conversation history for requests carrying a `conversation_id`
+CONVERSATION_TTL = float(os.environ.get("CONVERSATION_TTL", "3600"))
+CONVERSATION_MAX_BYTES = int(os.environ.get("CONVERSATION_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Admission queue defaults for models with `limits.max_in_flight`
+ADMISSION_MAX_QUEUE = int(os.environ.get("ADMISSION_MAX_QUEUE", "100"))
+ADMISSION_MAX_QUEUE_WAIT = float(os.environ.get("ADMISSION_MAX_QUEUE_WAIT", "30"))
+
+# Per-tenant rate limits (per model under `rate_limits`): tenant buckets kept, tenants named in metrics
+RATE_LIMIT_MAX_TENANTS = int(os.environ.get("RATE_LIMIT_MAX_TENANTS", "100000"))
+RATE_LIMIT_TENANT_LABELS = int(os.environ.get("RATE_LIMIT_TENANT_LABELS", "50"))
+
+# Per-replica circuit breakers and outlier ejection (models opt in/out under `api.circuit_breaker`)
+CIRCUIT_BREAKER_ENABLED = os.environ.get("CIRCUIT_BREAKER_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# Retries of connection errors and upstream 429/502/503 (per model under `retries`)
+RETRY_MAX_ATTEMPTS = int(os.environ.get("RETRY_MAX_ATTEMPTS", "3"))
+# Process-wide retry budget: retries per request, plus a floor of retries per second
+RETRY_BUDGET_RATIO = float(os.environ.get("RETRY_BUDGET_RATIO", "0.2"))
+RETRY_BUDGET_MIN_PER_SECOND = float(os.environ.get("RETRY_BUDGET_MIN_PER_SECOND", "1"))
+
+# Bulk completion endpoint bounds
+BATCH_MAX_ITEMS = int(os.environ.get("BATCH_MAX_ITEMS", "1000"))
+BATCH_MAX_CONCURRENCY = int(os.environ.get("BATCH_MAX_CONCURRENCY", "16"))
+
+# Offline Batch API (/v1/files, /v1/batches): storage directory and upload bounds
+BATCH_DIR = os.environ.get("BATCH_DIR", "data/batches")
+BATCH_MAX_FILE_BYTES = int(os.environ.get("BATCH_MAX_FILE_BYTES", str(200 * 1024 * 1024)))
+BATCH_MAX_LINES = int(os.environ.get("BATCH_MAX_LINES", "50000"))
+# Concurrent requests per batch job, and the share of a model's admission slots jobs may fill
+BATCH_JOB_CONCURRENCY = int(os.environ.get("BATCH_JOB_CONCURRENCY", "8"))
+BATCH_JOB_MAX_SHARE = float(os.environ.get("BATCH_JOB_MAX_SHARE", "0.5"))
+# Seconds between scans for jobs to start or resume (e.g. after a restart)
+BATCH_POLL_INTERVAL = float(os.environ.get("BATCH_POLL_INTERVAL", "5"))
+
+# Model config hot reload: seconds between config directory checks (0 disables)
+CONFIG_RELOAD_INTERVAL = float(os.environ.get("CONFIG_RELOAD_INTERVAL", "5"))
+# Bearer token for /admin endpoints; unset leaves them open
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+
 # Server runtime configuration
 HOST = os.environ.get("HOST", "0.0.0.0")
 PORT = int(os.environ.get("PORT", "8000"))
+# Worker processes; more than one runs a supervisor with SO_REUSEPORT workers
+WORKERS = int(os.environ.get("WORKERS", "1"))
+# Prometheus scrape port (the supervisor's aggregated endpoint in multi-worker mode)
+PROMETHEUS_PORT = int(os.environ.get("PROMETHEUS_PORT", "9464"))
 
 # Log loaded settings for debugging (only safe values)
-logger.debug("Config loaded: HOST=%s, PORT=%s, DEFAULT_TIMEOUT=%s, STREAMING_TIMEOUT=%s", 
-             HOST, PORT, DEFAULT_TIMEOUT, STREAMING_TIMEOUT)
+logger.debug("Config loaded: HOST=%s, PORT=%s, WORKERS=%s, DEFAULT_TIMEOUT=%s, STREAMING_TIMEOUT=%s",
+             HOST, PORT, WORKERS, DEFAULT_TIMEOUT, STREAMING_TIMEOUT)
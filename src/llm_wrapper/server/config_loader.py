@@ -1,17 +1,78 @@
 # src/server/config_loader.py
 
 import os
+import time
+from collections.abc import Iterator, Mapping
 from pathlib import Path
+from typing import List, Literal, Optional, Union
 import yaml
-from pydantic import BaseModel, Field, ValidationError
+from opentelemetry import metrics
+from opentelemetry.metrics import Observation
+from pydantic import BaseModel, Field, PositiveFloat, ValidationError, model_validator
 from llm_wrapper.lib.logging import setup_logger
 
 logger = setup_logger("llm-server", "logs/server.log")
+meter = metrics.get_meter("llm-wrapper")
 
-CONFIG_DIR = Path(__file__).parent.parent / "configs"
+CONFIG_DIR = Path(os.environ.get("LLM_CONFIG_DIR") or Path(__file__).parent.parent / "configs")
 
-class ApiConfig(BaseModel):
+config_reload_counter = meter.create_counter(
+    name="config_reloads_total",
+    unit="1",
+    description="Model config reloads, by result (success, or error when a file failed to load)"
+)
+
+class PoolConfig(BaseModel):
+    # Unset values fall back to the UPSTREAM_* environment defaults
+    limit: Optional[int] = None
+    limit_per_host: Optional[int] = None
+    keepalive_timeout: Optional[float] = None
+    ttl_dns_cache: Optional[int] = None
+
+class EndpointConfig(BaseModel):
     url: str
+    weight: float = Field(default=1.0, gt=0)
+    max_in_flight: Optional[int] = Field(default=None, gt=0)
+
+class PrefixHashConfig(BaseModel):
+    # Characters of the leading messages (system prompt first) that pick the replica
+    prefix_chars: int = Field(default=2048, gt=0)
+    # A replica above load_factor times its fair share of in-flight requests spills over
+    load_factor: float = Field(default=1.25, gt=1)
+
+class CircuitBreakerConfig(BaseModel):
+    # None follows CIRCUIT_BREAKER_ENABLED; False opts the model out
+    enabled: Optional[bool] = None
+    # Open a replica's breaker after this many failures in a row...
+    consecutive_failures: int = Field(default=5, gt=0)
+    # ...or when this share of requests in the window failed (given min_requests)
+    error_rate: float = Field(default=0.5, gt=0, le=1)
+    window: float = Field(default=30.0, gt=0)
+    min_requests: int = Field(default=20, gt=0)
+    # Ejection time, doubled on each repeated trip up to max_open_seconds
+    open_seconds: float = Field(default=10.0, gt=0)
+    max_open_seconds: float = Field(default=300.0, gt=0)
+    # Concurrent requests let through to test a half-open replica
+    half_open_probes: int = Field(default=1, gt=0)
+    # Eject replicas whose latency is this many times the others' median (null disables)
+    slow_factor: Optional[float] = Field(default=3.0, gt=1)
+    max_ejected_percent: float = Field(default=50.0, ge=0, le=100)
+    outlier_interval: float = Field(default=10.0, gt=0)
+
+class ApiConfig(BaseModel):
+    # Single upstream; use `endpoints` instead to balance across replicas
+    url: Optional[str] = None
+    endpoints: List[EndpointConfig] = Field(default_factory=list)
+    balancer: Literal["least_outstanding", "peak_ewma", "prefix_hash"] = "least_outstanding"
+    prefix_hash: PrefixHashConfig = Field(default_factory=PrefixHashConfig)
+    pool: PoolConfig = Field(default_factory=PoolConfig)
+    circuit_breaker: CircuitBreakerConfig = Field(default_factory=CircuitBreakerConfig)
+
+    @model_validator(mode="after")
+    def require_upstream(self):
+        if not self.url and not self.endpoints:
+            raise ValueError("api requires either 'url' or 'endpoints'")
+        return self
 
 class ModelPath(BaseModel):
     path: str
@@ -22,47 +83,221 @@ class Parameters(BaseModel):
     top_k: int = 40
     stream: bool = False
 
+class StreamingConfig(BaseModel):
+    # Forward upstream SSE payloads as raw bytes instead of parsing each chunk
+    passthrough: bool = False
+    # In passthrough mode, replace the upstream model path with the model id
+    rewrite_model: bool = False
+
+class CompletionConfig(BaseModel):
+    # Forward non-streaming upstream bodies as raw bytes after a structural check
+    passthrough: bool = False
+    # In passthrough mode, replace the upstream model path with the model id
+    rewrite_model: bool = False
+
+class SimilarityConfig(BaseModel):
+    # Serve completions of near-duplicate final user messages (same system prompt and parameters)
+    enabled: bool = False
+    # Minimum SimHash similarity (1 - differing bits / 64) to count as a hit
+    threshold: float = Field(default=0.9, gt=0, le=1)
+    # Only report would-be hits (similarity_cache_lookups_total{result="shadow_hit"})
+    shadow: bool = False
+    # None follows RESPONSE_CACHE_TTL
+    ttl: Optional[float] = None
+
+class CacheConfig(BaseModel):
+    # None follows RESPONSE_CACHE_ENABLED; False opts the model out
+    enabled: Optional[bool] = None
+    ttl: Optional[float] = None
+    similarity: SimilarityConfig = Field(default_factory=SimilarityConfig)
+
+class CoalesceConfig(BaseModel):
+    # Share one upstream call between identical in-flight requests
+    enabled: bool = False
+
+class LimitsConfig(BaseModel):
+    # Unset max_in_flight leaves the model unbounded (unless every endpoint sets one)
+    max_in_flight: Optional[int] = Field(default=None, gt=0)
+    max_queue: Optional[int] = Field(default=None, ge=0)
+    max_queue_wait: Optional[float] = Field(default=None, ge=0)
+
+class RateLimitConfig(BaseModel):
+    # Per tenant and minute; unset limits are not enforced
+    requests_per_minute: Optional[int] = Field(default=None, gt=0)
+    tokens_per_minute: Optional[int] = Field(default=None, gt=0)
+    # Tenant identity: the Authorization bearer key, or the request's `user` field
+    key: Literal["api_key", "user"] = "api_key"
+
+class HedgingConfig(BaseModel):
+    # Repeat slow requests on another replica; the first to answer wins
+    enabled: bool = False
+    # Seconds to wait for a response (or first stream event), or "p95" of recent latencies
+    delay: Union[Literal["p95"], PositiveFloat] = "p95"
+    min_delay: float = Field(default=0.0, ge=0)
+    # Max extra upstream load from hedges, as a fraction of requests
+    budget: float = Field(default=0.05, ge=0, le=1)
+
+class RetriesConfig(BaseModel):
+    # Total attempts including the first (None follows RETRY_MAX_ATTEMPTS; 1 disables)
+    max_attempts: Optional[int] = Field(default=None, gt=0)
+    # Full-jitter exponential backoff: up to backoff * 2^n seconds, capped at max_backoff
+    backoff: float = Field(default=0.1, gt=0)
+    max_backoff: float = Field(default=2.0, gt=0)
+
 class ModelConfig(BaseModel):
     api: ApiConfig
     model: ModelPath
     system_prompt: str = Field(default="")
     parameters: Parameters = Field(default_factory=Parameters)
+    streaming: StreamingConfig = Field(default_factory=StreamingConfig)
+    completion: CompletionConfig = Field(default_factory=CompletionConfig)
+    cache: CacheConfig = Field(default_factory=CacheConfig)
+    coalesce: CoalesceConfig = Field(default_factory=CoalesceConfig)
+    limits: LimitsConfig = Field(default_factory=LimitsConfig)
+    rate_limits: RateLimitConfig = Field(default_factory=RateLimitConfig)
+    hedging: HedgingConfig = Field(default_factory=HedgingConfig)
+    retries: RetriesConfig = Field(default_factory=RetriesConfig)
     model_id: str
 
-def load_all_configs() -> dict:
+def _load_config_file(file_path: Path) -> dict:
+    """Read and validate one model config file; raises on any problem."""
+    data = yaml.safe_load(file_path.read_text()) or {}
+    data["model_id"] = file_path.stem
+    # Validate schema
+    cfg = ModelConfig(**data)
+    return cfg.model_dump()
+
+
+def _config_files(config_dir: Path) -> list[Path]:
+    if not config_dir.exists():
+        return []
+    return sorted(p for p in config_dir.iterdir() if p.name.endswith((".yaml", ".yml")))
+
+
+def config_fingerprint() -> tuple:
+    """Cheap change marker for the config directory (names, mtimes and sizes)."""
+    fingerprint = []
+    for file_path in _config_files(Path(CONFIG_DIR)):
+        try:
+            stat = file_path.stat()
+        except OSError:
+            continue
+        fingerprint.append((file_path.name, stat.st_mtime_ns, stat.st_size))
+    return tuple(fingerprint)
+
+
+def touch_config_files() -> bool:
+    """
+    Bump the config files' mtimes so every process's watcher sees a change.
+    Returns False when the directory cannot be written (e.g. a read-only mount).
+    """
+    now = time.time_ns()
+    try:
+        for file_path in _config_files(Path(CONFIG_DIR)):
+            os.utime(file_path, ns=(now, now))
+    except OSError as e:
+        logger.warning("Could not touch model configs in %s: %s", CONFIG_DIR, e)
+        return False
+    return True
+
+
+def load_all_configs(previous: Optional[Mapping[str, dict]] = None, errors: Optional[dict] = None) -> dict:
     """
     Load all YAML model configuration files from the configs directory.
 
+    Args:
+        previous: The running configs. A file that fails to load keeps its previous
+            config instead of dropping the model, and unchanged configs keep their
+            previous dict so identity-keyed caches stay warm.
+        errors: Optional dict that receives a message per file that failed to load.
+
     Returns:
         dict: A dictionary mapping model_id to its loaded configuration.
     """
     # Resolve config directory path (support str or Path)
     config_dir = Path(CONFIG_DIR)
-    logger.debug(f"Attempting to load configs from directory: {config_dir}")
+    logger.debug("Attempting to load configs from directory: %s", config_dir)
+    previous = previous or {}
     configs = {}
 
     if not config_dir.exists():
         logger.warning(f"Config directory not found: {config_dir}")
         return configs
 
-    for file_path in config_dir.iterdir():
-        if not file_path.name.endswith((".yaml", ".yml")):
-            continue
+    for file_path in _config_files(config_dir):
         model_id = file_path.stem
         try:
-            data = yaml.safe_load(file_path.read_text()) or {}
-            data["model_id"] = model_id
-            # Validate schema
-            cfg = ModelConfig(**data)
-            configs[model_id] = cfg.model_dump()
-            logger.info(f"Loaded config for model '{model_id}' from '{file_path.name}'")
+            config = _load_config_file(file_path)
         except ValidationError as ve:
             logger.error(f"Configuration validation error in '{file_path.name}': {ve}")
+            if errors is not None:
+                errors[model_id] = str(ve)
         except Exception as e:
             logger.exception(f"Failed to load config file '{file_path.name}': {e}")
+            if errors is not None:
+                errors[model_id] = str(e)
+        else:
+            old = previous.get(model_id)
+            configs[model_id] = old if old == config else config
+            logger.info("Loaded config for model '%s' from '%s'", model_id, file_path.name)
+            continue
+        if model_id in previous:
+            logger.warning("Keeping previous config for model '%s'", model_id)
+            configs[model_id] = previous[model_id]
 
-    logger.debug(f"Total configs loaded: {len(configs)}")
+    logger.debug("Total configs loaded: %d", len(configs))
     return configs
- 
+
+
+class ConfigRegistry(Mapping):
+    """
+    The live model configs.
+
+    Reads go to the current snapshot; a reload builds a new snapshot and swaps it
+    in with a single assignment. Requests hold on to the config dict they looked
+    up, so in-flight work finishes on the snapshot it started with.
+    """
+
+    def __init__(self, configs: dict):
+        self._snapshot = configs
+        self.reloads = 0
+        self.errors: dict[str, str] = {}
+
+    def __getitem__(self, model_id: str) -> dict:
+        return self._snapshot[model_id]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._snapshot)
+
+    def __len__(self) -> int:
+        return len(self._snapshot)
+
+    def snapshot(self) -> dict:
+        return self._snapshot
+
+    def reload(self) -> dict:
+        """Re-read the config directory and swap in the result. Returns the new snapshot."""
+        errors: dict[str, str] = {}
+        configs = load_all_configs(self._snapshot, errors)
+        added = configs.keys() - self._snapshot.keys()
+        removed = self._snapshot.keys() - configs.keys()
+        self._snapshot = configs
+        self.errors = errors
+        self.reloads += 1
+        config_reload_counter.add(1, {"result": "error" if errors else "success"})
+        logger.info(
+            "Reloaded model configs: %d models (added %s, removed %s, %d errors)",
+            len(configs), sorted(added), sorted(removed), len(errors)
+        )
+        return configs
+
+
 # Load all configs at import for reuse
-CONFIGS = load_all_configs()
\ No newline at end of file
+CONFIGS = ConfigRegistry(load_all_configs())
+
+meter.create_observable_gauge(
+    name="model_configs_loaded",
+    callbacks=[lambda options: [Observation(len(CONFIGS))]],
+    unit="1",
+    description="Model configs in the live snapshot"
+)
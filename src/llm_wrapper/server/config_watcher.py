@@ -0,0 +1,68 @@
+# src/server/config_watcher.py
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from llm_wrapper.lib.logging import setup_logger
+from llm_wrapper.server.config import CONFIG_RELOAD_INTERVAL
+from llm_wrapper.server.config_loader import CONFIGS, ConfigRegistry, config_fingerprint, touch_config_files
+
+logger = setup_logger("llm-server", "logs/server.log")
+
+# Serializes reloads from the watcher and the admin endpoint
+_reload_lock = asyncio.Lock()
+
+
+async def reload_configs(registry: ConfigRegistry = CONFIGS) -> dict:
+    """Reload model configs off the event loop and swap in the new snapshot."""
+    async with _reload_lock:
+        return await asyncio.to_thread(registry.reload)
+
+
+async def signal_config_reload(interval: float = CONFIG_RELOAD_INTERVAL) -> bool:
+    """
+    Make the config watchers of the other worker processes reload.
+
+    Workers share no memory, so this touches the config files; each watcher sees
+    the new mtimes within `interval` seconds. False when no watcher runs or the
+    files cannot be touched.
+    """
+    if interval <= 0:
+        return False
+    return await asyncio.to_thread(touch_config_files)
+
+
+async def watch_configs(interval: float, registry: ConfigRegistry = CONFIGS):
+    """Poll the config directory and reload when any YAML file changes."""
+    seen = await asyncio.to_thread(config_fingerprint)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            current = await asyncio.to_thread(config_fingerprint)
+            if current != seen:
+                seen = current
+                logger.info("Config directory changed, reloading model configs")
+                await reload_configs(registry)
+        except Exception:
+            logger.exception("Model config reload failed; keeping the running configs")
+
+
+@asynccontextmanager
+async def config_watch_lifespan(
+    interval: float = CONFIG_RELOAD_INTERVAL,
+    registry: ConfigRegistry = CONFIGS
+) -> AsyncIterator[None]:
+    """Run the config watcher for the duration of the application lifespan."""
+    if interval <= 0:
+        yield
+        return
+    task = asyncio.create_task(watch_configs(interval, registry))
+    try:
+        yield
+    finally:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
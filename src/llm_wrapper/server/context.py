@@ -0,0 +1,115 @@
+# src/server/context.py
+
+import hashlib
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from fastapi import Request
+
+from llm_wrapper.server.models import ChatCompletionRequest
+
+
+@dataclass(frozen=True)
+class RequestContext:
+    """Per-request options taken from HTTP headers, readable from the API layer."""
+    # Serve from the response cache when possible
+    cache_read: bool = True
+    # Store the upstream result in the response cache
+    cache_write: bool = True
+    # Client-declared timeout in seconds, measured from `started`
+    timeout: float | None = None
+    # Bearer token of the Authorization header, the default rate-limit tenant
+    api_key: str | None = None
+    # API-key tenant of work run for a caller outside its request (batch jobs)
+    tenant: str | None = None
+    started: float = field(default_factory=time.monotonic)
+
+    def remaining(self) -> float | None:
+        """Seconds left before the client's deadline, or None without one."""
+        if self.timeout is None:
+            return None
+        return max(0.0, self.started + self.timeout - time.monotonic())
+
+
+_current_context: ContextVar[RequestContext] = ContextVar("request_context", default=RequestContext())
+
+
+def get_request_context() -> RequestContext:
+    """Return the context bound to the current request (defaults outside a request)."""
+    return _current_context.get()
+
+
+def key_tenant() -> str | None:
+    """The tenant named by the current request's API key (hashed), or None without one."""
+    context = get_request_context()
+    if context.tenant is not None:
+        return context.tenant
+    if not context.api_key:
+        return None
+    return "key:" + hashlib.blake2b(context.api_key.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def tenant_of(request: ChatCompletionRequest, key: str = "api_key") -> str:
+    """
+    The tenant a request belongs to (rate limits, conversation scoping).
+
+    The API key (hashed) identifies the tenant by default; with `key: user` the
+    request's `user` field does. Each falls back to the other, then "anonymous".
+    """
+    hashed = key_tenant()
+    user = f"user:{request.user}" if request.user else None
+    if key == "user":
+        return user or hashed or "anonymous"
+    return hashed or user or "anonymous"
+
+
+def _cache_flags(request: Request) -> tuple[bool, bool]:
+    directives = {
+        d.strip().lower()
+        for d in request.headers.get("cache-control", "").split(",")
+    }
+    bypass = request.headers.get("x-cache-bypass", "").strip().lower() in ("1", "true", "yes")
+    if bypass or "no-store" in directives:
+        return False, False
+    if "no-cache" in directives:
+        # Revalidate: skip the cached copy but refresh it with the new result
+        return False, True
+    return True, True
+
+
+def _timeout(request: Request) -> float | None:
+    # X-Stainless-Timeout is sent by the official OpenAI SDKs
+    for header in ("x-request-timeout", "x-stainless-timeout"):
+        value = request.headers.get(header)
+        if value:
+            try:
+                timeout = float(value)
+            except ValueError:
+                continue
+            if timeout > 0:
+                return timeout
+    return None
+
+
+def _api_key(request: Request) -> str | None:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        return None
+    return token.strip()
+
+
+async def bind_request_context(request: Request) -> RequestContext:
+    """
+    Dependency that derives the RequestContext from headers and binds it for the
+    rest of the request, including any streaming response body.
+    """
+    cache_read, cache_write = _cache_flags(request)
+    context = RequestContext(
+        cache_read=cache_read,
+        cache_write=cache_write,
+        timeout=_timeout(request),
+        api_key=_api_key(request)
+    )
+    _current_context.set(context)
+    return context
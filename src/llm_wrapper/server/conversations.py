@@ -0,0 +1,205 @@
+# src/server/conversations.py
+
+import time
+from collections import OrderedDict
+
+from fastapi import HTTPException
+from opentelemetry import metrics
+from opentelemetry.metrics import Observation
+
+from llm_wrapper.lib.logging import setup_logger
+from llm_wrapper.server.codec import RawCompletion, dumps, loads
+from llm_wrapper.server.config import CONVERSATION_MAX_BYTES, CONVERSATION_TTL, WORKERS
+from llm_wrapper.server.context import tenant_of
+from llm_wrapper.server.models import ChatCompletionRequest, ChatCompletionResponse
+
+logger = setup_logger("llm-server", "logs/server.log")
+meter = metrics.get_meter("llm-wrapper")
+
+conversation_lookup_counter = meter.create_counter(
+    name="conversation_lookups_total",
+    unit="1",
+    description="Conversation history lookups by result (hit, miss)"
+)
+
+
+class _Conversation:
+    """History of one conversation, one encoded JSON message per item."""
+    __slots__ = ("messages", "size", "expires_at")
+
+    def __init__(self):
+        self.messages: list[bytes] = []
+        self.size = 0
+        self.expires_at = 0.0
+
+
+# A conversation's store key: (tenant, client-chosen conversation ID)
+ConversationKey = tuple[str, str]
+
+
+class ConversationStore:
+    """
+    Message histories keyed by tenant and client-chosen conversation ID.
+
+    Messages are kept encoded (one compact JSON document each) rather than as
+    dicts or models. Conversations expire `ttl` seconds after their last turn and
+    the least recently used ones are evicted past `max_bytes`; a conversation that
+    alone exceeds the bound loses its oldest messages.
+    """
+
+    def __init__(self, ttl: float, max_bytes: int):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._conversations: OrderedDict[ConversationKey, _Conversation] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._conversations)
+
+    def history(self, key: ConversationKey) -> list[dict]:
+        """Messages of earlier turns, oldest first (empty for unknown or expired keys)."""
+        conversation = self._conversations.get(key)
+        if conversation is not None and conversation.expires_at <= time.monotonic():
+            self._remove(key)
+            conversation = None
+        if conversation is None:
+            conversation_lookup_counter.add(1, {"result": "miss"})
+            return []
+        conversation_lookup_counter.add(1, {"result": "hit"})
+        self._conversations.move_to_end(key)
+        return [loads(message) for message in conversation.messages]
+
+    def size(self, key: ConversationKey) -> int:
+        """Encoded bytes of a conversation's history (0 for unknown keys)."""
+        conversation = self._conversations.get(key)
+        return conversation.size if conversation is not None else 0
+
+    def append(self, key: ConversationKey, messages: list[dict]):
+        """Add a turn's messages to a conversation, starting it if needed."""
+        if self.ttl <= 0 or not messages:
+            return
+        conversation = self._conversations.get(key)
+        if conversation is None:
+            conversation = self._conversations[key] = _Conversation()
+        self._conversations.move_to_end(key)
+        for message in messages:
+            encoded = dumps(message)
+            conversation.messages.append(encoded)
+            conversation.size += len(encoded)
+            self.total_bytes += len(encoded)
+        conversation.expires_at = time.monotonic() + self.ttl
+
+        while conversation.size > self.max_bytes and conversation.messages:
+            dropped = len(conversation.messages.pop(0))
+            conversation.size -= dropped
+            self.total_bytes -= dropped
+        while self.total_bytes > self.max_bytes:
+            self._remove(next(iter(self._conversations)))
+
+    def clear(self):
+        self._conversations.clear()
+        self.total_bytes = 0
+
+    def _remove(self, key: ConversationKey):
+        conversation = self._conversations.pop(key)
+        self.total_bytes -= conversation.size
+
+
+conversations = ConversationStore(CONVERSATION_TTL, CONVERSATION_MAX_BYTES)
+
+
+def conversation_key(request: ChatCompletionRequest) -> ConversationKey:
+    """Conversation IDs are scoped to the caller's tenant (API key, else `user`)."""
+    return tenant_of(request, "api_key"), request.conversation_id
+
+
+def check_conversation(request: ChatCompletionRequest):
+    """
+    Refuse a `conversation_id` when the server runs several workers.
+
+    Histories live in one worker's memory, so with several WORKERS consecutive
+    turns would land on different stores; such requests are refused instead of
+    silently losing their context. Streaming routes build the upstream payload
+    (and so run this check) before the response starts, while a 400 can still be sent.
+    """
+    if request.conversation_id and WORKERS > 1:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "message": "conversation_id is not supported when the server runs several workers (WORKERS > 1); "
+                           "send the full message history instead.",
+                "type": "invalid_request_error",
+                "param": "conversation_id",
+            }
+        )
+
+
+def conversation_history(request: ChatCompletionRequest) -> list[dict]:
+    """Earlier turns of the request's conversation (empty without a `conversation_id`)."""
+    if not request.conversation_id:
+        return []
+    check_conversation(request)
+    return conversations.history(conversation_key(request))
+
+
+def turn_messages(request: ChatCompletionRequest) -> list[dict]:
+    """The request's own messages as upstream dicts, without system prompts."""
+    return [m.model_dump(exclude_none=True) for m in request.messages if m.role != "system"]
+
+
+def reply_message(response: ChatCompletionResponse | RawCompletion) -> dict | None:
+    """The first choice's assistant message of a completion."""
+    if isinstance(response, RawCompletion):
+        choices = loads(response.body).get("choices") or []
+        return choices[0].get("message") if choices else None
+    if not response.choices:
+        return None
+    return response.choices[0].message.model_dump(exclude_none=True)
+
+
+def record_turn(request: ChatCompletionRequest, reply: dict | None):
+    """Append a completed turn (the request's messages and the reply) to its conversation."""
+    if not request.conversation_id or reply is None:
+        return
+    conversations.append(conversation_key(request), [*turn_messages(request), reply])
+
+
+class ReplyCollector:
+    """Rebuilds the assistant message of a relayed stream from its content deltas."""
+
+    def __init__(self):
+        self._parts: list[str] = []
+
+    def observe(self, event: str | bytes):
+        if isinstance(event, str):
+            event = event.encode("utf-8")
+        for line in event.split(b"\n"):
+            if not line.startswith(b"data: ") or line.startswith(b"data: [DONE]"):
+                continue
+            try:
+                chunk = loads(line[6:])
+            except ValueError:
+                continue
+            for choice in chunk.get("choices") or ():
+                if choice.get("index", 0) == 0:
+                    content = (choice.get("delta") or {}).get("content")
+                    if content:
+                        self._parts.append(content)
+
+    def message(self) -> dict:
+        return {"role": "assistant", "content": "".join(self._parts)}
+
+
+meter.create_observable_gauge(
+    name="conversation_store_entries",
+    callbacks=[lambda options: [Observation(len(conversations))]],
+    unit="1",
+    description="Conversations held by the conversation store"
+)
+
+meter.create_observable_gauge(
+    name="conversation_store_size_bytes",
+    callbacks=[lambda options: [Observation(conversations.total_bytes)]],
+    unit="bytes",
+    description="Encoded size of messages held by the conversation store"
+)
@@ -1,8 +1,12 @@
 # deps.py handles request parsing manually for DI
-from fastapi import Depends, Body
+import secrets
+
+from fastapi import Depends, Body, Header, HTTPException, Request
 
 # Dependencies to extract and override the system prompt via DI
 from llm_wrapper.server.api import get_config_or_raise
+from llm_wrapper.server.codec import decode_chat_request
+from llm_wrapper.server.config import ADMIN_TOKEN, FAST_REQUEST_DECODING
 from llm_wrapper.server.models import ChatCompletionRequest
 
 async def get_chat_request(
@@ -11,12 +15,39 @@ async def get_chat_request(
     """Dependency that parses the ChatCompletionRequest body."""
     return chat_request
 
-async def get_system_prompt(
-    chat_request: ChatCompletionRequest = Depends(get_chat_request)
-) -> str:
+async def get_fast_chat_request(request: Request) -> ChatCompletionRequest:
+    """Dependency that decodes the body checking only the fields the proxy uses."""
+    try:
+        return decode_chat_request(await request.body())
+    except ValueError as e:
+        raise HTTPException(
+            status_code=422,
+            detail={"message": f"Invalid request body: {e}", "type": "invalid_request_error"}
+        )
+
+# Body dependency of the chat routes, chosen by FAST_REQUEST_DECODING
+chat_request_dependency = get_fast_chat_request if FAST_REQUEST_DECODING else get_chat_request
+
+async def get_model_config(
+    chat_request: ChatCompletionRequest = Depends(chat_request_dependency)
+) -> dict:
+    """
+    Dependency resolving the requested model's config (404 for unknown models).
+    FastAPI caches it per request, so the system prompt and the route share one lookup.
+    """
+    return get_config_or_raise(chat_request.model)
+
+async def get_system_prompt(config: dict = Depends(get_model_config)) -> str:
     """
     Retrieve the system prompt for a chat completion, from config.
     Can be overridden in tests via app.dependency_overrides(get_system_prompt).
     """
-    config = get_config_or_raise(chat_request.model)
-    return config.get("system_prompt", "")
\ No newline at end of file
+    return config.get("system_prompt", "")
+
+async def require_admin(authorization: str = Header(default="")):
+    """Dependency guarding /admin routes with ADMIN_TOKEN when one is configured."""
+    if ADMIN_TOKEN and not secrets.compare_digest(authorization.encode(), f"Bearer {ADMIN_TOKEN}".encode()):
+        raise HTTPException(
+            status_code=401,
+            detail={"message": "Invalid admin token", "type": "invalid_request_error"}
+        )
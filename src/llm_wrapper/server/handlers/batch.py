@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+import logging
+from typing import AsyncIterator
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from opentelemetry import trace
+
+from llm_wrapper.lib.telemetry.telemetry import ROUTE_ATTRIBUTE
+from llm_wrapper.server.api import call_completion, get_config_or_raise
+from llm_wrapper.server.codec import completion_model
+from llm_wrapper.server.config import BATCH_MAX_CONCURRENCY, BATCH_MAX_ITEMS
+from llm_wrapper.server.models import (
+    BatchChatCompletionRequest,
+    BatchChatCompletionResponse,
+    BatchItemResult,
+    ChatCompletionRequest,
+)
+
+
+# Setup logger and tracer
+server_name = "llm-server-wrapper"
+logger = logging.getLogger(server_name)
+tracer = trace.get_tracer(server_name)
+
+
+def _item_error(e: Exception) -> dict:
+    if isinstance(e, HTTPException):
+        detail = e.detail if isinstance(e.detail, dict) else {"message": str(e.detail)}
+        return {"type": "api_error", **detail, "status_code": e.status_code}
+    return {"message": str(e), "type": "api_error", "status_code": 500}
+
+
+async def _complete_item(index: int, item: ChatCompletionRequest, semaphore: asyncio.Semaphore) -> BatchItemResult:
+    async with semaphore:
+        try:
+            config = get_config_or_raise(item.model)
+            request = item.model_copy(update={"stream": False}) if item.stream else item
+            response = await call_completion(request, config.get("system_prompt", ""))
+            return BatchItemResult(index=index, response=completion_model(response))
+        except Exception as e:
+            logger.warning("Batch item %d failed: %s", index, e)
+            return BatchItemResult(index=index, error=_item_error(e))
+
+
+async def iter_batch_results(batch: BatchChatCompletionRequest) -> AsyncIterator[BatchItemResult]:
+    """Run every item with bounded concurrency, yielding results as they complete."""
+    concurrency = min(batch.max_concurrency or BATCH_MAX_CONCURRENCY, BATCH_MAX_CONCURRENCY)
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = [
+        asyncio.ensure_future(_complete_item(index, item, semaphore))
+        for index, item in enumerate(batch.requests)
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Client went away mid-batch: stop issuing upstream calls
+        for task in tasks:
+            task.cancel()
+
+
+def validate_batch(batch: BatchChatCompletionRequest):
+    if len(batch.requests) > BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail={"message": f"Batch has {len(batch.requests)} requests; the limit is {BATCH_MAX_ITEMS}."}
+        )
+
+
+async def _ndjson(batch: BatchChatCompletionRequest) -> AsyncIterator[str]:
+    async for result in iter_batch_results(batch):
+        yield result.model_dump_json(exclude_none=True) + "\n"
+
+
+async def handle_batch(batch: BatchChatCompletionRequest):
+    validate_batch(batch)
+    with tracer.start_as_current_span(
+        "chat_completion_batch",
+        attributes={ROUTE_ATTRIBUTE: "/v1/chat/completions/batch"}
+    ) as span:
+        span.set_attribute("batch.size", len(batch.requests))
+        span.set_attribute("batch.streaming", batch.stream)
+        if batch.stream:
+            return StreamingResponse(
+                _ndjson(batch),
+                media_type="application/x-ndjson",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+
+        results = [result async for result in iter_batch_results(batch)]
+        results.sort(key=lambda r: r.index)
+        span.set_attribute("batch.errors", sum(1 for r in results if r.error))
+        return BatchChatCompletionResponse(results=results)
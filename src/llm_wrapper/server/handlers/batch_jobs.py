@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import logging
+from typing import AsyncIterator
+
+from fastapi import Request
+from opentelemetry import trace
+
+from llm_wrapper.server.batches import batch_store, invalid_request, wake_scheduler
+from llm_wrapper.server.context import key_tenant
+from llm_wrapper.server.models import BatchObject, CreateBatchRequest, FileObject
+
+
+# Setup logger and tracer
+server_name = "llm-server-wrapper"
+logger = logging.getLogger(server_name)
+tracer = trace.get_tracer(server_name)
+
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+async def _read_upload(upload) -> AsyncIterator[bytes]:
+    while chunk := await upload.read(UPLOAD_CHUNK_BYTES):
+        yield chunk
+
+
+async def handle_file_upload(request: Request) -> FileObject:
+    """
+    Store a batch input file.
+
+    Accepts the OpenAI SDK's multipart form (`file`, `purpose`), or the raw JSONL
+    as the body with `purpose` (and optionally `filename`) as query parameters.
+    """
+    with tracer.start_as_current_span("files.upload"):
+        if request.headers.get("content-type", "").startswith("multipart/form-data"):
+            form = await request.form()
+            upload = form.get("file")
+            if upload is None or isinstance(upload, str):
+                raise invalid_request("Missing 'file' in the form.")
+            purpose, filename, chunks = form.get("purpose"), upload.filename or "upload.jsonl", _read_upload(upload)
+        else:
+            purpose = request.query_params.get("purpose")
+            filename = request.query_params.get("filename") or "upload.jsonl"
+            chunks = request.stream()
+        if purpose != "batch":
+            raise invalid_request("Only purpose 'batch' is supported.")
+        file = await batch_store.create_file(filename, purpose, chunks)
+        logger.info("Stored file %s (%d bytes)", file.id, file.bytes)
+        return file
+
+
+def handle_create_batch(request: CreateBatchRequest) -> BatchObject:
+    with tracer.start_as_current_span("batches.create"):
+        batch = batch_store.create_batch(request, owner=key_tenant())
+        logger.info("Created batch %s for file %s", batch.id, batch.input_file_id)
+        wake_scheduler()
+        return batch
@@ -5,6 +5,7 @@ import logging
 from fastapi.responses import StreamingResponse
 
 from opentelemetry import trace
+from llm_wrapper.lib.telemetry.telemetry import set_lazy_attributes
 from llm_wrapper.server.models import ChatCompletionRequest
 from llm_wrapper.server.api import call_completion, stream_completion
 
@@ -17,6 +18,8 @@ tracer = trace.get_tracer(server_name)
 
 def _trace_input(chat_request: ChatCompletionRequest):
     with tracer.start_as_current_span("chat_completion.prepare_input") as span:
+        if not span.is_recording():
+            return
         messages = chat_request.messages or []
         span.set_attribute("messages.count", len(messages))
         if messages and "content" in messages[-1]:
@@ -28,12 +31,17 @@ def _trace_system_prompt(system_prompt: str):
         span.set_attribute("system_prompt.length", len(system_prompt))
 
 
-def _handle_streaming(chat_request: ChatCompletionRequest, system_prompt: str):
+def _handle_streaming(
+    chat_request: ChatCompletionRequest,
+    system_prompt: str,
+    config: dict | None = None,
+    payload: dict | None = None
+):
     logger.info("Streaming chat completion")
     with tracer.start_as_current_span("chat_completion.stream_response") as span:
         span.set_attribute("streaming.enabled", True)
         return StreamingResponse(
-            stream_completion(chat_request, system_prompt),
+            stream_completion(chat_request, system_prompt, config, payload),
             media_type="text/event-stream",
             headers={
                 "Cache-Control": "no-cache",
@@ -49,7 +57,7 @@ async def _handle_completion(chat_request: ChatCompletionRequest, system_prompt:
     with tracer.start_as_current_span("chat_completion.call_llm") as span:
         span.set_attribute("llm.model", chat_request.model)
         response = await call_completion(chat_request, system_prompt)
-        span.set_attribute("response.length", len(str(response)))
+        set_lazy_attributes(span, lambda: {"response.length": len(str(response))})
         return response
 
 
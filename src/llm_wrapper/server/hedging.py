@@ -0,0 +1,280 @@
+# src/server/hedging.py
+
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import Collection
+from typing import AsyncGenerator, AsyncIterator, Awaitable, Callable, TypeVar
+
+from opentelemetry import metrics
+
+from llm_wrapper.lib.logging import setup_logger
+from llm_wrapper.server.balancer import ReplicaLease, ReplicaSet, balancer
+
+logger = setup_logger("llm-server", "logs/server.log")
+meter = metrics.get_meter("llm-wrapper")
+
+T = TypeVar("T")
+
+COMPLETION = "completion"
+STREAM = "stream"
+
+# Hedges a model may bank for bursts; each request earns `budget` of one hedge
+BUDGET_BURST = 10.0
+# Latency samples kept per model and kind for the adaptive (p95) delay
+LATENCY_WINDOW = 512
+# Below this many samples the p95 is not trusted and requests are not hedged
+MIN_SAMPLES = 20
+# New samples between p95 recomputations
+P95_REFRESH = 16
+# Events buffered per streaming attempt before the upstream read pauses
+STREAM_BUFFER = 64
+
+hedges_counter = meter.create_counter(
+    name="upstream_hedges_total",
+    unit="1",
+    description="Hedged upstream requests issued, by model and kind (completion or stream)"
+)
+
+hedges_won_counter = meter.create_counter(
+    name="upstream_hedges_won_total",
+    unit="1",
+    description="Hedged upstream requests that answered before the original"
+)
+
+
+def hedging_enabled(config: dict) -> bool:
+    return bool((config.get("hedging") or {}).get("enabled"))
+
+
+class LatencyWindow:
+    """Recent latencies of one model, with a lazily refreshed p95."""
+
+    def __init__(self, size: int = LATENCY_WINDOW):
+        self._samples: deque[float] = deque(maxlen=size)
+        self._p95: float | None = None
+        self._fresh = 0
+
+    def add(self, latency: float):
+        self._samples.append(latency)
+        self._fresh += 1
+
+    def p95(self) -> float | None:
+        if len(self._samples) < MIN_SAMPLES:
+            return None
+        if self._p95 is None or self._fresh >= P95_REFRESH:
+            ordered = sorted(self._samples)
+            self._p95 = ordered[math.ceil(0.95 * len(ordered)) - 1]
+            self._fresh = 0
+        return self._p95
+
+
+class HedgeBudget:
+    """Token bucket capping hedges to a fraction of requests: each request deposits `ratio`, each hedge spends one."""
+
+    def __init__(self, ratio: float):
+        self.ratio = ratio
+        self.tokens = 0.0
+
+    def deposit(self):
+        self.tokens = min(BUDGET_BURST, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+
+class _StreamAttempt:
+    """One upstream stream pumped into a queue by its own task, so attempts can race on their first event."""
+
+    def __init__(self, lease: ReplicaLease, open_stream: Callable[[ReplicaLease], AsyncIterator], latencies: LatencyWindow):
+        self.lease = lease
+        self.first: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_BUFFER)
+        self.task = asyncio.ensure_future(self._pump(open_stream, latencies))
+
+    async def _pump(self, open_stream, latencies: LatencyWindow):
+        started = time.monotonic()
+        try:
+            with self.lease:
+                async for event in open_stream(self.lease):
+                    if not self.first.done():
+                        latencies.add(time.monotonic() - started)
+                        self.first.set_result(self)
+                    await self._queue.put(event)
+        except Exception as e:
+            if not self.first.done():
+                self.first.set_exception(e)
+                return
+            await self._queue.put(e)
+        if not self.first.done():
+            self.first.set_result(self)
+        await self._queue.put(None)
+
+    async def events(self) -> AsyncGenerator:
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def cancel(self):
+        self.task.cancel()
+        if not self.first.done():
+            self.first.cancel()
+        elif not self.first.cancelled():
+            # Mark a losing attempt's failure as retrieved
+            self.first.exception()
+
+
+async def _first_success(futures: list[asyncio.Future]) -> asyncio.Future:
+    """The first future to succeed, or the first failure when all of them fail."""
+    pending = set(futures)
+    failed = None
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for future in futures:
+            if future in done and future.exception() is None:
+                return future
+        failed = failed or next(f for f in futures if f in done)
+    return failed
+
+
+class Hedger:
+    """
+    Sends a second copy of a slow upstream request to another replica.
+
+    When the original has not answered (or, for streams, sent its first event)
+    within the model's hedge delay, the request is repeated on the cheapest other
+    replica with room. The first to answer wins and the other is cancelled.
+    Hedges are capped per model by a token budget.
+    """
+
+    def __init__(self):
+        self._budgets: dict[str, HedgeBudget] = {}
+        self._latencies: dict[tuple[str, str], LatencyWindow] = {}
+
+    def budget(self, model_id: str, ratio: float) -> HedgeBudget:
+        budget = self._budgets.get(model_id)
+        if budget is None:
+            budget = self._budgets[model_id] = HedgeBudget(ratio)
+        budget.ratio = ratio
+        return budget
+
+    def latencies(self, model_id: str, kind: str) -> LatencyWindow:
+        window = self._latencies.get((model_id, kind))
+        if window is None:
+            window = self._latencies[(model_id, kind)] = LatencyWindow()
+        return window
+
+    def delay(self, model_id: str, kind: str, settings: dict) -> float | None:
+        """Seconds to wait before hedging: fixed, or the observed p95 (None until enough samples)."""
+        delay = settings.get("delay", "p95")
+        if delay == "p95":
+            delay = self.latencies(model_id, kind).p95()
+            if delay is None:
+                return None
+        return max(float(delay), float(settings.get("min_delay") or 0.0))
+
+    def _prepare(self, model_id: str, config: dict, kind: str) -> tuple[ReplicaSet, HedgeBudget, float | None]:
+        settings = config.get("hedging") or {}
+        replica_set = balancer.replica_set(model_id, config["api"])
+        budget = self.budget(model_id, float(settings.get("budget", 0.05)))
+        budget.deposit()
+        return replica_set, budget, self.delay(model_id, kind, settings)
+
+    def _hedge_lease(
+        self,
+        replica_set: ReplicaSet,
+        budget: HedgeBudget,
+        first: ReplicaLease,
+        kind: str,
+        exclude: Collection[str]
+    ) -> ReplicaLease | None:
+        replica = replica_set.alternate({first.url, *exclude})
+        if replica is None or not budget.withdraw():
+            return None
+        hedges_counter.add(1, {"model": replica_set.model_id, "kind": kind})
+        logger.info("Hedging %s request for model '%s' from %s to %s", kind, replica_set.model_id, first.url, replica.url)
+        return replica_set.lease(replica=replica)
+
+    def _won(self, replica_set: ReplicaSet, kind: str):
+        hedges_won_counter.add(1, {"model": replica_set.model_id, "kind": kind})
+
+    async def call(
+        self,
+        model_id: str,
+        config: dict,
+        attempt: Callable[[ReplicaLease], Awaitable[T]],
+        exclude: Collection[str] = (),
+        payload: dict | None = None
+    ) -> T:
+        """Run `attempt` on a leased replica (avoiding `exclude`), hedging it on another if it is slow."""
+        replica_set, budget, delay = self._prepare(model_id, config, COMPLETION)
+        latencies = self.latencies(model_id, COMPLETION)
+
+        async def run(lease: ReplicaLease) -> T:
+            started = time.monotonic()
+            with lease:
+                result = await attempt(lease)
+            latencies.add(time.monotonic() - started)
+            return result
+
+        first = replica_set.lease(exclude, payload=payload)
+        tasks = [asyncio.ensure_future(run(first))]
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                hedge = None if done else self._hedge_lease(replica_set, budget, first, COMPLETION, exclude)
+                if hedge is not None:
+                    tasks.append(asyncio.ensure_future(run(hedge)))
+                    winner = await _first_success(tasks)
+                    if winner is tasks[1] and winner.exception() is None:
+                        self._won(replica_set, COMPLETION)
+                    return winner.result()
+            return await tasks[0]
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def stream(
+        self,
+        model_id: str,
+        config: dict,
+        open_stream: Callable[[ReplicaLease], AsyncIterator],
+        exclude: Collection[str] = (),
+        payload: dict | None = None
+    ) -> AsyncGenerator:
+        """Relay `open_stream` from a leased replica (avoiding `exclude`), hedging it on another if the first event is slow."""
+        replica_set, budget, delay = self._prepare(model_id, config, STREAM)
+        latencies = self.latencies(model_id, STREAM)
+
+        first = replica_set.lease(exclude, payload=payload)
+        attempts = [_StreamAttempt(first, open_stream, latencies)]
+        try:
+            winner = attempts[0]
+            if delay is not None:
+                done, _ = await asyncio.wait([winner.first], timeout=delay)
+                hedge = None if done else self._hedge_lease(replica_set, budget, first, STREAM, exclude)
+                if hedge is not None:
+                    attempts.append(_StreamAttempt(hedge, open_stream, latencies))
+                    winner = (await _first_success([a.first for a in attempts])).result()
+                    if winner is attempts[1]:
+                        self._won(replica_set, STREAM)
+            await winner.first
+            for attempt in attempts:
+                if attempt is not winner:
+                    attempt.cancel()
+            async for event in winner.events():
+                yield event
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+
+
+hedger = Hedger()
@@ -1,17 +1,37 @@
 import time
 import uvicorn
 import os
+from contextlib import asynccontextmanager
 from llm_wrapper.lib.logging import setup_logger
 import logging  # retain for TelemetrySetup and opentelemetry internals
 
-from fastapi import FastAPI, HTTPException, Request, Depends
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi import FastAPI, HTTPException, Request, Depends, Query
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from pydantic import BaseModel
 
-from llm_wrapper.lib.telemetry.telemetry import TelemetrySetup
-from llm_wrapper.server.models import ChatCompletionRequest, ModelList, ModelData
-from llm_wrapper.server.api import call_completion, stream_completion
+from llm_wrapper.lib.telemetry.telemetry import ROUTE_ATTRIBUTE, TelemetrySetup, set_lazy_attributes
+from llm_wrapper.server.models import (
+    BatchChatCompletionRequest,
+    BatchChatCompletionResponse,
+    BatchList,
+    BatchObject,
+    ChatCompletionRequest,
+    CreateBatchRequest,
+    FileObject,
+    ModelList,
+    ModelData,
+)
+from llm_wrapper.server.admission import admission
+from llm_wrapper.server.api import build_upstream_payload, call_completion, check_upstream, stream_completion
+from llm_wrapper.server.batches import batch_lifespan, batch_store
+from llm_wrapper.server.codec import RawCompletion
 from llm_wrapper.server.config_loader import CONFIGS
-from llm_wrapper.server.deps import get_chat_request, get_system_prompt
+from llm_wrapper.server.context import bind_request_context
+from llm_wrapper.server.config import ADMIN_TOKEN, HOST, PORT, PROMETHEUS_PORT, WORKERS
+from llm_wrapper.server.config_watcher import config_watch_lifespan, reload_configs, signal_config_reload
+from llm_wrapper.server.deps import chat_request_dependency, get_model_config, get_system_prompt, require_admin
+from llm_wrapper.server.pool import pool_lifespan
+from llm_wrapper.server.ratelimit import rate_limiter
 from llm_wrapper.server.handlers.chat import (
     _trace_input,
     _trace_system_prompt,
@@ -19,6 +39,9 @@ from llm_wrapper.server.handlers.chat import (
     _handle_completion,
     _trace_error,
 )
+from llm_wrapper.server.handlers.batch import handle_batch
+from llm_wrapper.server.handlers.batch_jobs import handle_create_batch, handle_file_upload
+from llm_wrapper.server.workers import serve_workers
 
 from opentelemetry import trace, metrics
 
@@ -37,10 +60,12 @@ if _disable_telemetry:
     # No-op implementations
     class _NoOpSpan:
         def set_attribute(self, key, value): return self
+        def set_attributes(self, attributes): return self
+        def is_recording(self): return False
         def __enter__(self): return self
         def __exit__(self, exc_type, exc, tb): pass
     class _NoOpTracer:
-        def start_as_current_span(self, name): return _NoOpSpan()
+        def start_as_current_span(self, name, **kwargs): return _NoOpSpan()
     class _NoOpCounter:
         def __init__(self, *args, **kwargs): pass
         def add(self, value, attributes=None): pass
@@ -55,7 +80,7 @@ else:
     telemetry = TelemetrySetup(
         service_name="llm-wrapper",
         otlp_endpoint="http://localhost:4318/v1/traces",
-        prometheus_port=9464
+        prometheus_port=PROMETHEUS_PORT
     )
     tracer = telemetry.get_tracer()
     meter = telemetry.get_meter()
@@ -79,11 +104,21 @@ response_length_histogram = meter.create_histogram(
     description="Size of chat completion responses"
 )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Own long-lived resources (upstream connection pools, config watcher, batch jobs) for the app's lifetime."""
+    if not ADMIN_TOKEN:
+        logger.warning("ADMIN_TOKEN is unset: /admin routes are open to any client that can reach the server")
+    async with pool_lifespan(), config_watch_lifespan(), batch_lifespan():
+        yield
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="LLM Wrapper API",
     description="OpenAI-compatible wrapper with tracing and metrics",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configs loaded at import time in config_loader module
@@ -92,7 +127,7 @@ logger.info("Server startup complete. Loaded models: %s", list(CONFIGS.keys()))
 
 @app.get("/health")
 def health_check():
-    with tracer.start_as_current_span("health_check"):
+    with tracer.start_as_current_span("health_check", attributes={ROUTE_ATTRIBUTE: "/health"}):
         request_counter.add(1, {"route": "/health"})
         logger.info("Health check successful")
         return {"status": "ok"}
@@ -100,24 +135,36 @@ def health_check():
 
 @app.get("/v1/models", response_model=ModelList)
 def list_models():
-    with tracer.start_as_current_span("list_models"):
+    with tracer.start_as_current_span("list_models", attributes={ROUTE_ATTRIBUTE: "/v1/models"}):
         request_counter.add(1, {"route": "/v1/models"})
         timestamp = int(time.time())
         models = [ModelData(id=model_id, created=timestamp) for model_id in CONFIGS.keys()]
         return ModelList(data=models)
 
 
-@app.post("/v1/chat/completions")
+def _response_size(response) -> int:
+    """Serialized size of a completion, without building its repr."""
+    if isinstance(response, RawCompletion):
+        return len(response)
+    if isinstance(response, BaseModel):
+        return len(response.model_dump_json())
+    return len(str(response))
+
+
+@app.post("/v1/chat/completions", dependencies=[Depends(bind_request_context)])
 async def chat_completion(
-    chat_request: ChatCompletionRequest = Depends(get_chat_request),
-    system_prompt: str = Depends(get_system_prompt)
+    chat_request: ChatCompletionRequest = Depends(chat_request_dependency),
+    system_prompt: str = Depends(get_system_prompt),
+    config: dict = Depends(get_model_config)
 ):
     """
     Handles OpenAI-compatible chat completion requests with optional streaming.
     Includes fine-grained tracing and Prometheus metrics.
     """
-    with tracer.start_as_current_span("chat_completion") as root_span:
-        root_span.set_attribute("model", chat_request.model)
+    with tracer.start_as_current_span(
+        "chat_completion",
+        attributes={ROUTE_ATTRIBUTE: "/v1/chat/completions", "model": chat_request.model}
+    ) as root_span:
         root_span.set_attribute("streaming", chat_request.stream)
 
         # Track request
@@ -126,29 +173,42 @@ async def chat_completion(
 
         # Attach input to trace
         if chat_request.messages:
-            root_span.set_attribute("input.message_count", len(chat_request.messages))
-            # Fix here - using dot notation instead of subscript
-            root_span.set_attribute("input.last_message", chat_request.messages[-1].content[:100])
+            set_lazy_attributes(root_span, lambda: {
+                "input.message_count": len(chat_request.messages),
+                "input.last_message": chat_request.messages[-1].content[:100],
+            })
 
         try:
             _trace_input(chat_request)
             _trace_system_prompt(system_prompt)
 
             if chat_request.stream:
-                return _handle_streaming(chat_request, system_prompt)
+                # Streams cannot return a 400/429/503 once started, so reject up front;
+                # the payload is validated before the rate limits are charged
+                payload = build_upstream_payload(chat_request, config, system_prompt)
+                rate_limiter.check(chat_request.model, config, chat_request)
+                admission.check(chat_request.model, config)
+                check_upstream(chat_request.model, config)
+                return _handle_streaming(chat_request, system_prompt, config, payload)
 
             # Non-streaming: directly call completion and measure
-            response = await call_completion(chat_request, system_prompt)
-
-            response_str = str(response)
-            response_length = len(response_str)
+            response = await call_completion(chat_request, system_prompt, config)
 
-            root_span.set_attribute("output.preview", response_str[:200])
-            root_span.set_attribute("output.length", response_length)
+            response_length = _response_size(response)
+            set_lazy_attributes(root_span, lambda: {
+                "output.preview": str(response)[:200],
+                "output.length": response_length,
+            })
             response_length_histogram.record(response_length, {"model": chat_request.model})
 
+            if isinstance(response, RawCompletion):
+                # Forward the upstream bytes as-is instead of re-serializing a model
+                return response.as_response()
             return response
 
+        except HTTPException:
+            # Already an OpenAI-style error (404, 429, ...); let the handler render it
+            raise
         except Exception as e:
             _trace_error(e)
             raise HTTPException(
@@ -157,6 +217,84 @@ async def chat_completion(
                 headers={"X-Error": "Internal Server Error"}
             ) from e
 
+@app.post(
+    "/v1/chat/completions/batch",
+    response_model=BatchChatCompletionResponse,
+    response_model_exclude_none=True,
+    dependencies=[Depends(bind_request_context)]
+)
+async def chat_completion_batch(batch: BatchChatCompletionRequest):
+    """
+    Runs many chat completions in one request with bounded upstream concurrency.
+    Failed items carry an error instead of failing the whole batch.
+    """
+    request_counter.add(1, {"route": "/v1/chat/completions/batch"})
+    for item in batch.requests:
+        chat_completion_counter.add(1, {"model": item.model})
+    return await handle_batch(batch)
+
+@app.post("/v1/files", response_model=FileObject, dependencies=[Depends(bind_request_context)])
+async def upload_file(request: Request):
+    """Upload a JSONL batch input file (multipart as sent by the OpenAI SDK, or a raw body)."""
+    request_counter.add(1, {"route": "/v1/files"})
+    return await handle_file_upload(request)
+
+@app.get("/v1/files/{file_id}", response_model=FileObject)
+def retrieve_file(file_id: str):
+    request_counter.add(1, {"route": "/v1/files/{file_id}"})
+    return batch_store.get_file(file_id)
+
+@app.get("/v1/files/{file_id}/content")
+def retrieve_file_content(file_id: str):
+    request_counter.add(1, {"route": "/v1/files/{file_id}/content"})
+    batch_store.get_file(file_id)
+    return FileResponse(batch_store.file_path(file_id), media_type="application/jsonl")
+
+@app.post("/v1/batches", response_model=BatchObject, dependencies=[Depends(bind_request_context)])
+async def create_batch(request: CreateBatchRequest):
+    """
+    Start an offline batch job over an uploaded JSONL file of chat completion requests.
+    Results are written to the job's output and error files; poll the job for progress.
+    """
+    request_counter.add(1, {"route": "/v1/batches"})
+    return handle_create_batch(request)
+
+@app.get("/v1/batches", response_model=BatchList)
+def list_batches(after: str | None = None, limit: int = Query(default=20, ge=1, le=100)):
+    request_counter.add(1, {"route": "/v1/batches"})
+    return batch_store.list_batches(after, limit)
+
+@app.get("/v1/batches/{batch_id}", response_model=BatchObject)
+def retrieve_batch(batch_id: str):
+    request_counter.add(1, {"route": "/v1/batches/{batch_id}"})
+    return batch_store.get_batch(batch_id)
+
+@app.post("/v1/batches/{batch_id}/cancel", response_model=BatchObject)
+def cancel_batch(batch_id: str):
+    """Stop starting new requests; requests already sent finish before the job is cancelled."""
+    request_counter.add(1, {"route": "/v1/batches/{batch_id}/cancel"})
+    return batch_store.cancel_batch(batch_id)
+
+@app.post("/admin/reload-configs", dependencies=[Depends(require_admin)])
+async def admin_reload_configs():
+    """
+    Re-read model configs now; files that fail validation keep their previous config.
+
+    The response describes the worker that handled the request. With several
+    WORKERS the others reload from their config watchers (`other_workers` is
+    "reload_pending"), or keep their configs when that is not possible ("not_reloaded").
+    """
+    request_counter.add(1, {"route": "/admin/reload-configs"})
+    configs = await reload_configs()
+    result = {"models": sorted(configs), "reloads": CONFIGS.reloads, "errors": CONFIGS.errors}
+    if WORKERS > 1:
+        if await signal_config_reload():
+            result["other_workers"] = "reload_pending"
+        else:
+            logger.warning("Reloaded configs in this worker only; the other workers keep theirs until restarted")
+            result["other_workers"] = "not_reloaded"
+    return result
+
 @app.exception_handler(HTTPException)
 async def openai_style_error(request: Request, exc: HTTPException):
     with tracer.start_as_current_span("http_exception"):
@@ -165,19 +303,23 @@ async def openai_style_error(request: Request, exc: HTTPException):
         # If detail is a dict, merge fields; otherwise stringify
         if isinstance(detail, dict):
             err = detail.copy()
-            err["type"] = "api_error"
+            err.setdefault("type", "api_error")
         else:
             err = {"message": str(detail), "type": "api_error"}
         return JSONResponse(
             status_code=exc.status_code,
-            content={"error": err}
+            content={"error": err},
+            headers=getattr(exc, "headers", None)
         )
 
 
 def run():
-    logger.info("🚀 Starting FastAPI app on http://0.0.0.0:8000")
-    # Start Uvicorn without reload flag to match testing signature
-    uvicorn.run("llm_wrapper.server.main:app", "0.0.0.0", 8000)
+    """Start the server on HOST:PORT; WORKERS > 1 runs supervised SO_REUSEPORT workers."""
+    logger.info("🚀 Starting FastAPI app on http://%s:%s with %d worker(s)", HOST, PORT, WORKERS)
+    if WORKERS > 1:
+        serve_workers("llm_wrapper.server.main:app", HOST, PORT, WORKERS, PROMETHEUS_PORT)
+    else:
+        uvicorn.run("llm_wrapper.server.main:app", host=HOST, port=PORT)
 
 # Alias for script entrypoint and test compatibility
 run_server = run
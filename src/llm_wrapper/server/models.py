@@ -1,7 +1,7 @@
 # src/server/models.py
 
-from typing import Dict, List, Optional, Union, Any
-from pydantic import BaseModel, Field, model_validator
+from typing import Dict, List, Literal, Optional, Union, Any
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
 import time
 from llm_wrapper.lib.logging import setup_logger
 
@@ -68,6 +68,10 @@ class ChatCompletionRequest(BaseModel):
     frequency_penalty: Optional[float] = 0.0
     logit_bias: Optional[Dict[str, float]] = None
     user: Optional[str] = None
+    # Proxy extension: messages are the new turn only; earlier turns come from the conversation store
+    conversation_id: Optional[str] = Field(default=None, min_length=1, max_length=256)
+    # Fields codec.decode_chat_request keeps as unvalidated JSON instead of setting the typed fields above
+    _passthrough: Dict[str, Any] = PrivateAttr(default_factory=dict)
 
     @model_validator(mode="before")
     def validate_functions_and_tools(cls, data):
@@ -127,6 +131,87 @@ class ErrorResponse(BaseModel):
     error: Dict[str, Any]
 
 
+# ----------------------------
+# Bulk Completion Schemas
+# ----------------------------
+
+class BatchChatCompletionRequest(BaseModel):
+    requests: List[ChatCompletionRequest] = Field(min_length=1)
+    # Upper bound on concurrent upstream calls for this batch
+    max_concurrency: Optional[int] = Field(default=None, gt=0)
+    # Return results as NDJSON lines in completion order
+    stream: bool = False
+
+
+class BatchItemResult(BaseModel):
+    index: int
+    response: Optional[ChatCompletionResponse] = None
+    error: Optional[Dict[str, Any]] = None
+
+
+class BatchChatCompletionResponse(BaseModel):
+    object: str = "chat.completion.batch"
+    results: List[BatchItemResult]
+
+
+# ----------------------------
+# Batch API Schemas (files and offline batch jobs)
+# ----------------------------
+
+class FileObject(BaseModel):
+    id: str
+    object: str = "file"
+    bytes: int
+    created_at: int
+    filename: str
+    purpose: str
+
+
+class CreateBatchRequest(BaseModel):
+    input_file_id: str
+    endpoint: Literal["/v1/chat/completions"]
+    completion_window: Literal["24h"] = "24h"
+    metadata: Optional[Dict[str, str]] = None
+
+
+class BatchRequestCounts(BaseModel):
+    total: int = 0
+    completed: int = 0
+    failed: int = 0
+
+
+class BatchObject(BaseModel):
+    id: str
+    object: str = "batch"
+    endpoint: str
+    errors: Optional[Dict[str, Any]] = None
+    input_file_id: str
+    completion_window: str
+    # validating, failed, in_progress, finalizing, completed, expired, cancelling or cancelled
+    status: str = "validating"
+    output_file_id: Optional[str] = None
+    error_file_id: Optional[str] = None
+    created_at: int
+    in_progress_at: Optional[int] = None
+    expires_at: Optional[int] = None
+    finalizing_at: Optional[int] = None
+    completed_at: Optional[int] = None
+    failed_at: Optional[int] = None
+    expired_at: Optional[int] = None
+    cancelling_at: Optional[int] = None
+    cancelled_at: Optional[int] = None
+    request_counts: BatchRequestCounts = Field(default_factory=BatchRequestCounts)
+    metadata: Optional[Dict[str, str]] = None
+
+
+class BatchList(BaseModel):
+    object: str = "list"
+    data: List[BatchObject]
+    first_id: Optional[str] = None
+    last_id: Optional[str] = None
+    has_more: bool = False
+
+
 # ----------------------------
 # Model Registry Schema
 # ----------------------------
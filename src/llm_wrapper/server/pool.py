@@ -0,0 +1,194 @@
+# src/server/pool.py
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, NamedTuple
+from urllib.parse import urlsplit
+
+import aiohttp
+from opentelemetry import metrics
+from opentelemetry.metrics import Observation
+
+from llm_wrapper.lib.logging import setup_logger
+from llm_wrapper.server.config import (
+    UPSTREAM_POOL_LIMIT,
+    UPSTREAM_POOL_LIMIT_PER_HOST,
+    UPSTREAM_KEEPALIVE_TIMEOUT,
+    UPSTREAM_DNS_CACHE_TTL,
+)
+
+logger = setup_logger("llm-server", "logs/server.log")
+meter = metrics.get_meter("llm-wrapper")
+
+
+class PoolSettings(NamedTuple):
+    limit: int
+    limit_per_host: int
+    keepalive_timeout: float
+    ttl_dns_cache: int
+
+    @classmethod
+    def from_api_config(cls, api_config: dict) -> "PoolSettings":
+        """Resolve pool settings from a model's `api` section, falling back to env defaults."""
+        overrides = api_config.get("pool") or {}
+
+        def pick(key, default):
+            value = overrides.get(key)
+            return default if value is None else value
+
+        return cls(
+            limit=pick("limit", UPSTREAM_POOL_LIMIT),
+            limit_per_host=pick("limit_per_host", UPSTREAM_POOL_LIMIT_PER_HOST),
+            keepalive_timeout=pick("keepalive_timeout", UPSTREAM_KEEPALIVE_TIMEOUT),
+            ttl_dns_cache=pick("ttl_dns_cache", UPSTREAM_DNS_CACHE_TTL),
+        )
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class UpstreamPool:
+    """
+    Long-lived upstream connection pools owned by the application lifespan.
+
+    One TCPConnector is kept per (origin, pool settings) so keep-alive connections
+    and cached DNS lookups are reused across requests. Sessions with different
+    timeouts share the same connector.
+    """
+
+    def __init__(self):
+        self._connectors: dict[tuple[str, PoolSettings], aiohttp.TCPConnector] = {}
+        self._sessions: dict[tuple[str, PoolSettings, float], aiohttp.ClientSession] = {}
+
+    def session(self, url: str, settings: PoolSettings, timeout: float) -> aiohttp.ClientSession:
+        """Return the pooled session for `url`, creating its connector on first use."""
+        origin = _origin(url)
+        session_key = (origin, settings, timeout)
+        session = self._sessions.get(session_key)
+        if session is not None and not session.closed:
+            return session
+
+        connector_key = (origin, settings)
+        connector = self._connectors.get(connector_key)
+        if connector is None or connector.closed:
+            connector = aiohttp.TCPConnector(
+                limit=settings.limit,
+                limit_per_host=settings.limit_per_host,
+                keepalive_timeout=settings.keepalive_timeout,
+                ttl_dns_cache=settings.ttl_dns_cache,
+                use_dns_cache=settings.ttl_dns_cache > 0,
+            )
+            self._connectors[connector_key] = connector
+            logger.info("Created upstream pool for %s (%s)", origin, settings)
+
+        session = aiohttp.ClientSession(
+            connector=connector,
+            connector_owner=False,
+            timeout=aiohttp.ClientTimeout(total=timeout),
+        )
+        self._sessions[session_key] = session
+        return session
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """
+        Connection counts per upstream origin.
+
+        Reads aiohttp connector internals, which are not public API; missing
+        attributes are reported as zero rather than failing the metrics scrape.
+        """
+        result: dict[str, dict[str, int]] = {}
+        for (origin, _), connector in self._connectors.items():
+            if connector.closed:
+                continue
+            entry = result.setdefault(origin, {"in_use": 0, "idle": 0, "waiting": 0})
+            entry["in_use"] += len(getattr(connector, "_acquired", ()))
+            entry["idle"] += sum(len(c) for c in getattr(connector, "_conns", {}).values())
+            entry["waiting"] += sum(len(w) for w in getattr(connector, "_waiters", {}).values())
+        return result
+
+    async def close(self):
+        for session in self._sessions.values():
+            await session.close()
+        for connector in self._connectors.values():
+            await connector.close()
+        self._sessions.clear()
+        self._connectors.clear()
+        logger.info("Upstream connection pools closed")
+
+
+_active_pool: UpstreamPool | None = None
+
+
+def get_pool() -> UpstreamPool | None:
+    """Return the pool bound to the running application, if any."""
+    return _active_pool
+
+
+@asynccontextmanager
+async def pool_lifespan() -> AsyncIterator[UpstreamPool]:
+    """Install a fresh UpstreamPool for the duration of the application lifespan."""
+    global _active_pool
+    pool = UpstreamPool()
+    _active_pool = pool
+    try:
+        yield pool
+    finally:
+        _active_pool = None
+        await pool.close()
+
+
+@asynccontextmanager
+async def upstream_session(url: str, api_config: dict, timeout: float) -> AsyncIterator[aiohttp.ClientSession]:
+    """
+    Yield a session for calling `url`.
+
+    Uses the lifespan-owned pool when the app is running; otherwise falls back to
+    a short-lived session (scripts, tests calling the API functions directly).
+    """
+    pool = get_pool()
+    if pool is not None:
+        yield pool.session(url, PoolSettings.from_api_config(api_config), timeout)
+        return
+
+    # Create session with timeout if supported
+    try:
+        session_ctx = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout))
+    except TypeError:
+        session_ctx = aiohttp.ClientSession()
+    async with session_ctx as session:
+        yield session
+
+
+def _observe(field: str):
+    def callback(options):
+        pool = get_pool()
+        if pool is None:
+            return []
+        return [
+            Observation(counts[field], {"upstream": origin})
+            for origin, counts in pool.stats().items()
+        ]
+    return callback
+
+
+meter.create_observable_gauge(
+    name="upstream_pool_connections_in_use",
+    callbacks=[_observe("in_use")],
+    unit="1",
+    description="Upstream connections currently checked out of the pool"
+)
+
+meter.create_observable_gauge(
+    name="upstream_pool_connections_idle",
+    callbacks=[_observe("idle")],
+    unit="1",
+    description="Idle keep-alive upstream connections held by the pool"
+)
+
+meter.create_observable_gauge(
+    name="upstream_pool_waiting_requests",
+    callbacks=[_observe("waiting")],
+    unit="1",
+    description="Requests waiting for a free upstream connection"
+)
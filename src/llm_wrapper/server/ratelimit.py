@@ -0,0 +1,191 @@
+# src/server/ratelimit.py
+
+import math
+import time
+from collections import OrderedDict
+
+from fastapi import HTTPException
+from opentelemetry import metrics
+from opentelemetry.metrics import Observation
+
+from llm_wrapper.lib.logging import setup_logger
+from llm_wrapper.server.config import RATE_LIMIT_MAX_TENANTS, RATE_LIMIT_TENANT_LABELS
+from llm_wrapper.server.context import tenant_of
+from llm_wrapper.server.conversations import conversation_key, conversations
+from llm_wrapper.server.models import ChatCompletionRequest
+
+logger = setup_logger("llm-server", "logs/server.log")
+meter = metrics.get_meter("llm-wrapper")
+
+REQUESTS = "requests"
+TOKENS = "tokens"
+# Rough prompt token estimate for OpenAI-style tokenizers
+CHARS_PER_TOKEN = 4
+# Tenant label for tenants past RATE_LIMIT_TENANT_LABELS
+OTHER_TENANTS = "other"
+
+throttled_counter = meter.create_counter(
+    name="rate_limit_throttled_total",
+    unit="1",
+    description="Requests rejected by per-tenant rate limits, by model, tenant and limit (requests or tokens)"
+)
+
+
+def estimate_tokens(request: ChatCompletionRequest) -> int:
+    """Prompt tokens (from message and stored history length) plus the requested max_tokens."""
+    chars = sum(len(m.content or "") for m in request.messages)
+    if request.conversation_id:
+        chars += conversations.size(conversation_key(request))
+    return math.ceil(chars / CHARS_PER_TOKEN) + (request.max_tokens or 0)
+
+
+def _duration(seconds: float) -> str:
+    """OpenAI-style reset duration ("20ms", "1.5s", "6m0s")."""
+    if seconds < 1:
+        return f"{math.ceil(seconds * 1000)}ms"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes:
+        return f"{int(minutes)}m{math.ceil(seconds)}s"
+    return f"{round(seconds, 1):g}s"
+
+
+class TokenBucket:
+    """A per-minute limit that refills continuously and bursts up to one minute's worth."""
+    __slots__ = ("limit", "tokens", "updated")
+
+    def __init__(self, limit: int, now: float):
+        self.limit = limit
+        self.tokens = float(limit)
+        self.updated = now
+
+    def refill(self, now: float):
+        self.tokens = min(self.limit, self.tokens + (now - self.updated) * self.limit / 60.0)
+        self.updated = now
+
+    def wait(self, amount: float) -> float:
+        """Seconds until `amount` is available (amounts above the limit need a full bucket)."""
+        missing = min(amount, self.limit) - self.tokens
+        return max(0.0, missing * 60.0 / self.limit)
+
+    def reset(self) -> float:
+        """Seconds until the bucket is full again."""
+        return (self.limit - self.tokens) * 60.0 / self.limit
+
+
+class _Tenant:
+    __slots__ = ("settings", "buckets")
+
+    def __init__(self, settings: tuple[int | None, int | None], now: float):
+        self.settings = settings
+        self.buckets = {
+            kind: TokenBucket(limit, now)
+            for kind, limit in zip((REQUESTS, TOKENS), settings)
+            if limit is not None
+        }
+
+
+class RateLimiter:
+    """
+    Per-tenant request and token limits for each model.
+
+    Buckets are refilled lazily when a tenant sends a request, so idle tenants cost
+    nothing and no timer runs. Everything happens on the event loop, so no locks are
+    taken. At most `max_tenants` buckets are kept, and the least recently seen
+    tenant is forgotten first. Metrics label the first `max_labels` tenants by name
+    and the rest as "other".
+    """
+
+    def __init__(self, max_tenants: int, max_labels: int):
+        self.max_tenants = max_tenants
+        self.max_labels = max_labels
+        self._tenants: OrderedDict[tuple[str, str], _Tenant] = OrderedDict()
+        self._labels: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._tenants)
+
+    def label(self, tenant: str) -> str:
+        label = self._labels.get(tenant)
+        if label is None:
+            if len(self._labels) >= self.max_labels:
+                return OTHER_TENANTS
+            label = self._labels[tenant] = tenant[:64]
+        return label
+
+    def _tenant(self, model_id: str, tenant: str, settings: tuple[int | None, int | None], now: float) -> _Tenant:
+        key = (model_id, tenant)
+        state = self._tenants.get(key)
+        if state is None or state.settings != settings:
+            state = self._tenants[key] = _Tenant(settings, now)
+            while len(self._tenants) > self.max_tenants:
+                self._tenants.popitem(last=False)
+        self._tenants.move_to_end(key)
+        return state
+
+    def check(self, model_id: str, config: dict, request: ChatCompletionRequest):
+        """Charge a request to its tenant, or raise an OpenAI-style 429 when a limit is exhausted."""
+        settings = config.get("rate_limits") or {}
+        limits = (settings.get("requests_per_minute"), settings.get("tokens_per_minute"))
+        if limits == (None, None):
+            return
+        tenant = tenant_of(request, settings.get("key") or "api_key")
+        now = time.monotonic()
+        state = self._tenant(model_id, tenant, limits, now)
+        amounts = {REQUESTS: 1, TOKENS: estimate_tokens(request) if limits[1] is not None else 0}
+
+        waits = {}
+        for kind, bucket in state.buckets.items():
+            bucket.refill(now)
+            waits[kind] = bucket.wait(amounts[kind])
+        kind = max(waits, key=waits.get)
+        if waits[kind] > 0:
+            raise self._throttled(model_id, tenant, state, kind, waits[kind], amounts[kind])
+        for kind, bucket in state.buckets.items():
+            bucket.tokens -= min(amounts[kind], bucket.limit)
+
+    def _throttled(
+        self,
+        model_id: str,
+        tenant: str,
+        state: _Tenant,
+        kind: str,
+        wait: float,
+        requested: int
+    ) -> HTTPException:
+        label = self.label(tenant)
+        throttled_counter.add(1, {"model": model_id, "tenant": label, "limit": kind})
+        logger.warning("Rate limited tenant '%s' on model '%s' (%s), retry after %.1fs", label, model_id, kind, wait)
+        bucket = state.buckets[kind]
+        headers = {"Retry-After": str(max(1, math.ceil(wait)))}
+        for name, b in state.buckets.items():
+            headers[f"x-ratelimit-limit-{name}"] = str(b.limit)
+            headers[f"x-ratelimit-remaining-{name}"] = str(max(0, math.floor(b.tokens)))
+            headers[f"x-ratelimit-reset-{name}"] = _duration(b.reset())
+        unit = "requests per min (RPM)" if kind == REQUESTS else "tokens per min (TPM)"
+        return HTTPException(
+            status_code=429,
+            detail={
+                "message": (
+                    f"Rate limit reached for model '{model_id}' on {unit}: Limit {bucket.limit}, "
+                    f"Requested {requested}. Please try again in {_duration(wait)}."
+                ),
+                "type": kind,
+                "code": "rate_limit_exceeded",
+            },
+            headers=headers
+        )
+
+    def clear(self):
+        self._tenants.clear()
+        self._labels.clear()
+
+
+rate_limiter = RateLimiter(RATE_LIMIT_MAX_TENANTS, RATE_LIMIT_TENANT_LABELS)
+
+
+meter.create_observable_gauge(
+    name="rate_limit_tenants",
+    callbacks=[lambda options: [Observation(len(rate_limiter))]],
+    unit="1",
+    description="Tenant buckets held by the rate limiter"
+)
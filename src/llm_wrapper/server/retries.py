@@ -0,0 +1,157 @@
+# src/server/retries.py
+
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, TypeVar
+
+import aiohttp
+from opentelemetry import metrics
+
+from llm_wrapper.lib.logging import setup_logger
+from llm_wrapper.server.config import (
+    RETRY_BUDGET_MIN_PER_SECOND,
+    RETRY_BUDGET_RATIO,
+    RETRY_MAX_ATTEMPTS,
+)
+from llm_wrapper.server.context import get_request_context
+
+logger = setup_logger("llm-server", "logs/server.log")
+meter = metrics.get_meter("llm-wrapper")
+
+T = TypeVar("T")
+
+# Upstream statuses that mean "try again (elsewhere)" and are safe to retry
+RETRY_STATUSES = frozenset({429, 502, 503})
+# Retries the global budget may bank for bursts
+BUDGET_BURST = 20.0
+
+retries_counter = meter.create_counter(
+    name="upstream_retries_total",
+    unit="1",
+    description="Upstream attempts retried, by model and reason"
+)
+
+retries_denied_counter = meter.create_counter(
+    name="upstream_retries_denied_total",
+    unit="1",
+    description="Retriable upstream failures not retried, by model and reason (budget, deadline, attempts)"
+)
+
+
+def retry_reason(exc: Exception) -> str | None:
+    """Why a failed upstream attempt may be retried, or None when it must not be."""
+    status = getattr(exc, "status", None) or getattr(exc, "status_code", None)
+    if isinstance(status, int):
+        return f"status_{status}" if status in RETRY_STATUSES else None
+    if isinstance(exc, aiohttp.ClientConnectionError):
+        return "connection"
+    return None
+
+
+class RetryBudget:
+    """
+    Process-wide cap on retries, so they cannot multiply load during an outage.
+
+    Each request deposits `ratio` of a retry and each retry spends one. A floor of
+    `min_per_second` retries keeps low-traffic models able to retry at all.
+    """
+
+    def __init__(self, ratio: float, min_per_second: float):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.tokens = BUDGET_BURST
+        self._refilled_at = time.monotonic()
+
+    def deposit(self):
+        self.tokens = min(BUDGET_BURST, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(BUDGET_BURST, self.tokens + (now - self._refilled_at) * self.min_per_second)
+        self._refilled_at = now
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+
+retry_budget = RetryBudget(RETRY_BUDGET_RATIO, RETRY_BUDGET_MIN_PER_SECOND)
+
+
+class RetryPolicy:
+    """
+    Retry state of one request.
+
+    `tried` collects the replicas already used so later attempts prefer others.
+    Backoff is exponential with full jitter, at least any upstream Retry-After,
+    and never past the request deadline.
+    """
+
+    def __init__(self, model_id: str, config: dict):
+        settings = config.get("retries") or {}
+        max_attempts = settings.get("max_attempts")
+        self.model_id = model_id
+        self.max_attempts = RETRY_MAX_ATTEMPTS if max_attempts is None else int(max_attempts)
+        self.backoff = float(settings.get("backoff") or 0.1)
+        self.max_backoff = float(settings.get("max_backoff") or 2.0)
+        self.attempts = 1
+        self.tried: set[str] = set()
+        retry_budget.deposit()
+
+    def _deny(self, reason: str, why: str) -> None:
+        retries_denied_counter.add(1, {"model": self.model_id, "reason": why})
+        logger.warning("Not retrying %s for model '%s' (%s)", reason, self.model_id, why)
+        return None
+
+    def delay(self, exc: Exception) -> float | None:
+        """Seconds to wait before retrying after `exc`, or None to give up."""
+        reason = retry_reason(exc)
+        if reason is None:
+            return None
+        if self.attempts >= self.max_attempts:
+            return self._deny(reason, "attempts") if self.max_attempts > 1 else None
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (self.attempts - 1)))
+        retry_after = _retry_after(exc)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        remaining = get_request_context().remaining()
+        if remaining is not None and delay >= remaining:
+            return self._deny(reason, "deadline")
+        if not retry_budget.withdraw():
+            return self._deny(reason, "budget")
+        self.attempts += 1
+        retries_counter.add(1, {"model": self.model_id, "reason": reason})
+        logger.info("Retrying model '%s' after %s in %.2fs (attempt %d)", self.model_id, reason, delay, self.attempts)
+        return delay
+
+
+def _retry_after(exc: Exception) -> float | None:
+    headers = getattr(exc, "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+async def with_retries(
+    model_id: str,
+    config: dict,
+    call: Callable[[set[str]], Awaitable[T]],
+    sleep: Callable[[float], Awaitable[None]] | None = None
+) -> T:
+    """
+    Await `call(tried)`, retrying retriable failures under the model's policy.
+
+    Backoffs are awaited with `sleep` (asyncio.sleep by default); callers holding
+    an admission slot pass its `idle` so the slot is free while they wait.
+    """
+    policy = RetryPolicy(model_id, config)
+    while True:
+        try:
+            return await call(policy.tried)
+        except Exception as e:
+            delay = policy.delay(e)
+            if delay is None:
+                raise
+        await (sleep or asyncio.sleep)(delay)
@@ -0,0 +1,281 @@
+# src/server/similarity.py
+
+import hashlib
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import NamedTuple
+
+from opentelemetry import metrics
+from opentelemetry.metrics import Observation
+
+from llm_wrapper.lib.logging import setup_logger
+from llm_wrapper.server.codec import RawCompletion
+from llm_wrapper.server.config import (
+    RESPONSE_CACHE_TTL,
+    SIMILARITY_CACHE_MAX_BYTES,
+    SIMILARITY_CACHE_MAX_ENTRIES,
+)
+from llm_wrapper.server.models import ChatCompletionResponse
+
+# numpy is optional (`pip install llm-wrapper[similarity]`); lookups fall back to a Python scan
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+logger = setup_logger("llm-server", "logs/server.log")
+meter = metrics.get_meter("llm-wrapper")
+
+FINGERPRINT_BITS = 64
+
+HIT = "hit"
+MISS = "miss"
+SHADOW_HIT = "shadow_hit"
+
+_PUNCTUATION = re.compile(r"[^\w\s]+")
+_WHITESPACE = re.compile(r"\s+")
+
+similarity_lookup_counter = meter.create_counter(
+    name="similarity_cache_lookups_total",
+    unit="1",
+    description="Similarity cache lookups by result (hit, miss, shadow_hit)"
+)
+
+similarity_lookup_histogram = meter.create_histogram(
+    name="similarity_cache_lookup_seconds",
+    unit="s",
+    description="Time to fingerprint a prompt and search the similarity index"
+)
+
+similarity_distance_histogram = meter.create_histogram(
+    name="similarity_cache_match_similarity",
+    unit="1",
+    description="Similarity of the nearest cached prompt on lookups that found one"
+)
+
+
+def normalize(text: str) -> str:
+    """Case-, punctuation- and whitespace-insensitive form of a prompt."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = _PUNCTUATION.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash of a normalized prompt over word unigrams and bigrams."""
+    words = normalize(text).split()
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    if not features:
+        return 0
+    hashes = [_feature_hash(f) for f in features]
+    # Per-bit vote counts, most significant bit first
+    if np is not None:
+        bits = np.unpackbits(np.array(hashes, dtype=">u8").view(np.uint8)).reshape(-1, FINGERPRINT_BITS)
+        counts = bits.sum(axis=0).tolist()
+    else:
+        counts = [column.count("1") for column in zip(*(format(h, "064b") for h in hashes))]
+    return int("".join("1" if 2 * c > len(hashes) else "0" for c in counts), 2)
+
+
+def similarity(distance: int) -> float:
+    return 1.0 - distance / FINGERPRINT_BITS
+
+
+class _FingerprintIndex:
+    """Fingerprints of one scope, searchable by Hamming distance."""
+
+    def __init__(self):
+        self._ids: list[int] = []
+        self._positions: dict[int, int] = {}
+        self._fingerprints = np.zeros(16, dtype=np.uint64) if np is not None else []
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, entry_id: int, fingerprint: int):
+        position = len(self._ids)
+        if np is not None:
+            if position == len(self._fingerprints):
+                self._fingerprints = np.concatenate([self._fingerprints, np.zeros_like(self._fingerprints)])
+            self._fingerprints[position] = fingerprint
+        else:
+            self._fingerprints.append(fingerprint)
+        self._ids.append(entry_id)
+        self._positions[entry_id] = position
+
+    def remove(self, entry_id: int):
+        # Swap the last fingerprint into the freed slot
+        position = self._positions.pop(entry_id)
+        last = len(self._ids) - 1
+        if position != last:
+            moved = self._ids[last]
+            self._ids[position] = moved
+            self._fingerprints[position] = self._fingerprints[last]
+            self._positions[moved] = position
+        self._ids.pop()
+        if np is None:
+            self._fingerprints.pop()
+
+    def nearest(self, fingerprint: int) -> tuple[int, int] | None:
+        """(entry id, Hamming distance) of the closest fingerprint, or None when empty."""
+        count = len(self._ids)
+        if count == 0:
+            return None
+        if np is not None:
+            distances = np.bitwise_count(self._fingerprints[:count] ^ np.uint64(fingerprint))
+            position = int(distances.argmin())
+            return self._ids[position], int(distances[position])
+        distance, position = min(((fp ^ fingerprint).bit_count(), i) for i, fp in enumerate(self._fingerprints))
+        return self._ids[position], distance
+
+
+class _Entry(NamedTuple):
+    scope: str
+    response: ChatCompletionResponse | RawCompletion
+    size: int
+    expires_at: float
+
+
+class SimilarKey(NamedTuple):
+    model_id: str
+    # Hash of everything in the payload except the final user message
+    scope: str
+    fingerprint: int
+    ttl: float
+    max_distance: int
+    shadow: bool
+
+
+class SimilarityCache:
+    """
+    Completions indexed by a SimHash of the final user message.
+
+    Entries are grouped by scope, so only prompts with the same model, system
+    prompt, history and sampling parameters are compared. Bounded by entry count
+    and bytes with LRU eviction; expired entries are dropped when found.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        self._indexes: dict[str, _FingerprintIndex] = {}
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, key: SimilarKey) -> ChatCompletionResponse | RawCompletion | None:
+        match = self._nearest(key)
+        if match is None:
+            similarity_lookup_counter.add(1, {"model": key.model_id, "result": MISS})
+            return None
+        entry_id, distance = match
+        similarity_distance_histogram.record(similarity(distance), {"model": key.model_id})
+        if distance > key.max_distance:
+            similarity_lookup_counter.add(1, {"model": key.model_id, "result": MISS})
+            return None
+        if key.shadow:
+            similarity_lookup_counter.add(1, {"model": key.model_id, "result": SHADOW_HIT})
+            logger.info("Similarity cache would serve model '%s' (similarity %.3f)", key.model_id, similarity(distance))
+            return None
+        similarity_lookup_counter.add(1, {"model": key.model_id, "result": HIT})
+        self._entries.move_to_end(entry_id)
+        return self._entries[entry_id].response
+
+    def _nearest(self, key: SimilarKey) -> tuple[int, int] | None:
+        index = self._indexes.get(key.scope)
+        if index is None:
+            return None
+        now = time.monotonic()
+        while True:
+            match = index.nearest(key.fingerprint)
+            if match is None or self._entries[match[0]].expires_at > now:
+                return match
+            self._remove(match[0])
+            if key.scope not in self._indexes:
+                return None
+
+    def put(self, key: SimilarKey, response: ChatCompletionResponse | RawCompletion, size: int):
+        if size > self.max_bytes or key.ttl <= 0:
+            return
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = _Entry(key.scope, response, size, time.monotonic() + key.ttl)
+        self.total_bytes += size
+        index = self._indexes.get(key.scope)
+        if index is None:
+            index = self._indexes[key.scope] = _FingerprintIndex()
+        index.add(entry_id, key.fingerprint)
+        while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        self._entries.clear()
+        self._indexes.clear()
+        self.total_bytes = 0
+
+    def _remove(self, entry_id: int):
+        entry = self._entries.pop(entry_id)
+        self.total_bytes -= entry.size
+        index = self._indexes[entry.scope]
+        index.remove(entry_id)
+        if not index:
+            del self._indexes[entry.scope]
+
+
+similarity_cache = SimilarityCache(SIMILARITY_CACHE_MAX_ENTRIES, SIMILARITY_CACHE_MAX_BYTES)
+
+
+def find_similar(
+    model_id: str,
+    scope: str,
+    text: str,
+    config: dict,
+    read: bool = True
+) -> tuple[SimilarKey | None, ChatCompletionResponse | RawCompletion | None]:
+    """
+    Fingerprint a model's final user message and look for a near-duplicate.
+
+    Returns the key to store a fresh result under (None when the model has not
+    enabled `cache.similarity`) and the cached response, if any.
+    """
+    settings = (config.get("cache") or {}).get("similarity") or {}
+    if not settings.get("enabled"):
+        return None, None
+    started = time.perf_counter()
+    ttl = settings.get("ttl")
+    threshold = float(settings.get("threshold") or 0.9)
+    key = SimilarKey(
+        model_id=model_id,
+        scope=scope,
+        fingerprint=simhash(text),
+        ttl=float(RESPONSE_CACHE_TTL if ttl is None else ttl),
+        max_distance=int((1.0 - threshold) * FINGERPRINT_BITS + 1e-9),
+        shadow=bool(settings.get("shadow")),
+    )
+    response = similarity_cache.lookup(key) if read else None
+    similarity_lookup_histogram.record(time.perf_counter() - started, {"model": model_id})
+    return key, response
+
+
+meter.create_observable_gauge(
+    name="similarity_cache_entries",
+    callbacks=[lambda options: [Observation(len(similarity_cache))]],
+    unit="1",
+    description="Entries held by the similarity cache"
+)
+
+meter.create_observable_gauge(
+    name="similarity_cache_size_bytes",
+    callbacks=[lambda options: [Observation(similarity_cache.total_bytes)]],
+    unit="bytes",
+    description="Serialized size of responses held by the similarity cache"
+)
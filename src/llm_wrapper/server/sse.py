@@ -0,0 +1,102 @@
+# src/server/sse.py
+
+import json
+import re
+from typing import AsyncIterable, AsyncIterator, Iterator
+
+from llm_wrapper.lib.logging import setup_logger
+from llm_wrapper.server.models import ChatCompletionResponse
+
+logger = setup_logger("llm-server", "logs/server.log")
+
+DONE = b"[DONE]"
+
+
+class ModelRewriter:
+    """Rewrite the `"model"` field of raw SSE payloads without decoding them."""
+
+    def __init__(self, upstream_model: str, model_id: str):
+        quoted = json.dumps(upstream_model).encode("utf-8")
+        # Literal forms emitted by common JSON encoders; the regex covers the rest
+        self._literals = (b'"model":' + quoted, b'"model": ' + quoted)
+        self._pattern = re.compile(rb'"model"\s*:\s*' + re.escape(quoted))
+        self._replacement = b'"model": ' + json.dumps(model_id).encode("utf-8")
+
+    def __call__(self, payload: bytes) -> bytes:
+        for literal in self._literals:
+            if literal in payload:
+                return payload.replace(literal, self._replacement, 1)
+        if b'"model"' not in payload:
+            return payload
+        return self._pattern.sub(lambda _: self._replacement, payload, count=1)
+
+
+async def relay_parsed(content: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """Decode, validate and re-serialize each upstream `data:` line."""
+    async for line in content:
+        decoded = line.decode("utf-8").strip()
+        if decoded.startswith("data: ") and decoded != "data: [DONE]":
+            try:
+                chunk = json.loads(decoded[6:])
+                yield f"data: {json.dumps(chunk)}\n\n"
+            except json.JSONDecodeError as e:
+                logger.warning(f"Failed to decode stream chunk: {e}")
+
+
+async def relay_passthrough(
+    content: AsyncIterable[bytes],
+    rewrite: ModelRewriter | None = None
+) -> AsyncIterator[bytes]:
+    """
+    Forward upstream `data:` payloads as raw bytes.
+
+    Lines are framed on the byte stream without decoding or JSON parsing, and all
+    events that arrive in one network read are emitted as a single chunk. Payloads
+    are passed through unchanged unless a rewrite is supplied. Upstreams are
+    expected to send one JSON document per `data:` line, as OpenAI-compatible
+    servers do; non-data lines (comments, `event:`, `id:`) are dropped.
+    """
+    # aiohttp's StreamReader yields whatever bytes are buffered via iter_any();
+    # plain iterables (tests, replays) are consumed as-is.
+    chunks = content.iter_any() if hasattr(content, "iter_any") else content
+    pending = b""
+    async for chunk in chunks:
+        if b"\n" not in chunk:
+            pending += chunk
+            continue
+        *lines, pending = (pending + chunk).split(b"\n")
+        out = []
+        for line in lines:
+            if not line.startswith(b"data:"):
+                continue
+            payload = line[5:].strip()
+            if payload == DONE:
+                if out:
+                    yield b"".join(out)
+                return
+            if rewrite is not None:
+                payload = rewrite(payload)
+            out.append(b"data: " + payload + b"\n\n")
+        if out:
+            yield b"".join(out)
+
+    line = pending.strip()
+    if line.startswith(b"data:") and line[5:].strip() != DONE:
+        payload = line[5:].strip()
+        yield b"data: " + (rewrite(payload) if rewrite else payload) + b"\n\n"
+
+
+def replay_completion(
+    response: ChatCompletionResponse,
+    chat_id: str,
+    created: int,
+    model_id: str
+) -> Iterator[str]:
+    """Render a completed response as content and finish chunks of an SSE stream."""
+    for choice in response.choices:
+        base = {"id": chat_id, "object": "chat.completion.chunk", "created": created, "model": model_id}
+        if choice.message.content:
+            content = {"index": choice.index, "delta": {"content": choice.message.content}}
+            yield f"data: {json.dumps({**base, 'choices': [content]})}\n\n"
+        finish = {"index": choice.index, "delta": {}, "finish_reason": choice.finish_reason or "stop"}
+        yield f"data: {json.dumps({**base, 'choices': [finish]})}\n\n"
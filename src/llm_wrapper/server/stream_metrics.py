@@ -0,0 +1,110 @@
+# src/server/stream_metrics.py
+
+import re
+import time
+
+from opentelemetry import metrics
+
+meter = metrics.get_meter("llm-wrapper")
+
+FINISHED = "finished"
+CLIENT_DISCONNECTED = "client_disconnected"
+UPSTREAM_ERROR = "upstream_error"
+
+# Error events produced by the stream relay (and upstream errors re-serialized by it)
+_ERROR_PREFIX = 'data: {"error"'
+_DONE_EVENT = "data: [DONE]\n\n"
+# The same error events inside passthrough chunks, whose payloads keep the upstream's formatting
+_ERROR_EVENT = re.compile(rb'(?:^|\n)data: \{\s*"error"\s*:')
+
+ttft_histogram = meter.create_histogram(
+    name="stream_time_to_first_token_seconds",
+    unit="s",
+    description="Time from stream start to the first upstream event relayed to the client"
+)
+
+inter_token_histogram = meter.create_histogram(
+    name="stream_inter_token_seconds",
+    unit="s",
+    description="Gap between consecutive relayed stream events (0 for events delivered together)"
+)
+
+tokens_per_second_histogram = meter.create_histogram(
+    name="stream_tokens_per_second",
+    unit="1/s",
+    description="Relayed stream events per second after the first one"
+)
+
+stream_duration_histogram = meter.create_histogram(
+    name="stream_duration_seconds",
+    unit="s",
+    description="Total streaming response duration by outcome"
+)
+
+stream_outcome_counter = meter.create_counter(
+    name="stream_completions_total",
+    unit="1",
+    description="Streaming responses by outcome (finished, client_disconnected, upstream_error)"
+)
+
+
+class StreamRecorder:
+    """
+    Times one client's stream as its events are yielded.
+
+    Each upstream event (one `data:` line) counts as a token; passthrough chunks
+    carrying several events count each of them. Error events (re-serialized or
+    passed through) mark the stream as an upstream error instead of counting as
+    tokens. The replica label is filled in by whoever leases the upstream ("cache"
+    for replays, "coalesced" for followers).
+    """
+
+    def __init__(self, model_id: str):
+        self.model_id = model_id
+        self.replica = "unknown"
+        # Prefix-hash routing result (home/spilled), to compare TTFT across routing policies
+        self.affinity = "none"
+        self.outcome = FINISHED
+        self.tokens = 0
+        self.started = time.perf_counter()
+        self._first_at: float | None = None
+        self._last_at: float | None = None
+
+    def _attributes(self) -> dict:
+        return {"model": self.model_id, "replica": self.replica}
+
+    def observe(self, event: str | bytes):
+        if isinstance(event, bytes):
+            errors = len(_ERROR_EVENT.findall(event))
+            if errors:
+                self.outcome = UPSTREAM_ERROR
+            count = event.count(b"data: ") - event.count(b"data: [DONE]") - errors
+        elif event.startswith(_ERROR_PREFIX):
+            self.outcome = UPSTREAM_ERROR
+            return
+        elif event == _DONE_EVENT:
+            return
+        else:
+            count = 1
+        if count == 0:
+            return
+
+        now = time.perf_counter()
+        attributes = self._attributes()
+        if self._first_at is None:
+            self._first_at = now
+            ttft_histogram.record(now - self.started, {**attributes, "affinity": self.affinity})
+        else:
+            inter_token_histogram.record(now - self._last_at, attributes)
+        for _ in range(count - 1):
+            inter_token_histogram.record(0.0, attributes)
+        self.tokens += count
+        self._last_at = now
+
+    def finish(self):
+        now = time.perf_counter()
+        attributes = self._attributes()
+        if self.tokens > 1 and self._first_at is not None and self._last_at > self._first_at:
+            tokens_per_second_histogram.record((self.tokens - 1) / (self._last_at - self._first_at), attributes)
+        stream_duration_histogram.record(now - self.started, {**attributes, "outcome": self.outcome})
+        stream_outcome_counter.add(1, {"model": self.model_id, "outcome": self.outcome})
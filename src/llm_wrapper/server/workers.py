@@ -0,0 +1,194 @@
+# src/server/workers.py
+
+import contextlib
+import multiprocessing
+import os
+import signal
+import socket
+import tempfile
+import time
+import urllib.request
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Iterator
+
+import uvicorn
+from prometheus_client import CollectorRegistry, start_http_server
+from prometheus_client.metrics_core import Metric
+from prometheus_client.parser import text_string_to_metric_families
+from prometheus_client.samples import Sample
+
+from llm_wrapper.lib.logging import WORKER_ID_ENV, setup_logger
+
+logger = setup_logger("llm-server", "logs/server.log")
+
+# Set for each worker process (with WORKER_ID_ENV); TelemetrySetup reads them to publish its metrics port
+METRICS_DIR_ENV = "LLM_METRICS_DIR"
+
+# Seconds to wait for one worker's metrics during a scrape
+SCRAPE_TIMEOUT = 2.0
+# Pause before restarting a worker that exited
+RESTART_DELAY = 1.0
+# Grace period for workers to finish in-flight requests on shutdown
+SHUTDOWN_TIMEOUT = 30.0
+# Metric types whose samples add up across workers
+SUMMED_TYPES = frozenset({"counter", "histogram"})
+
+
+class WorkerMetricsCollector:
+    """
+    Prometheus collector that scrapes every worker's metrics endpoint.
+
+    Each worker publishes the port of its local metrics server as
+    `<metrics_dir>/worker-<id>.port`. Counters and histograms are summed across
+    workers (per label set; their `_created` timestamps are dropped), so dashboards see one
+    series per label set whatever WORKERS is. Gauges and summaries describe one
+    process each and keep a `worker="<id>"` label. A restarted worker's counters
+    start from zero, which Prometheus' rate() treats as a counter reset.
+    """
+
+    def __init__(self, metrics_dir: str):
+        self.metrics_dir = Path(metrics_dir)
+
+    def _targets(self) -> list[tuple[str, int]]:
+        targets = []
+        for path in sorted(self.metrics_dir.glob("worker-*.port")):
+            try:
+                targets.append((path.stem.removeprefix("worker-"), int(path.read_text())))
+            except (OSError, ValueError):
+                continue
+        return targets
+
+    def _scrape(self, port: int) -> str:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=SCRAPE_TIMEOUT) as response:
+            return response.read().decode("utf-8")
+
+    def collect(self) -> Iterator[Metric]:
+        families: dict[str, Metric] = {}
+        # Summed families: (sample name, labels) -> total
+        totals: dict[str, dict[tuple, float]] = {}
+        for worker, port in self._targets():
+            try:
+                text = self._scrape(port)
+            except OSError as e:
+                logger.warning("Could not scrape metrics of worker %s on port %d: %s", worker, port, e)
+                continue
+            for family in text_string_to_metric_families(text):
+                if family.name.endswith("_created") and family.type in ("gauge", "untyped"):
+                    # Creation time of a counter or histogram, exposed as its own gauge family
+                    continue
+                merged = families.get(family.name)
+                if merged is None:
+                    merged = families[family.name] = Metric(family.name, family.documentation, family.type)
+                if family.type not in SUMMED_TYPES:
+                    merged.samples.extend(
+                        Sample(s.name, {**s.labels, "worker": worker}, s.value, s.timestamp, s.exemplar)
+                        for s in family.samples
+                    )
+                    continue
+                sums = totals.setdefault(family.name, {})
+                for s in family.samples:
+                    if s.name.endswith("_created"):
+                        continue
+                    key = (s.name, tuple(sorted(s.labels.items())))
+                    sums[key] = sums.get(key, 0.0) + s.value
+        for name, sums in totals.items():
+            families[name].samples.extend(Sample(sample, dict(labels), value) for (sample, labels), value in sums.items())
+        yield from families.values()
+
+
+def start_metrics_aggregator(metrics_dir: str, port: int):
+    """Serve the merged metrics of all workers on `port`."""
+    registry = CollectorRegistry(auto_describe=False)
+    registry.register(WorkerMetricsCollector(metrics_dir))
+    start_http_server(port, registry=registry)
+    logger.info("Aggregated worker metrics served on port %d", port)
+
+
+def _loop_name() -> str:
+    # uvicorn's "auto" loop/http settings pick these up when installed
+    loop = "uvloop" if find_spec("uvloop") else "asyncio"
+    http = "httptools" if find_spec("httptools") else "h11"
+    return f"{loop}/{http}"
+
+
+def _reuseport_socket(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    # Each worker binds its own listening socket and the kernel balances accepts
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    return sock
+
+
+def _worker_main(app: str, host: str, port: int):
+    sock = _reuseport_socket(host, port)
+    config = uvicorn.Config(app, loop="auto", http="auto")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+@contextlib.contextmanager
+def _worker_env(worker_id: int):
+    # Spawned children copy os.environ at start, before importing anything
+    os.environ[WORKER_ID_ENV] = str(worker_id)
+    try:
+        yield
+    finally:
+        os.environ.pop(WORKER_ID_ENV, None)
+
+
+def serve_workers(app: str, host: str, port: int, workers: int, metrics_port: int):
+    """
+    Run `workers` uvicorn processes on one SO_REUSEPORT address and supervise them.
+
+    Workers that exit are restarted. SIGINT/SIGTERM stop all workers gracefully.
+    Falls back to uvicorn's shared-socket workers where SO_REUSEPORT is missing.
+    """
+    if not hasattr(socket, "SO_REUSEPORT"):
+        logger.warning("SO_REUSEPORT unavailable; using uvicorn's shared-socket workers")
+        uvicorn.run(app, host=host, port=port, workers=workers)
+        return
+
+    metrics_dir = os.environ.get(METRICS_DIR_ENV) or tempfile.mkdtemp(prefix="llm-wrapper-metrics-")
+    os.environ[METRICS_DIR_ENV] = metrics_dir
+    for stale in Path(metrics_dir).glob("worker-*.port"):
+        stale.unlink(missing_ok=True)
+    start_metrics_aggregator(metrics_dir, metrics_port)
+
+    context = multiprocessing.get_context("spawn")
+
+    def start(worker_id: int) -> multiprocessing.Process:
+        process = context.Process(target=_worker_main, args=(app, host, port), name=f"llm-worker-{worker_id}")
+        with _worker_env(worker_id):
+            process.start()
+        logger.info("Started worker %d (pid %d)", worker_id, process.pid)
+        return process
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    logger.info("Starting %d workers on %s:%d (%s)", workers, host, port, _loop_name())
+    processes = {worker_id: start(worker_id) for worker_id in range(workers)}
+    while not stopping:
+        for worker_id, process in processes.items():
+            if not process.is_alive() and not stopping:
+                logger.warning("Worker %d (pid %d) exited with code %s; restarting", worker_id, process.pid, process.exitcode)
+                time.sleep(RESTART_DELAY)
+                processes[worker_id] = start(worker_id)
+        time.sleep(0.5)
+
+    logger.info("Stopping %d workers", workers)
+    for process in processes.values():
+        process.terminate()
+    deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+    for process in processes.values():
+        process.join(max(0.0, deadline - time.monotonic()))
+        if process.is_alive():
+            process.kill()
@@ -0,0 +1,24 @@
+# tests/unit/bench/test_distribution.py
+
+import random
+import pytest
+from llm_wrapper.bench.mock_upstream import Distribution
+
+
+def test_parse_kinds_and_bare_numbers():
+    assert Distribution.parse("0.2") == Distribution("fixed", (0.2,))
+    assert Distribution.parse("uniform:0.1,0.3").params == (0.1, 0.3)
+    assert str(Distribution.parse("lognormal:0.2,0.5")) == "lognormal:0.2,0.5"
+
+
+@pytest.mark.parametrize("spec", ["uniform:1", "gamma:1,2", "fixed:abc"])
+def test_parse_rejects_invalid_specs(spec):
+    with pytest.raises(ValueError):
+        Distribution.parse(spec)
+
+
+def test_samples_stay_in_range_and_non_negative():
+    rng = random.Random(7)
+    uniform = Distribution.parse("uniform:0.1,0.3")
+    assert all(0.1 <= uniform.sample(rng) <= 0.3 for _ in range(100))
+    assert Distribution.parse("fixed:-1").sample(rng) == 0.0
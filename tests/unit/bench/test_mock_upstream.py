@@ -0,0 +1,30 @@
+# tests/unit/bench/test_mock_upstream.py
+
+import aiohttp
+import pytest
+from aiohttp.test_utils import TestServer
+from llm_wrapper.bench.loadgen import request_body, send_request
+from llm_wrapper.bench.mock_upstream import Distribution, MockSettings, create_app
+
+SETTINGS = MockSettings(
+    ttft=Distribution.parse("fixed:0"),
+    output_tokens=Distribution.parse("fixed:5"),
+    tokens_per_second=0,
+)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("stream", [True, False])
+async def test_load_generator_times_mock_responses(stream):
+    async with TestServer(create_app(SETTINGS)) as server:
+        async with aiohttp.ClientSession() as session:
+            url = str(server.make_url("/v1/chat/completions"))
+            result = await send_request(session, url, request_body("m", 0, stream))
+
+    assert result.error is None
+    assert result.tokens == 5
+    if stream:
+        assert result.ttft is not None
+        assert len(result.gaps) == 4
+    else:
+        assert result.ttft is None
@@ -0,0 +1,28 @@
+# tests/unit/bench/test_summary.py
+
+from llm_wrapper.bench.loadgen import RequestResult, percentiles, summarize
+
+
+def test_percentiles_use_nearest_rank_in_ms():
+    values = [i / 1000 for i in range(1, 101)]
+    result = percentiles(values)
+    assert result["p50"] == 50.0
+    assert result["p95"] == 95.0
+    assert result["p99"] == 99.0
+    assert percentiles([]) is None
+
+
+def test_summarize_counts_errors_and_tokens():
+    results = [
+        RequestResult(started=0.0, latency=0.1, ttft=0.05, gaps=[0.01, 0.02], tokens=3, status=200),
+        RequestResult(started=0.0, latency=0.2, ttft=0.06, gaps=[0.01], tokens=2, status=200),
+        RequestResult(started=0.0, status=500, error="HTTP 500: boom"),
+    ]
+    summary = summarize(results, wall=1.0, cpu_seconds=0.01)
+
+    assert summary["requests"] == 3
+    assert summary["errors"] == 1
+    assert summary["throughput_rps"] == 2.0
+    assert summary["tokens_per_second"] == 5.0
+    assert summary["itl_ms"]["p99"] == 20.0
+    assert summary["cpu_ms_per_request"] == 5.0
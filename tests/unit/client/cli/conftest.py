@@ -3,7 +3,7 @@
 import pytest
 from click.testing import CliRunner
 import llm_wrapper.client.cli as cli_mod
-from unit.client.cli.dummy_openai import DummyOpenAI
+from unit.client.cli.dummy_openai import DummyAsyncOpenAI, DummyOpenAI
 
 
 @pytest.fixture
@@ -13,5 +13,5 @@ def cli_runner():
 @pytest.fixture(autouse=True)
 def stub_openai(monkeypatch):
     monkeypatch.setenv("OPENAI_API_KEY", "dummy")
-    monkeypatch.setattr(cli_mod, "openai", type("FakeOpenAI", (), {"OpenAI": DummyOpenAI}))
+    monkeypatch.setattr(cli_mod, "openai", type("FakeOpenAI", (), {"OpenAI": DummyOpenAI, "AsyncOpenAI": DummyAsyncOpenAI}))
     return monkeypatch
\ No newline at end of file
@@ -30,4 +30,35 @@ class DummyOpenAI:
     def completions(self): return self
 
     def create(self, model, messages, temperature=None, stream=False):
-        return DummyResponse("hello world", stream=stream)
\ No newline at end of file
+        return DummyResponse("hello world", stream=stream)
+
+class DummyCompletion:
+    def __init__(self, content, model="expert"):
+        self.model = model
+        self.choices = [type("Choice", (), {"message": DummyMessage(content), "finish_reason": "stop"})()]
+        self.usage = {"prompt_tokens": 1, "completion_tokens": len(content.split()), "total_tokens": 1 + len(content.split())}
+
+class DummyAsyncOpenAI:
+    """Echoes the last message; prompts containing 'fail' raise, 'empty' get no choices, 'slow' ones finish last."""
+    calls = []
+
+    def __init__(self, base_url, api_key, max_retries=2): pass
+
+    @property
+    def chat(self): return self
+    @property
+    def completions(self): return self
+
+    async def create(self, model, messages, stream=False, **params):
+        import asyncio
+        content = messages[-1]["content"]
+        DummyAsyncOpenAI.calls.append(content)
+        await asyncio.sleep(0.05 if "slow" in content else 0)
+        if "fail" in content:
+            raise RuntimeError(f"failed: {content}")
+        completion = DummyCompletion(f"echo {content}", model=model)
+        if "empty" in content:
+            completion.choices = []
+        return completion
+
+    async def close(self): pass
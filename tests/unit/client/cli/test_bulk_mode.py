@@ -0,0 +1,110 @@
+# tests/unit/client_cli/test_bulk_mode.py
+
+import json
+
+import pytest
+import llm_wrapper.client.cli as cli_mod
+from llm_wrapper.client.bulk import completed_ids, parse_prompts
+from unit.client.cli.dummy_openai import DummyAsyncOpenAI
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    DummyAsyncOpenAI.calls = []
+
+
+def records(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_parse_prompts_formats():
+    jsonl = [
+        '{"id": "a", "prompt": "hi", "system": "be brief", "max_tokens": 5}',
+        '',
+        '"plain string"',
+        '{"messages": [{"role": "user", "content": "yo"}], "model": "fast"}',
+    ]
+    prompts = parse_prompts(jsonl)
+    assert [p.id for p in prompts] == ["a", "3", "4"]
+    assert [p.index for p in prompts] == [0, 1, 2]
+    assert prompts[0].messages[0] == {"role": "system", "content": "be brief"}
+    assert prompts[0].params == {"max_tokens": 5}
+    assert prompts[2].params == {"model": "fast"}
+
+    text = parse_prompts(["{not json at all", "second"], input_format="text")
+    assert [p.messages[0]["content"] for p in text] == ["{not json at all", "second"]
+
+    with pytest.raises(ValueError, match="line 2: duplicate id"):
+        parse_prompts(['{"id": 1, "prompt": "x"}', '{"id": 1, "prompt": "y"}'])
+    with pytest.raises(ValueError, match="line 1"):
+        parse_prompts(['{"id": 1}'])
+
+
+def test_bulk_writes_results_in_input_order(cli_runner, tmp_path):
+    prompts = tmp_path / "prompts.txt"
+    prompts.write_text("slow one\ntwo\nthree\n")
+    output = tmp_path / "out.jsonl"
+    result = cli_runner.invoke(cli_mod.client, ["bulk", str(prompts), "-o", str(output), "-c", "3"])
+    assert result.exit_code == 0, result.output
+    lines = records(output)
+    assert [r["id"] for r in lines] == ["1", "2", "3"]
+    assert lines[0]["content"] == "echo slow one"
+    assert lines[0]["usage"]["completion_tokens"] == 3
+    assert "latency p95 (ms)" in result.output
+
+
+def test_bulk_completion_order(cli_runner, tmp_path):
+    prompts = tmp_path / "prompts.txt"
+    prompts.write_text("slow one\ntwo\n")
+    output = tmp_path / "out.jsonl"
+    result = cli_runner.invoke(cli_mod.client, ["bulk", str(prompts), "-o", str(output), "--order", "completion"])
+    assert result.exit_code == 0, result.output
+    assert [r["id"] for r in records(output)] == ["2", "1"]
+
+
+def test_bulk_reads_stdin_and_reports_errors(cli_runner):
+    stdin = '{"id": "ok", "prompt": "fine"}\n{"id": "bad", "prompt": "fail me"}\n'
+    result = cli_runner.invoke(cli_mod.client, ["-m", "fast", "bulk", "-o", "-"], input=stdin)
+    assert result.exit_code == 1
+    lines = [json.loads(line) for line in result.output.splitlines() if line.startswith("{")]
+    by_id = {r["id"]: r for r in lines}
+    assert by_id["ok"]["model"] == "fast"
+    assert by_id["bad"]["error"] == {"type": "RuntimeError", "message": "failed: fail me"}
+
+
+def test_bulk_resume_skips_completed_prompts(cli_runner, tmp_path):
+    prompts = tmp_path / "prompts.jsonl"
+    prompts.write_text("\n".join(json.dumps({"id": i, "prompt": f"p{i}"}) for i in ("a", "b", "c", "d")))
+    output = tmp_path / "out.jsonl"
+    output.write_text(
+        json.dumps({"id": "a", "content": "done", "error": None}) + "\n"
+        + json.dumps({"id": "b", "error": {"type": "RuntimeError", "message": "x"}}) + "\n"
+        + '{"id": "c", "cont'
+    )
+    result = cli_runner.invoke(cli_mod.client, ["bulk", str(prompts), "-o", str(output), "--resume"])
+    assert result.exit_code == 0, result.output
+    assert DummyAsyncOpenAI.calls == ["pb", "pc", "pd"]
+    assert [r["id"] for r in records(output)] == ["a", "b", "c", "d"]
+    assert completed_ids(output) == {"a", "b", "c", "d"}
+
+
+def test_bulk_rejects_bad_input(cli_runner, tmp_path):
+    prompts = tmp_path / "prompts.jsonl"
+    prompts.write_text('{"prompt": 3}\n')
+    result = cli_runner.invoke(cli_mod.client, ["bulk", str(prompts)])
+    assert result.exit_code == 2
+    assert "line 1" in result.output
+    result = cli_runner.invoke(cli_mod.client, ["bulk", str(prompts), "--resume"])
+    assert "--resume needs an --output file" in result.output
+
+
+def test_malformed_reply_becomes_an_error_record(cli_runner, tmp_path):
+    prompts = tmp_path / "prompts.txt"
+    prompts.write_text("slow one\nempty reply\nthree\n")
+    output = tmp_path / "out.jsonl"
+    result = cli_runner.invoke(cli_mod.client, ["bulk", str(prompts), "-o", str(output), "-c", "3"])
+    assert result.exit_code == 1
+    lines = records(output)
+    assert [r["id"] for r in lines] == ["1", "2", "3"]
+    assert lines[1]["error"]["type"] == "IndexError"
+    assert lines[0]["content"] == "echo slow one"
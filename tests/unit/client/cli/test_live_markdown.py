@@ -0,0 +1,112 @@
+# tests/unit/client_cli/test_live_markdown.py
+
+import io
+
+from rich.console import Console
+import llm_wrapper.client.cli as cli_mod
+from llm_wrapper.client.render import LiveMarkdown
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def feed_tokens(view, text, clock=None, step=0.0):
+    for token in text.split(" "):
+        view.feed(token + " ")
+        if clock:
+            clock.now += step
+
+
+def make_view(clock=None, fps=10):
+    out = io.StringIO()
+    console = Console(file=out, width=80, force_terminal=False)
+    return LiveMarkdown(console, fps=fps, clock=clock or FakeClock()), out
+
+
+def test_blocks_are_finalized_once_and_in_order():
+    view, out = make_view()
+    with view:
+        for part in ["# Ti", "tle\n", "\nFirst para", "graph.\n\n", "- one\n", "- two\n\n", "Last line"]:
+            view.feed(part)
+    text = out.getvalue()
+    assert view.blocks == 4
+    assert text.index("Title") < text.index("First paragraph.") < text.index("one") < text.index("Last line")
+    assert text.count("First paragraph.") == 1
+
+
+def test_code_fences_and_indented_continuations_stay_in_one_block():
+    view, out = make_view()
+    with view:
+        view.feed("```python\nx = 1\n\ny = 2\n```\n\n1. item\n\n   more of item\n")
+    assert view.blocks == 2
+    assert "y = 2" in out.getvalue()
+    assert "more of item" in out.getvalue()
+
+
+def test_redraws_are_capped_by_frame_rate():
+    clock = FakeClock()
+    view, _ = make_view(clock, fps=10)
+    with view:
+        feed_tokens(view, "word " * 1000, clock, step=0.001)
+    # One token per millisecond for a second at 10 fps
+    assert view.frames <= 12
+
+
+def test_cli_live_stream(cli_runner):
+    result = cli_runner.invoke(cli_mod.client, ["--query", "test", "--stream", "--live"])
+    assert result.exit_code == 0
+    assert "hello world" in result.output
+    assert "Rendered Markdown" not in result.output
+
+
+def test_plain_stream_does_not_interpret_markup(monkeypatch, cli_runner):
+    class MarkupOpenAI:
+        def __init__(self, base_url, api_key): pass
+        @property
+        def chat(self): return self
+        @property
+        def completions(self): return self
+        def create(self, model, messages, temperature=None, stream=False):
+            chunk = type("Chunk", (), {"choices": [type("C", (), {"delta": type("D", (), {"content": "[bold]x[/bold]"})()})]})()
+            return iter([chunk])
+
+    monkeypatch.setattr(cli_mod, "openai", type("Fake", (), {"OpenAI": MarkupOpenAI}))
+    result = cli_runner.invoke(cli_mod.client, ["--query", "test", "--stream"])
+    assert result.exit_code == 0
+    assert "[bold]x[/bold]" in result.output
+
+
+def test_closed_code_fence_is_finalized_at_once():
+    view, out = make_view()
+    with view:
+        view.feed("```python\nx = 1\n```\n")
+        assert view.blocks == 1
+        view.feed("after")
+    assert view.blocks == 2
+
+
+def test_long_tails_are_printed_in_bounded_blocks():
+    out = io.StringIO()
+    view = LiveMarkdown(Console(file=out, width=80, force_terminal=False), clock=FakeClock(), max_lines=10)
+    tails = []
+    render = view._render
+    view._render = lambda: (tails.append(len(view._lines)), render())
+    with view:
+        view.feed("```\n" + "".join(f"code {i}\n" for i in range(35)) + "```\n")
+        view.feed("".join(f"- item {i}\n" for i in range(35)))
+    text = out.getvalue()
+    assert max(tails) <= 11
+    assert all(f"code {i}" in text for i in range(35)) and text.count("code 12") == 1
+    assert all(f"item {i}" in text for i in range(35))
+    assert "```" not in text
+
+
+def test_live_needs_streaming(cli_runner):
+    result = cli_runner.invoke(cli_mod.client, ["--query", "test", "--no-stream", "--live"])
+    assert result.exit_code == 2
+    assert "--no-stream" in result.output
@@ -0,0 +1,77 @@
+# tests/unit/config_loader/test_reload.py
+
+import asyncio
+import yaml
+import pytest
+import llm_wrapper.server.config_loader as cl
+from llm_wrapper.server.config_watcher import signal_config_reload, watch_configs
+
+
+def write_config(config_path, name, url):
+    (config_path / f"{name}.yaml").write_text(yaml.safe_dump({
+        "model": {"path": "p"},
+        "api": {"url": url}
+    }))
+
+
+def test_reload_swaps_snapshot_and_keeps_old_dicts(config_path):
+    write_config(config_path, "a", "http://a")
+    registry = cl.ConfigRegistry(cl.load_all_configs())
+    before = registry.snapshot()
+
+    write_config(config_path, "b", "http://b")
+    registry.reload()
+
+    assert set(registry) == {"a", "b"}
+    assert registry.reloads == 1
+    # Unchanged configs keep their identity; the old snapshot is untouched
+    assert registry["a"] is before["a"]
+    assert set(before) == {"a"}
+
+
+def test_invalid_file_keeps_previous_config(config_path):
+    write_config(config_path, "a", "http://a")
+    registry = cl.ConfigRegistry(cl.load_all_configs())
+
+    (config_path / "a.yaml").write_text(yaml.safe_dump({"model": {"path": "p"}}))
+    registry.reload()
+
+    assert registry["a"]["api"]["url"] == "http://a"
+    assert "a" in registry.errors
+
+
+@pytest.mark.asyncio
+async def test_watcher_reloads_on_change(config_path):
+    write_config(config_path, "a", "http://a")
+    registry = cl.ConfigRegistry(cl.load_all_configs())
+    watcher = asyncio.ensure_future(watch_configs(0.01, registry))
+    try:
+        await asyncio.sleep(0.05)
+        write_config(config_path, "a", "http://changed-a")
+        for _ in range(100):
+            if registry["a"]["api"]["url"] == "http://changed-a":
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        watcher.cancel()
+
+    assert registry["a"]["api"]["url"] == "http://changed-a"
+
+
+@pytest.mark.asyncio
+async def test_signal_makes_other_watchers_reload(config_path):
+    write_config(config_path, "a", "http://a")
+    registry = cl.ConfigRegistry(cl.load_all_configs())
+    watcher = asyncio.ensure_future(watch_configs(0.01, registry))
+    try:
+        await asyncio.sleep(0.05)
+        assert await signal_config_reload(0.01)
+        for _ in range(100):
+            if registry.reloads:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        watcher.cancel()
+
+    assert registry.reloads >= 1
+    assert not await signal_config_reload(0)
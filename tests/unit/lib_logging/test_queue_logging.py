@@ -0,0 +1,69 @@
+# tests/unit/lib_logging/test_queue_logging.py
+
+import logging
+from llm_wrapper.lib import logging as lib_logging
+from llm_wrapper.lib.logging import flush_logger, lazy, setup_logger
+
+
+def test_lazy_argument_skipped_when_level_disabled(tmp_path):
+    logger = setup_logger("test_logger_lazy", str(tmp_path / "lazy.log"), level=logging.INFO)
+    calls = []
+
+    def expensive():
+        calls.append(1)
+        return "expensive value"
+
+    logger.debug("skipped: %s", lazy(expensive))
+    logger.info("kept: %s", lazy(expensive))
+    flush_logger(logger)
+
+    assert calls == [1]
+    assert "kept: expensive value" in (tmp_path / "lazy.log").read_text()
+
+
+def test_mutable_args_are_snapshotted_at_call_time(tmp_path):
+    log_file = tmp_path / "snapshot.log"
+    logger = setup_logger("test_logger_snapshot", str(log_file), level=logging.INFO)
+    payload = {"stream": False}
+
+    logger.info("payload %s", payload)
+    payload["stream"] = True
+    flush_logger(logger)
+
+    assert "'stream': False" in log_file.read_text()
+
+
+def test_file_handler_rotates_by_size(tmp_path, monkeypatch):
+    monkeypatch.setattr(lib_logging, "LOG_MAX_BYTES", 200)
+    monkeypatch.setattr(lib_logging, "LOG_BACKUP_COUNT", 2)
+    log_file = tmp_path / "rotate.log"
+    logger = setup_logger("test_logger_rotate", str(log_file), level=logging.INFO)
+
+    for i in range(20):
+        logger.info("record number %d", i)
+    flush_logger(logger)
+
+    assert (tmp_path / "rotate.log.1").exists()
+    assert not (tmp_path / "rotate.log.3").exists()
+
+
+def test_workers_log_to_their_own_file(tmp_path, monkeypatch):
+    monkeypatch.setenv(lib_logging.WORKER_ID_ENV, "3")
+    logger = setup_logger("test_logger_worker", str(tmp_path / "server.log"), level=logging.INFO)
+    logger.info("from worker")
+    flush_logger(logger)
+
+    assert "from worker" in (tmp_path / "server.worker-3.log").read_text()
+    assert not (tmp_path / "server.log").exists()
+
+
+def test_setting_up_a_logger_again_stops_its_old_writer(tmp_path):
+    logger = setup_logger("test_logger_again", str(tmp_path / "again.log"), level=logging.INFO)
+    first = lib_logging._listeners["test_logger_again"]
+    assert setup_logger("test_logger_again", str(tmp_path / "again.log")) is logger
+    assert lib_logging._listeners["test_logger_again"] is first
+
+    logger.handlers.clear()
+    setup_logger("test_logger_again", str(tmp_path / "again.log"), level=logging.INFO)
+    assert not first._thread.is_alive()
+    assert all(h.stream is None for h in first.handlers)
@@ -0,0 +1,59 @@
+# tests/unit/lib_telemetry/test_sampling.py
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.sampling import Decision
+
+from llm_wrapper.lib.telemetry.telemetry import (
+    ROUTE_ATTRIBUTE,
+    RouteRatioSampler,
+    build_sampler,
+    parse_route_ratios,
+    set_lazy_attributes,
+)
+
+
+def test_parse_route_ratios_clamps_and_skips_invalid_items():
+    ratios = parse_route_ratios(" /v1/chat/completions=0.1, /health=0 ,junk,/v1/models=abc,/x=7")
+    assert ratios == {"/v1/chat/completions": 0.1, "/health": 0.0, "/x": 1.0}
+
+
+def test_route_ratio_overrides_default():
+    sampler = RouteRatioSampler(1.0, {"/health": 0.0})
+    trace_id = 0x1234
+
+    dropped = sampler.should_sample(None, trace_id, "health_check", attributes={ROUTE_ATTRIBUTE: "/health"})
+    kept = sampler.should_sample(None, trace_id, "chat_completion", attributes={ROUTE_ATTRIBUTE: "/v1/chat/completions"})
+    by_name = sampler.should_sample(None, trace_id, "/health")
+
+    assert dropped.decision == Decision.DROP
+    assert kept.decision == Decision.RECORD_AND_SAMPLE
+    assert by_name.decision == Decision.DROP
+
+
+def test_build_sampler_reads_env(monkeypatch):
+    monkeypatch.setenv("TRACE_SAMPLE_RATIO", "0")
+    monkeypatch.setenv("TRACE_SAMPLE_ROUTES", "/v1/chat/completions=1")
+    sampler = build_sampler()
+
+    assert sampler.should_sample(None, 0x1234, "health_check").decision == Decision.DROP
+    result = sampler.should_sample(None, 0x1234, "chat", attributes={ROUTE_ATTRIBUTE: "/v1/chat/completions"})
+    assert result.decision == Decision.RECORD_AND_SAMPLE
+
+
+def test_lazy_attributes_skipped_for_unsampled_spans():
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"output.length": 3}
+
+    dropped = TracerProvider(sampler=build_sampler(0.0, {})).get_tracer("test")
+    with dropped.start_as_current_span("root") as span:
+        set_lazy_attributes(span, compute)
+    assert calls == []
+
+    sampled = TracerProvider(sampler=build_sampler(1.0, {})).get_tracer("test")
+    with sampled.start_as_current_span("root") as span:
+        set_lazy_attributes(span, compute)
+        assert span.attributes["output.length"] == 3
+    assert calls == [1]
@@ -0,0 +1,79 @@
+# tests/unit/server_admission/test_admission_queue.py
+
+import asyncio
+import pytest
+from fastapi import HTTPException
+from llm_wrapper.server.admission import AdmissionQueue
+
+@pytest.mark.asyncio
+async def test_slots_are_handed_to_waiters_in_order():
+    queue = AdmissionQueue("m", max_in_flight=1, max_queue=10, max_wait=5)
+    assert await queue.acquire(5) == 0.0
+    order = []
+
+    async def waiter(name):
+        await queue.acquire(5)
+        order.append(name)
+
+    tasks = [asyncio.ensure_future(waiter(n)) for n in ("a", "b")]
+    await asyncio.sleep(0)
+    assert queue.queued == 2
+
+    queue.release(0.1)
+    await asyncio.sleep(0)
+    queue.release(0.1)
+    await asyncio.gather(*tasks)
+    assert order == ["a", "b"]
+    assert queue.in_flight == 1
+
+@pytest.mark.asyncio
+async def test_full_queue_is_rejected_with_retry_after():
+    queue = AdmissionQueue("m", max_in_flight=1, max_queue=0, max_wait=5)
+    await queue.acquire(5)
+    with pytest.raises(HTTPException) as exc:
+        await queue.acquire(5)
+    assert exc.value.status_code == 429
+    assert exc.value.detail["code"] == "queue_full"
+    assert int(exc.value.headers["Retry-After"]) >= 1
+
+@pytest.mark.asyncio
+async def test_predicted_wait_beyond_deadline_is_rejected_immediately():
+    queue = AdmissionQueue("m", max_in_flight=2, max_queue=10, max_wait=60)
+    queue.service_time = 4.0
+    await queue.acquire(60)
+    await queue.acquire(60)
+    # One slot frees every 2s on average; the next request waits ~2s
+    assert queue.predicted_wait() == pytest.approx(2.0)
+    with pytest.raises(HTTPException) as exc:
+        queue.check(1.0)
+    assert exc.value.detail["code"] == "deadline_exceeded"
+    assert exc.value.headers["Retry-After"] == "2"
+
+@pytest.mark.asyncio
+async def test_queue_wait_times_out():
+    queue = AdmissionQueue("m", max_in_flight=1, max_queue=10, max_wait=5)
+    queue.service_time = 0.001
+    await queue.acquire(5)
+    with pytest.raises(HTTPException) as exc:
+        await queue.acquire(0.01)
+    assert exc.value.detail["code"] == "queue_timeout"
+    assert queue.queued == 0
+    queue.release(0.0)
+    assert queue.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_idle_slot_is_free_for_others_while_backing_off():
+    from llm_wrapper.server.admission import AdmissionController
+    controller = AdmissionController()
+    config = {"api": {"url": "http://u"}, "limits": {"max_in_flight": 1}}
+    async with controller.slot("m", config) as slot:
+        queue = slot.queue
+        backoff = asyncio.ensure_future(slot.idle(0.05))
+        await asyncio.sleep(0)
+        assert queue.in_flight == 0
+        # Another request runs during the backoff
+        async with controller.slot("m", config):
+            assert queue.in_flight == 1
+        await backoff
+        assert queue.in_flight == 1
+    assert queue.in_flight == 0
@@ -0,0 +1,18 @@
+# tests/unit/server_admission/test_model_limit.py
+
+from llm_wrapper.server.admission import model_limit
+
+def test_unbounded_without_limits():
+    assert model_limit({"api": {"url": "http://x"}}) is None
+
+def test_model_limit_from_limits_section():
+    assert model_limit({"api": {"url": "http://x"}, "limits": {"max_in_flight": 8}}) == 8
+
+def test_replica_limits_cap_the_model():
+    api = {"endpoints": [{"url": "http://a", "max_in_flight": 2}, {"url": "http://b", "max_in_flight": 3}]}
+    assert model_limit({"api": api}) == 5
+    assert model_limit({"api": api, "limits": {"max_in_flight": 4}}) == 4
+
+def test_partial_replica_limits_do_not_cap():
+    api = {"endpoints": [{"url": "http://a", "max_in_flight": 2}, {"url": "http://b"}]}
+    assert model_limit({"api": api}) is None
@@ -1,5 +1,7 @@
 # tests/unit/server_api/dummy_responses.py
 
+import json
+
 class DummyResponse200:
     def __init__(self, payload):
         self.status = 200
@@ -8,6 +10,7 @@ class DummyResponse200:
 
     async def text(self): return None
     async def json(self): return self._payload
+    async def read(self): return json.dumps(self._payload).encode()
     async def __aenter__(self): return self
     async def __aexit__(self, exc_type, exc, tb): pass
 
@@ -41,4 +41,39 @@ def test_preserves_user_and_system_roles(base_config):
 def test_raises_on_missing_user_message(base_config):
     req = ChatCompletionRequest(model="m", messages=[Message(role="system", content="sys")])
     with pytest.raises(HTTPException):
-        api.build_upstream_payload(req, base_config)
\ No newline at end of file
+        api.build_upstream_payload(req, base_config)
+
+
+def test_forwards_earlier_turns(base_config):
+    req = ChatCompletionRequest(
+        model="m",
+        messages=[
+            Message(role="user", content="a"),
+            Message(role="assistant", content="b"),
+            Message(role="user", content="c")
+        ]
+    )
+    payload = api.build_upstream_payload(req, base_config)
+
+    assert [m["role"] for m in payload["messages"]] == ["system", "user", "assistant", "user"]
+    assert payload["messages"][-1]["content"] == "c"
+
+
+def test_forwards_tools_from_fast_and_validated_requests(base_config):
+    from llm_wrapper.server.codec import decode_chat_request, dumps
+
+    body = {
+        "model": "m",
+        "messages": [{"role": "user", "content": "hi"}],
+        "tools": [{"type": "function", "function": {"name": "f", "parameters": {"type": "object"}}}],
+        "tool_choice": "auto",
+        "logit_bias": {"50256": -100.0},
+    }
+    fast = api.build_upstream_payload(decode_chat_request(dumps(body)), base_config)
+    validated = api.build_upstream_payload(ChatCompletionRequest(**body), base_config)
+
+    assert fast["tools"] == body["tools"] and fast["tool_choice"] == "auto"
+    assert fast["logit_bias"] == {"50256": -100.0}
+    assert validated["tools"][0]["function"]["name"] == "f"
+    assert {k: validated[k] for k in ("tool_choice", "logit_bias")} == {"tool_choice": "auto", "logit_bias": {"50256": -100.0}}
+    assert "functions" not in fast and "functions" not in validated
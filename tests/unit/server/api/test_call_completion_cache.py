@@ -0,0 +1,37 @@
+# tests/unit/server_api/test_call_completion_cache.py
+
+import pytest
+import llm_wrapper.server.api as api
+import llm_wrapper.server.cache as cache_mod
+from llm_wrapper.server.api import call_completion
+from unit.server.api.dummy_responses import DummyResponse200, DummySession
+
+@pytest.mark.asyncio
+async def test_call_completion_serves_repeat_requests_from_cache(monkeypatch, chat_request):
+    payload = {
+        "id": "id",
+        "object": "chat.completion",
+        "created": 1,
+        "model": "p",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+    }
+    calls = []
+
+    def session_factory():
+        calls.append(1)
+        return DummySession(DummyResponse200(payload))
+
+    monkeypatch.setattr(api, "get_config_or_raise", lambda model: {
+        "api": {"url": "http://x"},
+        "model": {"path": "p"},
+        "cache": {"enabled": True, "ttl": 30},
+    })
+    monkeypatch.setattr(api, "build_upstream_payload", lambda req, cfg: {"dummy": True})
+    monkeypatch.setattr(api.aiohttp, "ClientSession", session_factory)
+    monkeypatch.setattr(cache_mod, "response_cache", cache_mod.ResponseCache(10, 100_000))
+
+    first = await call_completion(chat_request)
+    second = await call_completion(chat_request)
+    assert first.id == second.id == "id"
+    assert len(calls) == 1
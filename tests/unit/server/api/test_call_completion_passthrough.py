@@ -0,0 +1,67 @@
+# tests/unit/server_api/test_call_completion_passthrough.py
+
+import json
+import pytest
+from fastapi import HTTPException
+import llm_wrapper.server.api as api
+from llm_wrapper.server.api import call_completion
+from llm_wrapper.server.codec import RawCompletion
+from unit.server.api.dummy_responses import DummyResponse200, DummySession
+
+PAYLOAD = {
+    "id": "id",
+    "object": "chat.completion",
+    "created": 1,
+    "model": "p",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+    "system_fingerprint": "fp"
+}
+
+
+@pytest.fixture
+def passthrough_config(monkeypatch):
+    def configure(**completion):
+        monkeypatch.setattr(api, "get_config_or_raise", lambda model: {
+            "api": {"url": "http://x"},
+            "model": {"path": "p"},
+            "parameters": {},
+            "system_prompt": "",
+            "completion": {"passthrough": True, **completion}
+        })
+        monkeypatch.setattr(api, "build_upstream_payload", lambda req, cfg: {"dummy": True})
+    return configure
+
+
+@pytest.mark.asyncio
+async def test_passthrough_returns_upstream_bytes(monkeypatch, chat_request, passthrough_config):
+    passthrough_config()
+    monkeypatch.setattr(api.aiohttp, "ClientSession", lambda: DummySession(DummyResponse200(PAYLOAD)))
+
+    result = await call_completion(chat_request)
+
+    assert isinstance(result, RawCompletion)
+    assert json.loads(result.body) == PAYLOAD
+    assert result.parse().choices[0].message.content == "ok"
+
+
+@pytest.mark.asyncio
+async def test_passthrough_rewrites_model(monkeypatch, chat_request, passthrough_config):
+    passthrough_config(rewrite_model=True)
+    monkeypatch.setattr(api.aiohttp, "ClientSession", lambda: DummySession(DummyResponse200(PAYLOAD)))
+
+    result = await call_completion(chat_request)
+
+    assert json.loads(result.body)["model"] == "m"
+
+
+@pytest.mark.asyncio
+async def test_passthrough_rejects_malformed_body(monkeypatch, chat_request, passthrough_config):
+    passthrough_config()
+    broken = {**PAYLOAD, "choices": []}
+    monkeypatch.setattr(api.aiohttp, "ClientSession", lambda: DummySession(DummyResponse200(broken)))
+
+    with pytest.raises(HTTPException) as exc:
+        await call_completion(chat_request)
+    assert exc.value.status_code == 500
+    assert "no choices" in exc.value.detail["message"]
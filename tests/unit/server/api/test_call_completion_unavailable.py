@@ -0,0 +1,28 @@
+# tests/unit/server_api/test_call_completion_unavailable.py
+
+import pytest
+from fastapi import HTTPException
+import llm_wrapper.server.api as api
+from llm_wrapper.server.api import call_completion
+from llm_wrapper.server.balancer import balancer
+
+@pytest.mark.asyncio
+async def test_call_completion_fails_fast_when_replicas_are_ejected(monkeypatch, chat_request):
+    config = {
+        "api": {"url": "http://ejected", "circuit_breaker": {"enabled": True}},
+        "model": {"path": "p"},
+    }
+    monkeypatch.setattr(api, "get_config_or_raise", lambda model: config)
+    monkeypatch.setattr(api, "build_upstream_payload", lambda req, cfg: {"dummy": True})
+
+    def fail_session(*args, **kwargs):
+        raise AssertionError("an ejected upstream should not be called")
+
+    monkeypatch.setattr(api.aiohttp, "ClientSession", fail_session)
+    chat_request.model = "ejected-model"
+    balancer.replica_set("ejected-model", config["api"]).replicas[0].breaker.trip("test")
+
+    with pytest.raises(HTTPException) as exc:
+        await call_completion(chat_request)
+    assert exc.value.status_code == 503
+    assert int(exc.value.headers["Retry-After"]) >= 1
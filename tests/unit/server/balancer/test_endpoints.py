@@ -0,0 +1,22 @@
+# tests/unit/server_balancer/test_endpoints.py
+
+import pytest
+from pydantic import ValidationError
+from llm_wrapper.server.balancer import endpoints_of
+from llm_wrapper.server.config_loader import ApiConfig
+
+def test_single_url_is_one_endpoint():
+    assert endpoints_of({"url": "http://a"}) == [{"url": "http://a", "weight": 1.0, "max_in_flight": None}]
+
+def test_endpoints_take_precedence():
+    api = ApiConfig(endpoints=[{"url": "http://a", "weight": 2, "max_in_flight": 4}, {"url": "http://b"}]).model_dump()
+    assert endpoints_of(api) == [
+        {"url": "http://a", "weight": 2.0, "max_in_flight": 4},
+        {"url": "http://b", "weight": 1.0, "max_in_flight": None},
+    ]
+
+def test_api_config_requires_an_upstream():
+    with pytest.raises(ValidationError):
+        ApiConfig()
+    with pytest.raises(ValidationError):
+        ApiConfig(endpoints=[{"url": "http://a", "weight": 0}])
@@ -0,0 +1,60 @@
+# tests/unit/server_balancer/test_policies.py
+
+from llm_wrapper.server.balancer import Balancer, ReplicaSet, LEAST_OUTSTANDING, PEAK_EWMA
+
+ENDPOINTS = [{"url": "http://a", "weight": 1.0}, {"url": "http://b", "weight": 1.0}]
+
+def test_least_outstanding_prefers_idle_replica():
+    replicas = ReplicaSet("m", ENDPOINTS, LEAST_OUTSTANDING)
+    with replicas.lease() as first:
+        second = replicas.pick()
+        assert second.url != first.url
+    assert all(r.in_flight == 0 for r in replicas.replicas)
+
+def test_weights_scale_outstanding_load():
+    replicas = ReplicaSet("m", [{"url": "http://big", "weight": 3.0}, {"url": "http://small", "weight": 1.0}])
+    replicas.replicas[0].in_flight = 1
+    assert replicas.pick().url == "http://big"
+    replicas.replicas[0].in_flight = 3
+    assert replicas.pick().url == "http://small"
+
+def test_peak_ewma_avoids_slow_replica():
+    replicas = ReplicaSet("m", ENDPOINTS, PEAK_EWMA)
+    slow, fast = replicas.replicas
+    slow.observe(2.0)
+    fast.observe(0.1)
+    assert replicas.pick() is fast
+    # Peak sensitivity: a single slow sample takes effect immediately
+    fast.observe(5.0)
+    assert replicas.pick() is slow
+
+def test_balancer_keeps_stats_across_config_changes():
+    balancer = Balancer()
+    api = {"endpoints": ENDPOINTS}
+    first = balancer.replica_set("m", api)
+    assert balancer.replica_set("m", api) is first
+    first.replicas[0].in_flight = 4
+
+    updated = balancer.replica_set("m", {"endpoints": ENDPOINTS + [{"url": "http://c", "weight": 1.0}]})
+    assert [r.url for r in updated.replicas] == ["http://a", "http://b", "http://c"]
+    assert updated.replicas[0].in_flight == 4
+
+def test_saturated_replicas_are_skipped():
+    replicas = ReplicaSet("m", [
+        {"url": "http://a", "weight": 10.0, "max_in_flight": 1},
+        {"url": "http://b", "weight": 1.0, "max_in_flight": 1},
+    ])
+    replicas.replicas[0].in_flight = 1
+    assert replicas.pick().url == "http://b"
+
+def test_pick_avoids_excluded_replicas():
+    replicas = ReplicaSet("m", ENDPOINTS)
+    assert all(replicas.pick(exclude={"http://a"}).url == "http://b" for _ in range(10))
+    # Falls back to the excluded replica when nothing else is left
+    assert ReplicaSet("m", ENDPOINTS[:1]).pick(exclude={"http://a"}).url == "http://a"
+
+def test_alternate_requires_room_on_another_replica():
+    replicas = ReplicaSet("m", [{"url": "http://a", "weight": 1.0}, {"url": "http://b", "weight": 1.0, "max_in_flight": 1}])
+    assert replicas.alternate({"http://a"}).url == "http://b"
+    replicas.replicas[1].in_flight = 1
+    assert replicas.alternate({"http://a"}) is None
@@ -0,0 +1,54 @@
+# tests/unit/server_balancer/test_prefix_hash.py
+
+from llm_wrapper.server.balancer import HOME, PREFIX_HASH, SPILLED, PrefixSettings, ReplicaSet, prefix_key
+
+ENDPOINTS = [{"url": f"http://r{i}", "weight": 1.0} for i in range(4)]
+
+
+def payload(system, user):
+    return {"messages": [{"role": "system", "content": system}, {"role": "user", "content": user}]}
+
+
+def test_prefix_key_covers_leading_characters_only():
+    long_prompt = "x" * 100
+    assert prefix_key(payload(long_prompt, "a"), 50) == prefix_key(payload(long_prompt, "b"), 50)
+    assert prefix_key(payload("short", "a"), 50) != prefix_key(payload("short", "b"), 50)
+
+
+def test_same_prefix_lands_on_same_replica():
+    replicas = ReplicaSet("m", ENDPOINTS, PREFIX_HASH)
+    body = payload("You are helpful.", "hello")
+    with replicas.lease(payload=body) as first:
+        assert first.affinity == HOME
+    for _ in range(10):
+        with replicas.lease(payload=body) as lease:
+            assert lease.url == first.url
+
+
+def test_prefixes_spread_and_move_little_when_a_replica_is_added():
+    replicas = ReplicaSet("m", ENDPOINTS, PREFIX_HASH)
+    keys = [prefix_key(payload("sp", f"user {i}"), 2048) for i in range(400)]
+    before = [replicas.pick(key=k).url for k in keys]
+    assert len(set(before)) == 4
+
+    grown = ReplicaSet("m", ENDPOINTS + [{"url": "http://r4", "weight": 1.0}], PREFIX_HASH)
+    after = [grown.pick(key=k).url for k in keys]
+    moved = sum(b != a for b, a in zip(before, after))
+    assert all(a == "http://r4" for b, a in zip(before, after) if b != a)
+    assert moved < len(keys) / 2
+
+
+def test_busy_home_replica_spills_over():
+    replicas = ReplicaSet("m", ENDPOINTS, PREFIX_HASH, prefix=PrefixSettings(chars=2048, load_factor=1.25))
+    body = payload("You are helpful.", "hello")
+    home = replicas.home(replicas.routing_key(body))
+    home.in_flight = 10
+    with replicas.lease(payload=body) as lease:
+        assert lease.replica is not home
+        assert lease.affinity == SPILLED
+
+
+def test_other_policies_ignore_the_payload():
+    replicas = ReplicaSet("m", ENDPOINTS)
+    with replicas.lease(payload=payload("sp", "u")) as lease:
+        assert lease.affinity is None
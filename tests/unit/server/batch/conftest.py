@@ -0,0 +1,38 @@
+# tests/unit/server_batch/conftest.py
+
+import asyncio
+import pytest
+from fastapi import HTTPException
+import llm_wrapper.server.handlers.batch as batch_mod
+from llm_wrapper.server.models import ChatCompletionResponse
+
+def make_response(content):
+    return ChatCompletionResponse(
+        id=f"id-{content}",
+        created=1,
+        model="p",
+        choices=[{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        usage={"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+    )
+
+@pytest.fixture
+def fake_upstream(monkeypatch):
+    """Echo the user message back; 'fail' raises and 'slow' finishes last."""
+    state = {"active": 0, "peak": 0, "prompts": []}
+
+    async def fake_call(request, system_prompt):
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        try:
+            content = request.messages[-1].content
+            state["prompts"].append((content, request.stream, system_prompt))
+            await asyncio.sleep(0.05 if content == "slow" else 0)
+            if content == "fail":
+                raise HTTPException(status_code=502, detail={"message": "bad gateway"})
+            return make_response(content)
+        finally:
+            state["active"] -= 1
+
+    monkeypatch.setattr(batch_mod, "call_completion", fake_call)
+    monkeypatch.setattr(batch_mod, "get_config_or_raise", lambda model: {"system_prompt": f"sp-{model}"})
+    return state
@@ -0,0 +1,45 @@
+# tests/unit/server_batch/test_batch_results.py
+
+import json
+import pytest
+from fastapi import HTTPException
+from starlette.responses import StreamingResponse
+import llm_wrapper.server.handlers.batch as batch_mod
+from llm_wrapper.server.models import BatchChatCompletionRequest
+
+def make_batch(prompts, **kwargs):
+    return BatchChatCompletionRequest(
+        requests=[{"model": "m", "messages": [{"role": "user", "content": p}], "stream": True} for p in prompts],
+        **kwargs
+    )
+
+@pytest.mark.asyncio
+async def test_results_keep_input_order_and_isolate_errors(fake_upstream):
+    response = await batch_mod.handle_batch(make_batch(["slow", "fail", "ok"]))
+    assert [r.index for r in response.results] == [0, 1, 2]
+    assert response.results[0].response.choices[0].message.content == "slow"
+    assert response.results[1].error["status_code"] == 502
+    assert response.results[1].error["message"] == "bad gateway"
+    assert response.results[2].error is None
+    # Items are always completed non-streaming with the model's system prompt
+    assert {(stream, sp) for _, stream, sp in fake_upstream["prompts"]} == {(False, "sp-m")}
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded(fake_upstream):
+    await batch_mod.handle_batch(make_batch(["slow"] * 6, max_concurrency=2))
+    assert fake_upstream["peak"] == 2
+
+@pytest.mark.asyncio
+async def test_ndjson_streams_in_completion_order(fake_upstream):
+    response = await batch_mod.handle_batch(make_batch(["slow", "ok"], stream=True))
+    assert isinstance(response, StreamingResponse)
+    assert response.media_type == "application/x-ndjson"
+    lines = [json.loads(line) async for line in response.body_iterator]
+    assert [line["index"] for line in lines] == [1, 0]
+
+@pytest.mark.asyncio
+async def test_oversized_batch_is_rejected(monkeypatch, fake_upstream):
+    monkeypatch.setattr(batch_mod, "BATCH_MAX_ITEMS", 1)
+    with pytest.raises(HTTPException) as exc:
+        await batch_mod.handle_batch(make_batch(["a", "b"]))
+    assert exc.value.status_code == 400
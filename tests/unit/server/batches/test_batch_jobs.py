@@ -0,0 +1,233 @@
+# tests/unit/server_batches/test_batch_jobs.py
+
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+import llm_wrapper.server.batches as batches_mod
+from llm_wrapper.server.batches import BatchRunner, BatchStore, read_checkpoint, validate_input
+from llm_wrapper.server.context import RequestContext, _current_context, key_tenant, tenant_of
+from llm_wrapper.server.models import ChatCompletionResponse, CreateBatchRequest
+
+
+def line(custom_id: str, content: str = "hi", model: str = "m") -> dict:
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": {"model": model, "messages": [{"role": "user", "content": content}]},
+    }
+
+
+def completion(content: str) -> ChatCompletionResponse:
+    return ChatCompletionResponse(
+        id="id", created=1, model="m",
+        choices=[{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        usage={"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+    )
+
+
+async def chunks(data: bytes):
+    yield data
+
+
+async def make_batch(store: BatchStore, lines: list[dict]):
+    body = "".join(json.dumps(item) + "\n" for item in lines).encode()
+    file = await store.create_file("input.jsonl", "batch", chunks(body))
+    return store.create_batch(CreateBatchRequest(input_file_id=file.id, endpoint="/v1/chat/completions"))
+
+
+def read_lines(store: BatchStore, file_id: str) -> list[dict]:
+    return [json.loads(raw) for raw in store.file_path(file_id).read_text().splitlines()]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BatchStore(tmp_path)
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+
+    async def fake_completion(request, system_prompt=""):
+        calls.append(request.messages[-1].content)
+        await asyncio.sleep(0)
+        if request.messages[-1].content == "boom":
+            raise HTTPException(status_code=500, detail={"message": "upstream failed"})
+        return completion(f"re: {request.messages[-1].content}")
+
+    monkeypatch.setattr(batches_mod, "call_completion", fake_completion)
+    monkeypatch.setattr(batches_mod, "get_config_or_raise", lambda model: {"api": {"url": "http://x"}, "system_prompt": ""})
+    return calls
+
+
+def test_validate_input_reports_bad_lines(tmp_path):
+    path = tmp_path / "input.jsonl"
+    bad_url = {**line("c"), "url": "/v1/embeddings"}
+    no_messages = {**line("d"), "body": {"model": "m"}}
+    path.write_text("\n".join([json.dumps(line("a")), json.dumps(line("a")), json.dumps(bad_url), json.dumps(no_messages), "{", ""]))
+    total, errors = validate_input(path, "/v1/chat/completions")
+    assert total == 5
+    assert [(e["line"], e["code"]) for e in errors] == [
+        (2, "duplicate_custom_id"), (3, "invalid_url"), (4, "invalid_request"), (5, "invalid_json")
+    ]
+
+
+@pytest.mark.asyncio
+async def test_runner_writes_results_and_errors(store, calls):
+    batch = await make_batch(store, [line("a", "one"), line("b", "boom"), line("c", "three")])
+    await BatchRunner(store, batch.id, concurrency=2).run()
+
+    batch = store.get_batch(batch.id)
+    assert batch.status == "completed"
+    assert batch.request_counts.model_dump() == {"total": 3, "completed": 2, "failed": 1}
+    output = {item["custom_id"]: item for item in read_lines(store, batch.output_file_id)}
+    assert output["a"]["response"]["body"]["choices"][0]["message"]["content"] == "re: one"
+    assert output["a"]["response"]["status_code"] == 200
+    [error] = read_lines(store, batch.error_file_id)
+    assert error["custom_id"] == "b" and error["response"]["status_code"] == 500
+    assert store.get_file(batch.output_file_id).purpose == "batch_output"
+
+
+@pytest.mark.asyncio
+async def test_invalid_input_fails_the_batch(store, calls):
+    batch = await make_batch(store, [{"custom_id": "a", "method": "GET", "url": "/v1/models", "body": {}}])
+    await BatchRunner(store, batch.id).run()
+    batch = store.get_batch(batch.id)
+    assert batch.status == "failed"
+    assert batch.errors["data"][0]["code"] == "invalid_url"
+    assert calls == []
+
+
+@pytest.mark.asyncio
+async def test_resume_skips_checkpointed_lines_and_drops_partial_tail(store, calls):
+    batch = await make_batch(store, [line("a", "one"), line("b", "two")])
+    output = store.file_path(batch.output_file_id)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({"custom_id": "a", "response": {"status_code": 200}}) + "\n" + '{"custom_id": "b", "resp')
+    assert read_checkpoint(output) == {"a"}
+
+    batch.status = "in_progress"
+    store.save_batch(batch)
+    await BatchRunner(store, batch.id).run()
+    assert calls == ["two"]
+    assert [item["custom_id"] for item in read_lines(store, batch.output_file_id)] == ["a", "b"]
+    assert store.get_batch(batch.id).request_counts.completed == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_batch_sends_no_new_requests(store, calls):
+    batch = await make_batch(store, [line("a"), line("b")])
+    assert store.cancel_batch(batch.id).status == "cancelling"
+    await BatchRunner(store, batch.id).run()
+    assert calls == []
+    assert store.get_batch(batch.id).status == "cancelled"
+    with pytest.raises(HTTPException) as exc:
+        store.cancel_batch(batch.id)
+    assert exc.value.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_lines_are_retried_not_failed(store, monkeypatch, calls):
+    attempts = []
+
+    async def limited(request, system_prompt=""):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise HTTPException(status_code=429, detail={"message": "slow down"}, headers={"Retry-After": "0"})
+        return completion("ok")
+
+    monkeypatch.setattr(batches_mod, "call_completion", limited)
+    batch = await make_batch(store, [line("a")])
+    await BatchRunner(store, batch.id).run()
+    assert len(attempts) == 2
+    assert store.get_batch(batch.id).request_counts.completed == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_yields_while_interactive_requests_queue(store, monkeypatch, calls):
+    class BusyQueue:
+        max_in_flight = 4
+        in_flight = 4
+        queued = 1
+
+    queue = BusyQueue()
+    monkeypatch.setattr(batches_mod.admission, "queue_for", lambda model_id, config: queue)
+    monkeypatch.setattr(batches_mod, "YIELD_INTERVAL", 0.01)
+    batch = await make_batch(store, [line("a")])
+    runner = asyncio.create_task(BatchRunner(store, batch.id, max_share=0.5).run())
+    await asyncio.sleep(0.05)
+    assert calls == []
+
+    queue.queued, queue.in_flight = 0, 1
+    await asyncio.wait_for(runner, timeout=1)
+    assert calls == ["hi"]
+
+
+@pytest.mark.asyncio
+async def test_upload_limits_and_lookups(store, monkeypatch):
+    monkeypatch.setattr(batches_mod, "BATCH_MAX_FILE_BYTES", 4)
+    with pytest.raises(HTTPException) as exc:
+        await store.create_file("big.jsonl", "batch", chunks(b"12345"))
+    assert exc.value.status_code == 413
+    assert list(store.files_dir.iterdir()) == []
+    with pytest.raises(HTTPException) as exc:
+        store.get_batch("batch_../../etc")
+    assert exc.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_expired_batch_reports_every_line_not_run(store, calls):
+    batch = await make_batch(store, [line("a"), line("b"), line("c")])
+    batch.expires_at = 0
+    store.save_batch(batch)
+    await BatchRunner(store, batch.id).run()
+
+    batch = store.get_batch(batch.id)
+    assert batch.status == "expired"
+    assert calls == []
+    errors = read_lines(store, batch.error_file_id)
+    assert [e["custom_id"] for e in errors] == ["a", "b", "c"]
+    assert {e["error"]["code"] for e in errors} == {"batch_expired"}
+    assert batch.request_counts.failed == 3
+
+
+@pytest.mark.asyncio
+async def test_scheduler_removes_the_lock_of_a_finished_job(store, calls):
+    batch = await make_batch(store, [line("a")])
+    scheduler = batches_mod.BatchScheduler(store, interval=60)
+    await scheduler.adopt()
+    assert (store.root / f"{batch.id}.lock").exists()
+    await asyncio.gather(*scheduler._runners.values())
+
+    assert store.get_batch(batch.id).status == "completed"
+    assert not (store.root / f"{batch.id}.lock").exists()
+    await scheduler.adopt()
+    assert len(scheduler) == 0
+
+
+@pytest.mark.asyncio
+async def test_lines_run_as_the_job_creator(store, monkeypatch):
+    tenants = []
+
+    async def fake_completion(request, system_prompt=""):
+        tenants.append(tenant_of(request))
+        return completion("ok")
+
+    monkeypatch.setattr(batches_mod, "call_completion", fake_completion)
+    monkeypatch.setattr(batches_mod, "get_config_or_raise", lambda model: {"api": {"url": "http://x"}})
+
+    token = _current_context.set(RequestContext(api_key="creator-key"))
+    try:
+        owner = key_tenant()
+        body = (json.dumps(line("a")) + "\n" + json.dumps(line("b")) + "\n").encode()
+        file = await store.create_file("input.jsonl", "batch", chunks(body))
+        batch = store.create_batch(CreateBatchRequest(input_file_id=file.id, endpoint="/v1/chat/completions"), owner=owner)
+    finally:
+        _current_context.reset(token)
+
+    await BatchRunner(store, batch.id).run()
+    assert owner.startswith("key:") and tenants == [owner, owner]
+    assert "creator-key" not in store.get_batch(batch.id).model_dump_json()
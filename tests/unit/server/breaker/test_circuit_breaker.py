@@ -0,0 +1,91 @@
+# tests/unit/server_breaker/test_circuit_breaker.py
+
+import asyncio
+import pytest
+from fastapi import HTTPException
+from llm_wrapper.server.balancer import ReplicaSet, ReplicaUnavailable
+from llm_wrapper.server.breaker import BreakerSettings, CircuitBreaker, CLOSED, HALF_OPEN, OPEN, failed
+
+SETTINGS = BreakerSettings.from_api_config({"circuit_breaker": {
+    "enabled": True, "consecutive_failures": 3, "error_rate": 0.5, "min_requests": 10, "open_seconds": 10,
+}})
+ENDPOINTS = [{"url": "http://a", "weight": 1.0}, {"url": "http://b", "weight": 1.0}]
+
+
+def test_failure_classification():
+    assert failed(None) is False
+    assert failed(HTTPException(status_code=502)) is True
+    assert failed(HTTPException(status_code=400)) is False
+    assert failed(HTTPException(status_code=429)) is None
+    assert failed(asyncio.TimeoutError()) is True
+    assert failed(asyncio.CancelledError()) is None
+
+
+def test_consecutive_failures_open_then_probe_closes():
+    breaker = CircuitBreaker(SETTINGS)
+    for _ in range(3):
+        breaker.record(True, now=0.0)
+    assert breaker.state == OPEN
+    assert not breaker.allow(5.0)
+
+    assert breaker.allow(10.0)
+    assert breaker.state == HALF_OPEN
+    probe = breaker.on_start()
+    assert probe and not breaker.allow(10.0)
+    breaker.record(False, probe, now=10.5)
+    assert breaker.state == CLOSED and breaker.trips == 0
+
+
+def test_failed_probe_doubles_ejection():
+    breaker = CircuitBreaker(SETTINGS)
+    breaker.trip("test", now=0.0)
+    assert breaker.allow(10.0)
+    breaker.record(True, breaker.on_start(), now=10.0)
+    assert breaker.state == OPEN
+    assert breaker.open_until == pytest.approx(30.0)
+
+
+def test_error_rate_trips_without_consecutive_run():
+    breaker = CircuitBreaker(SETTINGS)
+    for i in range(11):
+        breaker.record(i % 2 == 0, now=float(i))
+    assert breaker.state == OPEN
+
+
+def test_disabled_breaker_never_opens():
+    breaker = CircuitBreaker()
+    for _ in range(100):
+        breaker.record(True, now=0.0)
+    assert breaker.state == CLOSED and breaker.allow(0.0)
+
+
+def test_ejected_replica_is_skipped_and_all_ejected_fails_fast():
+    replicas = ReplicaSet("m", ENDPOINTS, breaker=SETTINGS)
+    a, b = replicas.replicas
+    a.breaker.trip("test")
+    assert all(replicas.pick().url == "http://b" for _ in range(10))
+    b.breaker.trip("test")
+    with pytest.raises(ReplicaUnavailable) as exc:
+        replicas.pick()
+    assert 0 < exc.value.retry_after <= 10
+
+
+def test_lease_records_outcome():
+    replicas = ReplicaSet("m", ENDPOINTS[:1], breaker=SETTINGS)
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            with replicas.lease():
+                raise ConnectionError("reset")
+    assert replicas.replicas[0].breaker.state == OPEN
+
+
+def test_slow_outlier_is_ejected():
+    endpoints = ENDPOINTS + [{"url": "http://c", "weight": 1.0}]
+    replicas = ReplicaSet("m", endpoints, breaker=SETTINGS)
+    a, b, c = replicas.replicas
+    a.observe(0.1)
+    b.observe(0.2)
+    c.observe(5.0)
+    replicas.eject_outliers(0.0)
+    assert c.breaker.state == OPEN
+    assert a.breaker.state == b.breaker.state == CLOSED
@@ -0,0 +1,20 @@
+# tests/unit/server_cache/conftest.py
+
+import pytest
+import llm_wrapper.server.cache as cache_mod
+from llm_wrapper.server.models import ChatCompletionResponse
+
+def make_response(content="ok", rid="id"):
+    return ChatCompletionResponse(
+        id=rid,
+        created=1,
+        model="p",
+        choices=[{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        usage={"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+    )
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    cache_mod.response_cache.clear()
+    yield
+    cache_mod.response_cache.clear()
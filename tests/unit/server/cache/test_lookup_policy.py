@@ -0,0 +1,40 @@
+# tests/unit/server_cache/test_lookup_policy.py
+
+import llm_wrapper.server.cache as cache_mod
+from llm_wrapper.server.cache import lookup_response, store_response
+from llm_wrapper.server.context import RequestContext, _current_context
+from unit.server.cache.conftest import make_response
+
+PAYLOAD = {"model": "p", "messages": [{"role": "user", "content": "hi"}]}
+
+def test_disabled_models_skip_the_cache(monkeypatch):
+    monkeypatch.setattr(cache_mod, "RESPONSE_CACHE_ENABLED", True)
+    lookup = lookup_response("m", PAYLOAD, {"cache": {"enabled": False}})
+    assert lookup.key is None and lookup.response is None
+
+def test_global_default_applies_when_model_is_silent(monkeypatch):
+    monkeypatch.setattr(cache_mod, "RESPONSE_CACHE_ENABLED", True)
+    lookup = lookup_response("m", PAYLOAD, {})
+    assert lookup.key is not None
+    assert lookup.ttl == cache_mod.RESPONSE_CACHE_TTL
+
+def test_store_then_hit():
+    config = {"cache": {"enabled": True, "ttl": 30}}
+    miss = lookup_response("m", PAYLOAD, config)
+    assert miss.response is None
+    store_response(miss, make_response("cached"))
+    hit = lookup_response("m", PAYLOAD, config)
+    assert hit.response.choices[0].message.content == "cached"
+
+def test_bypass_headers_skip_reads():
+    config = {"cache": {"enabled": True, "ttl": 30}}
+    store_response(lookup_response("m", PAYLOAD, config), make_response("cached"))
+
+    token = _current_context.set(RequestContext(cache_read=False, cache_write=True))
+    try:
+        refresh = lookup_response("m", PAYLOAD, config)
+        assert refresh.response is None and refresh.key is not None
+        _current_context.set(RequestContext(cache_read=False, cache_write=False))
+        assert lookup_response("m", PAYLOAD, config).key is None
+    finally:
+        _current_context.reset(token)
@@ -0,0 +1,13 @@
+# tests/unit/server_cache/test_payload_key.py
+
+from llm_wrapper.server.cache import payload_key
+
+def test_key_ignores_ordering_and_stream_flag():
+    a = {"model": "p", "messages": [{"role": "user", "content": "hi"}], "temperature": 0.5, "stream": False}
+    b = {"stream": True, "temperature": 0.5, "messages": [{"content": "hi", "role": "user"}], "model": "p"}
+    assert payload_key("m", a) == payload_key("m", b)
+
+def test_key_depends_on_model_and_params():
+    payload = {"model": "p", "messages": [], "temperature": 0.5}
+    assert payload_key("m", payload) != payload_key("other", payload)
+    assert payload_key("m", payload) != payload_key("m", {**payload, "temperature": 0.6})
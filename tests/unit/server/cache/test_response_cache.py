@@ -0,0 +1,38 @@
+# tests/unit/server_cache/test_response_cache.py
+
+import llm_wrapper.server.cache as cache_mod
+from llm_wrapper.server.cache import ResponseCache
+from unit.server.cache.conftest import make_response
+
+def test_lru_evicts_by_entry_count():
+    cache = ResponseCache(max_entries=2, max_bytes=10_000)
+    cache.put("a", make_response("a"), ttl=60)
+    cache.put("b", make_response("b"), ttl=60)
+    assert cache.get("a") is not None  # "a" becomes most recently used
+    cache.put("c", make_response("c"), ttl=60)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+def test_lru_evicts_by_bytes():
+    size = len(make_response("x").model_dump_json())
+    cache = ResponseCache(max_entries=10, max_bytes=size * 2)
+    for key in ("a", "b", "c"):
+        cache.put(key, make_response("x"), ttl=60)
+    assert len(cache) == 2
+    assert cache.total_bytes == size * 2
+    assert cache.get("a") is None
+
+def test_oversized_entries_are_not_cached():
+    cache = ResponseCache(max_entries=10, max_bytes=10)
+    cache.put("a", make_response(), ttl=60)
+    assert len(cache) == 0
+
+def test_expired_entries_are_dropped(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache_mod.time, "monotonic", lambda: now[0])
+    cache = ResponseCache(max_entries=10, max_bytes=10_000)
+    cache.put("a", make_response(), ttl=5)
+    assert cache.get("a") is not None
+    now[0] = 106.0
+    assert cache.get("a") is None
+    assert cache.total_bytes == 0
@@ -0,0 +1,64 @@
+# tests/unit/server_coalesce/test_completion_coalescer.py
+
+import asyncio
+import pytest
+from llm_wrapper.server.coalesce import CompletionCoalescer
+
+@pytest.mark.asyncio
+async def test_identical_calls_share_one_upstream_call():
+    coalescer = CompletionCoalescer()
+    calls = []
+    release = asyncio.Event()
+
+    async def upstream():
+        calls.append(1)
+        await release.wait()
+        return {"ok": True}
+
+    waiters = [asyncio.ensure_future(coalescer.do("k", upstream)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters)
+    assert calls == [1]
+    assert all(r is results[0] for r in results)
+    assert len(coalescer) == 0
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_and_flight_is_forgotten():
+    coalescer = CompletionCoalescer()
+
+    async def failing():
+        await asyncio.sleep(0)
+        raise RuntimeError("boom")
+
+    waiters = [asyncio.ensure_future(coalescer.do("k", failing)) for _ in range(2)]
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert len(coalescer) == 0
+
+@pytest.mark.asyncio
+async def test_shared_call_survives_until_last_waiter_leaves():
+    coalescer = CompletionCoalescer()
+    started = asyncio.Event()
+    cancelled = []
+
+    async def slow():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+
+    first = asyncio.ensure_future(coalescer.do("k", slow))
+    second = asyncio.ensure_future(coalescer.do("k", slow))
+    await started.wait()
+
+    first.cancel()
+    await asyncio.sleep(0)
+    assert cancelled == []
+
+    second.cancel()
+    await asyncio.gather(first, second, return_exceptions=True)
+    await asyncio.sleep(0)
+    assert cancelled == [1]
@@ -0,0 +1,60 @@
+# tests/unit/server_coalesce/test_stream_coalescer.py
+
+import asyncio
+import pytest
+from llm_wrapper.server.coalesce import StreamCoalescer
+
+@pytest.mark.asyncio
+async def test_late_subscribers_replay_emitted_chunks():
+    coalescer = StreamCoalescer()
+    calls = []
+    gate = asyncio.Event()
+
+    async def upstream():
+        calls.append(1)
+        yield "a"
+        yield "b"
+        await gate.wait()
+        yield "c"
+
+    first = coalescer.subscribe("k", upstream)
+    assert await first.__anext__() == "a"
+    assert await first.__anext__() == "b"
+
+    async def collect(stream):
+        return [chunk async for chunk in stream]
+
+    late = asyncio.ensure_future(collect(coalescer.subscribe("k", upstream)))
+    rest = asyncio.ensure_future(collect(first))
+    await asyncio.sleep(0)
+    gate.set()
+
+    assert await late == ["a", "b", "c"]
+    assert await rest == ["c"]
+    assert calls == [1]
+    assert len(coalescer) == 0
+
+@pytest.mark.asyncio
+async def test_source_errors_reach_every_subscriber():
+    coalescer = StreamCoalescer()
+
+    async def failing():
+        yield "a"
+        raise RuntimeError("upstream gone")
+
+    with pytest.raises(RuntimeError):
+        async for _ in coalescer.subscribe("k", failing):
+            pass
+
+@pytest.mark.asyncio
+async def test_finished_stream_is_not_joined():
+    coalescer = StreamCoalescer()
+    calls = []
+
+    async def upstream():
+        calls.append(1)
+        yield "a"
+
+    assert [c async for c in coalescer.subscribe("k", upstream)] == ["a"]
+    assert [c async for c in coalescer.subscribe("k", upstream)] == ["a"]
+    assert calls == [1, 1]
@@ -0,0 +1,29 @@
+# tests/unit/server/codec/test_check_completion.py
+
+import pytest
+from llm_wrapper.server.codec import check_completion, dumps, loads
+
+VALID = {
+    "id": "id",
+    "created": 1,
+    "model": "p",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "ok"}}],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+}
+
+
+def test_valid_completion_passes():
+    check_completion(loads(dumps(VALID)))
+
+
+@pytest.mark.parametrize("broken", [
+    [],
+    {**VALID, "id": None},
+    {**VALID, "created": True},
+    {**VALID, "choices": [{"index": 0}]},
+    {**VALID, "choices": [{"index": "0", "message": {"role": "assistant"}}]},
+    {**VALID, "usage": {"prompt_tokens": 1}},
+])
+def test_structural_problems_raise(broken):
+    with pytest.raises(ValueError):
+        check_completion(broken)
@@ -0,0 +1,65 @@
+# tests/unit/server/codec/test_decode_chat_request.py
+
+import warnings
+
+import pytest
+from llm_wrapper.server.codec import decode_chat_request, dumps
+from llm_wrapper.server.models import ChatCompletionRequest
+
+REQUEST = {
+    "model": "m",
+    "messages": [
+        {"role": "system", "content": "sys"},
+        {"role": "user", "content": "hi", "name": "alice"},
+        {"role": "assistant", "content": None, "tool_calls": [
+            {"id": "call_1", "type": "function", "function": {"name": "f", "arguments": "{}"}}
+        ]},
+        {"role": "user", "content": "again"},
+    ],
+    "tools": [{"type": "function", "function": {"name": "f", "parameters": {"type": "object"}}}],
+    "logit_bias": {"50256": -100},
+    "temperature": 1,
+    "max_tokens": 64,
+    "stream": True,
+    "user": "u",
+}
+
+
+def test_matches_validated_request():
+    fast = decode_chat_request(dumps(REQUEST))
+    validated = ChatCompletionRequest(**REQUEST)
+    passthrough = {"tools", "logit_bias"}
+    assert fast.model_dump(exclude=passthrough) == validated.model_dump(exclude=passthrough)
+    assert [m.model_dump(exclude_none=True) for m in fast.messages] == \
+        [m.model_dump(exclude_none=True) for m in validated.messages]
+    # Pass-through fields stay as decoded JSON, off the typed fields
+    assert fast._passthrough == {"tools": REQUEST["tools"], "logit_bias": REQUEST["logit_bias"]}
+    assert fast.tools is None and fast.logit_bias is None
+
+
+def test_serializes_without_warnings():
+    fast = decode_chat_request(dumps(REQUEST))
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        fast.model_dump()
+        fast.model_dump_json()
+
+
+@pytest.mark.parametrize("broken", [
+    {"messages": []},
+    {"model": "m"},
+    {"model": "m", "messages": [{"content": "no role"}]},
+    {"model": "m", "messages": [{"role": "user", "content": ["parts"]}]},
+    {"model": "m", "messages": [], "temperature": "hot"},
+    {"model": "m", "messages": [], "max_tokens": 1.5},
+    {"model": "m", "messages": [], "stream": "maybe"},
+    {"model": "m", "messages": [], "functions": [{"name": "f"}], "tools": [{"function": {"name": "f"}}]},
+])
+def test_rejects_bad_fields(broken):
+    with pytest.raises(ValueError):
+        decode_chat_request(dumps(broken))
+
+
+def test_rejects_invalid_json():
+    with pytest.raises(ValueError):
+        decode_chat_request(b"{not json")
@@ -0,0 +1,34 @@
+# tests/unit/server_context/test_bind_request_context.py
+
+import pytest
+from starlette.requests import Request
+from llm_wrapper.server.context import bind_request_context, get_request_context
+
+def make_request(headers):
+    scope = {
+        "type": "http",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+    }
+    return Request(scope)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("headers, expected", [
+    ({}, (True, True)),
+    ({"Cache-Control": "no-cache"}, (False, True)),
+    ({"Cache-Control": "max-age=0, no-store"}, (False, False)),
+    ({"X-Cache-Bypass": "true"}, (False, False)),
+])
+async def test_cache_flags_from_headers(headers, expected):
+    context = await bind_request_context(make_request(headers))
+    assert (context.cache_read, context.cache_write) == expected
+    assert get_request_context() is context
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("headers, expected", [
+    ({}, None),
+    ({"Authorization": "Bearer sk-1"}, "sk-1"),
+    ({"Authorization": "Basic abc"}, None),
+])
+async def test_api_key_from_bearer_token(headers, expected):
+    context = await bind_request_context(make_request(headers))
+    assert context.api_key == expected
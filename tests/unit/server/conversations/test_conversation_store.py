@@ -0,0 +1,143 @@
+# tests/unit/server_conversations/test_conversation_store.py
+
+import pytest
+from fastapi import HTTPException
+import llm_wrapper.server.api as api
+import llm_wrapper.server.conversations as conversations_mod
+from llm_wrapper.server.context import RequestContext, _current_context
+from llm_wrapper.server.conversations import ConversationStore, ReplyCollector
+from llm_wrapper.server.models import ChatCompletionRequest, Message
+from unit.server.api.dummy_responses import DummyResponse200
+from unit.server.streaming.dummy_session import DummySession
+
+CONFIG = {"api": {"url": "http://x"}, "model": {"path": "p"}, "parameters": {}, "system_prompt": "sp"}
+# Store key of conversation "c1" for callers without an API key or user
+C1 = ("anonymous", "c1")
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = ConversationStore(ttl=60, max_bytes=10_000)
+    monkeypatch.setattr(conversations_mod, "conversations", store)
+    return store
+
+
+def turn(content: str, conversation_id: str = "c1") -> ChatCompletionRequest:
+    return ChatCompletionRequest(model="m", messages=[Message(role="user", content=content)], conversation_id=conversation_id)
+
+
+def test_history_round_trips_and_unknown_ids_are_empty(store):
+    store.append("c1", [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"}])
+    assert store.history("c1") == [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"}]
+    assert store.history("other") == []
+
+
+def test_expired_conversations_are_dropped(store, monkeypatch):
+    store.append("c1", [{"role": "user", "content": "hi"}])
+    now = conversations_mod.time.monotonic()
+    monkeypatch.setattr(conversations_mod.time, "monotonic", lambda: now + 61)
+    assert store.history("c1") == []
+    assert len(store) == 0 and store.total_bytes == 0
+
+
+def test_byte_bound_evicts_least_recently_used_and_trims_long_conversations():
+    store = ConversationStore(ttl=60, max_bytes=100)
+    message = {"role": "user", "content": "x" * 20}  # 39 bytes encoded
+    store.append("a", [message])
+    store.append("b", [message])
+    store.history("a")
+    store.append("c", [message])
+    assert store.history("b") == []
+    assert store.history("a") == [message]
+
+    store.append("a", [{"role": "user", "content": "y" * 20}, {"role": "user", "content": "z" * 20}])
+    assert [m["content"][0] for m in store.history("a")] == ["y", "z"]
+    assert store.total_bytes <= 100
+
+
+def test_payload_carries_full_history_after_system_prompt(store):
+    store.append(C1, [{"role": "user", "content": "first"}, {"role": "assistant", "content": "one"}])
+    payload = api.build_upstream_payload(turn("second"), CONFIG)
+    assert payload["messages"] == [
+        {"role": "system", "content": "sp"},
+        {"role": "user", "content": "first"},
+        {"role": "assistant", "content": "one"},
+        {"role": "user", "content": "second"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_call_completion_records_the_turn(store, monkeypatch):
+    sent = []
+
+    class RecordingSession:
+        async def __aenter__(self): return self
+        async def __aexit__(self, exc_type, exc, tb): pass
+        def post(self, url, headers=None, json=None):
+            sent.append(json["messages"])
+            return DummyResponse200({
+                "id": "id", "object": "chat.completion", "created": 1, "model": "p",
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": f"reply {len(sent)}"}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+            })
+
+    monkeypatch.setattr(api, "get_config_or_raise", lambda model: CONFIG)
+    monkeypatch.setattr(api.aiohttp, "ClientSession", RecordingSession)
+
+    await api.call_completion(turn("first"), "sp")
+    await api.call_completion(turn("second"), "sp")
+    assert [m["content"] for m in sent[1]] == ["sp", "first", "reply 1", "second"]
+    assert store.history(C1)[-1] == {"role": "assistant", "content": "reply 2"}
+
+
+@pytest.mark.asyncio
+async def test_finished_stream_records_the_streamed_reply(store, monkeypatch):
+    async def lines():
+        yield b'data: {"choices": [{"index": 0, "delta": {"content": "streamed"}}]}'
+        yield b"data: [DONE]"
+
+    class StreamResponse:
+        status = 200
+        content = lines()
+        async def __aenter__(self): return self
+        async def __aexit__(self, exc_type, exc, tb): pass
+
+    monkeypatch.setattr(api, "get_config_or_raise", lambda model: CONFIG)
+    monkeypatch.setattr(api.aiohttp, "ClientSession", lambda: DummySession(StreamResponse()))
+
+    request = turn("hi")
+    request.stream = True
+    [event async for event in api.stream_completion(request, "sp")]
+    assert store.history(C1) == [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "streamed"}]
+
+
+def test_conversation_ids_are_scoped_to_the_api_key(store):
+    token = _current_context.set(RequestContext(api_key="tenant-a"))
+    try:
+        store.append(conversations_mod.conversation_key(turn("x")), [{"role": "user", "content": "secret"}])
+        assert api.build_upstream_payload(turn("mine"), CONFIG)["messages"][1]["content"] == "secret"
+    finally:
+        _current_context.reset(token)
+
+    token = _current_context.set(RequestContext(api_key="tenant-b"))
+    try:
+        payload = api.build_upstream_payload(turn("guess"), CONFIG)
+    finally:
+        _current_context.reset(token)
+    assert [m["content"] for m in payload["messages"]] == ["sp", "guess"]
+
+
+def test_conversation_id_is_refused_with_several_workers(store, monkeypatch):
+    monkeypatch.setattr(conversations_mod, "WORKERS", 2)
+    with pytest.raises(HTTPException) as exc:
+        api.build_upstream_payload(turn("hi"), CONFIG)
+    assert exc.value.status_code == 400
+    assert exc.value.detail["param"] == "conversation_id"
+
+
+def test_reply_collector_joins_content_deltas():
+    reply = ReplyCollector()
+    reply.observe('data: {"choices": [{"index": 0, "delta": {"role": "assistant"}}]}\n\n')
+    reply.observe(b'data: {"choices":[{"index":0,"delta":{"content":"Hel"}}]}\n\ndata: {"choices":[{"index":0,"delta":{"content":"lo"}}]}\n\n')
+    reply.observe("data: [DONE]\n\n")
+    assert reply.message() == {"role": "assistant", "content": "Hello"}
@@ -0,0 +1,25 @@
+# tests/unit/server_deps/test_get_fast_chat_request.py
+
+import pytest
+from fastapi import HTTPException
+import llm_wrapper.server.deps as deps_mod
+
+
+class DummyRequest:
+    def __init__(self, body): self._body = body
+    async def body(self): return self._body
+
+
+@pytest.mark.asyncio
+async def test_get_fast_chat_request_decodes_body():
+    result = await deps_mod.get_fast_chat_request(DummyRequest(b'{"model": "m", "messages": [{"role": "user", "content": "hi"}]}'))
+    assert result.model == "m"
+    assert result.messages[0].content == "hi"
+
+
+@pytest.mark.asyncio
+async def test_get_fast_chat_request_rejects_invalid_body():
+    with pytest.raises(HTTPException) as exc:
+        await deps_mod.get_fast_chat_request(DummyRequest(b'{"model": "m"}'))
+    assert exc.value.status_code == 422
+    assert exc.value.detail["type"] == "invalid_request_error"
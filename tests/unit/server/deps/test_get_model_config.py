@@ -0,0 +1,26 @@
+# tests/unit/server_deps/test_get_model_config.py
+
+from fastapi.testclient import TestClient
+import llm_wrapper.server.deps as deps_mod
+import llm_wrapper.server.main as main_mod
+
+def test_config_is_looked_up_once_per_request(monkeypatch):
+    lookups = []
+
+    def lookup(model):
+        lookups.append(model)
+        return {"system_prompt": "sp", "api": {"url": "http://x"}}
+
+    async def fake_call(req, prompt, config):
+        assert prompt == "sp" and config["system_prompt"] == "sp"
+        return {"ok": True}
+
+    monkeypatch.setattr(deps_mod, "get_config_or_raise", lookup)
+    monkeypatch.setattr(main_mod, "call_completion", fake_call)
+    main_mod.app.dependency_overrides.clear()
+
+    response = TestClient(main_mod.app).post(
+        "/v1/chat/completions", json={"model": "m", "messages": [{"role": "user", "content": "hi"}]}
+    )
+    assert response.status_code == 200
+    assert lookups == ["m"]
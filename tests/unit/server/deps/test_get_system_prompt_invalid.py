@@ -10,4 +10,4 @@ async def test_get_system_prompt_invalid(monkeypatch, dummy_request):
         raise HTTPException(status_code=404, detail="not found")
     monkeypatch.setattr(deps_mod, "get_config_or_raise", raise_exc)
     with pytest.raises(HTTPException):
-        await deps_mod.get_system_prompt(dummy_request)
\ No newline at end of file
+        await deps_mod.get_model_config(dummy_request)
\ No newline at end of file
@@ -7,5 +7,6 @@ import llm_wrapper.server.deps as deps_mod
 async def test_get_system_prompt_valid(monkeypatch, dummy_request):
     expected_prompt = "custom prompt"
     monkeypatch.setattr(deps_mod, "get_config_or_raise", lambda model: {"system_prompt": expected_prompt})
-    result = await deps_mod.get_system_prompt(dummy_request)
+    config = await deps_mod.get_model_config(dummy_request)
+    result = await deps_mod.get_system_prompt(config)
     assert result == expected_prompt
\ No newline at end of file
@@ -0,0 +1,94 @@
+# tests/unit/server_hedging/test_hedger.py
+
+import asyncio
+import pytest
+from llm_wrapper.server.balancer import balancer
+from llm_wrapper.server.hedging import Hedger, LatencyWindow, MIN_SAMPLES
+
+
+def hedged_config(**hedging):
+    return {
+        "api": {"endpoints": [{"url": "http://slow"}, {"url": "http://fast"}]},
+        "hedging": {"enabled": True, **hedging},
+    }
+
+
+async def slow_first(lease):
+    if lease.url == "http://slow":
+        await asyncio.sleep(5)
+    return lease.url
+
+
+@pytest.mark.asyncio
+async def test_slow_request_is_hedged_and_hedge_wins(monkeypatch):
+    hedger = Hedger()
+    replica_set = balancer.replica_set("hedge-win", hedged_config()["api"])
+    # Make the original go to the slow replica
+    monkeypatch.setattr(replica_set, "pick", lambda exclude=(), key=None: replica_set.replicas[0])
+
+    result = await hedger.call("hedge-win", hedged_config(delay=0.01, budget=1.0), slow_first)
+
+    assert result == "http://fast"
+    # The cancelled original releases its replica on the next loop iteration
+    await asyncio.sleep(0)
+    assert all(r.in_flight == 0 for r in replica_set.replicas)
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_without_budget(monkeypatch):
+    hedger = Hedger()
+    replica_set = balancer.replica_set("hedge-budget", hedged_config()["api"])
+    monkeypatch.setattr(replica_set, "pick", lambda exclude=(), key=None: replica_set.replicas[0])
+
+    async def attempt(lease):
+        await asyncio.sleep(0.05)
+        return lease.url
+
+    result = await hedger.call("hedge-budget", hedged_config(delay=0.01, budget=0.0), attempt)
+    assert result == "http://slow"
+
+
+@pytest.mark.asyncio
+async def test_stream_hedge_relays_only_the_winner(monkeypatch):
+    hedger = Hedger()
+    replica_set = balancer.replica_set("hedge-stream", hedged_config()["api"])
+    monkeypatch.setattr(replica_set, "pick", lambda exclude=(), key=None: replica_set.replicas[0])
+    closed = []
+
+    async def open_stream(lease):
+        try:
+            if lease.url == "http://slow":
+                await asyncio.sleep(5)
+            for i in range(3):
+                yield f"{lease.url}/{i}"
+        finally:
+            closed.append(lease.url)
+
+    events = [e async for e in hedger.stream("hedge-stream", hedged_config(delay=0.01, budget=1.0), open_stream)]
+
+    assert events == ["http://fast/0", "http://fast/1", "http://fast/2"]
+    await asyncio.sleep(0)
+    assert sorted(closed) == ["http://fast", "http://slow"]
+    assert all(r.in_flight == 0 for r in replica_set.replicas)
+
+
+@pytest.mark.asyncio
+async def test_failures_are_not_hedged():
+    hedger = Hedger()
+
+    async def attempt(lease):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await hedger.call("hedge-fail", hedged_config(delay=1.0, budget=1.0), attempt)
+
+
+def test_p95_waits_for_enough_samples():
+    window = LatencyWindow()
+    for i in range(MIN_SAMPLES - 1):
+        window.add(0.1)
+    assert window.p95() is None
+    for i in range(100):
+        window.add(1.0 if i % 20 == 0 else 0.1)
+    assert window.p95() == pytest.approx(0.1)
+    assert Hedger().delay("m", "completion", {"delay": 0.2, "min_delay": 0.5}) == 0.5
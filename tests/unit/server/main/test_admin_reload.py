@@ -0,0 +1,50 @@
+# tests/unit/server_main/test_admin_reload.py
+
+import pytest
+from fastapi import HTTPException
+import llm_wrapper.server.deps as deps_mod
+import llm_wrapper.server.main as main_mod
+
+
+@pytest.mark.asyncio
+async def test_admin_reload_reports_models(monkeypatch):
+    async def fake_reload():
+        return {"b": {}, "a": {}}
+
+    monkeypatch.setattr(main_mod, "reload_configs", fake_reload)
+    result = await main_mod.admin_reload_configs()
+    assert result["models"] == ["a", "b"]
+    assert "reloads" in result and "errors" in result
+
+
+@pytest.mark.asyncio
+async def test_admin_token_required_when_configured(monkeypatch):
+    monkeypatch.setattr(deps_mod, "ADMIN_TOKEN", "secret")
+    with pytest.raises(HTTPException) as exc:
+        await deps_mod.require_admin("Bearer wrong")
+    assert exc.value.status_code == 401
+    await deps_mod.require_admin("Bearer secret")
+
+
+@pytest.mark.asyncio
+async def test_admin_reload_signals_other_workers(monkeypatch):
+    async def fake_reload():
+        return {"a": {}}
+
+    signalled = []
+
+    async def fake_signal():
+        signalled.append(True)
+        return True
+
+    monkeypatch.setattr(main_mod, "reload_configs", fake_reload)
+    monkeypatch.setattr(main_mod, "signal_config_reload", fake_signal)
+    monkeypatch.setattr(main_mod, "WORKERS", 2)
+    result = await main_mod.admin_reload_configs()
+    assert signalled and result["other_workers"] == "reload_pending"
+
+    async def cannot_signal():
+        return False
+
+    monkeypatch.setattr(main_mod, "signal_config_reload", cannot_signal)
+    assert (await main_mod.admin_reload_configs())["other_workers"] == "not_reloaded"
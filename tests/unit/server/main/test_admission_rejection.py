@@ -0,0 +1,61 @@
+# tests/unit/server_main/test_admission_rejection.py
+
+import json
+import pytest
+from fastapi import HTTPException
+from llm_wrapper.server.models import ChatCompletionRequest
+import llm_wrapper.server.main as main_mod
+
+@pytest.mark.asyncio
+async def test_streaming_request_rejected_before_stream_starts(monkeypatch):
+    request = ChatCompletionRequest(model="busy", messages=[{"role": "user", "content": "hi"}], stream=True)
+
+    def reject(model_id, config):
+        raise HTTPException(status_code=429, detail={"message": "busy"}, headers={"Retry-After": "3"})
+
+    monkeypatch.setattr(main_mod.admission, "check", reject)
+    with pytest.raises(HTTPException) as exc:
+        await main_mod.chat_completion(request, "sys", {"api": {"url": "http://x"}, "model": {"path": "m"}})
+    assert exc.value.status_code == 429
+
+@pytest.mark.asyncio
+async def test_error_handler_keeps_headers_and_error_type():
+    exc = HTTPException(
+        status_code=429,
+        detail={"message": "busy", "type": "server_overloaded"},
+        headers={"Retry-After": "3"}
+    )
+    response = await main_mod.openai_style_error(None, exc)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "3"
+    assert json.loads(response.body.decode())["error"]["type"] == "server_overloaded"
+
+@pytest.mark.asyncio
+async def test_streaming_request_rate_limited_before_stream_starts(monkeypatch):
+    request = ChatCompletionRequest(model="m", messages=[{"role": "user", "content": "hi"}], stream=True, user="u")
+    config = {"api": {"url": "http://x"}, "model": {"path": "m"}, "rate_limits": {"requests_per_minute": 1, "key": "user"}}
+
+    monkeypatch.setattr(main_mod, "rate_limiter", main_mod.rate_limiter.__class__(100, 10))
+    await main_mod.chat_completion(request, "sys", config)
+    with pytest.raises(HTTPException) as exc:
+        await main_mod.chat_completion(request, "sys", config)
+    assert exc.value.status_code == 429
+    assert exc.value.detail["code"] == "rate_limit_exceeded"
+
+@pytest.mark.asyncio
+async def test_streaming_conversation_refused_with_several_workers_before_stream_starts(monkeypatch):
+    import llm_wrapper.server.conversations as conversations_mod
+
+    request = ChatCompletionRequest(
+        model="m", messages=[{"role": "user", "content": "hi"}], stream=True, conversation_id="c1"
+    )
+
+    def fake_stream(req, prompt, config, payload):
+        raise AssertionError("the stream must not start")
+
+    monkeypatch.setattr(conversations_mod, "WORKERS", 2)
+    monkeypatch.setattr(main_mod, "stream_completion", fake_stream)
+    with pytest.raises(HTTPException) as exc:
+        await main_mod.chat_completion(request, "sys", {"api": {"url": "http://x"}, "model": {"path": "m"}})
+    assert exc.value.status_code == 400
+    assert exc.value.detail["param"] == "conversation_id"
@@ -9,12 +9,15 @@ import llm_wrapper.server.main as main_mod
 async def test_chat_completion_non_streaming(monkeypatch, sample_request):
     prompt = "sys"
 
-    async def fake_call(req, prompt):
+    config = {"api": {"url": "http://x"}}
+
+    async def fake_call(req, prompt, cfg):
         assert req is sample_request
+        assert cfg is config
         return {"ok": True}
 
     monkeypatch.setattr(main_mod, "call_completion", fake_call)
-    result = await main_mod.chat_completion(sample_request, prompt)
+    result = await main_mod.chat_completion(sample_request, prompt, config)
     assert result == {"ok": True}
 
 @pytest.mark.asyncio
@@ -26,13 +29,13 @@ async def test_chat_completion_streaming(monkeypatch):
     )
     prompt = "sys"
 
-    async def fake_stream(req, prompt):
+    async def fake_stream(req, prompt, config, payload):
         assert req is request
         yield b"chunk1"
         yield b"chunk2"
 
     monkeypatch.setattr(main_mod, "stream_completion", fake_stream)
-    result = await main_mod.chat_completion(request, prompt)
+    result = await main_mod.chat_completion(request, prompt, {"api": {"url": "http://x"}, "model": {"path": "m"}})
 
     assert isinstance(result, StreamingResponse)
     assert result.media_type == "text/event-stream"
@@ -4,6 +4,7 @@ import llm_wrapper.server.main as main_mod
 
 def test_run_server_calls_uvicorn(monkeypatch):
     called = {}
+    monkeypatch.setattr(main_mod, "WORKERS", 1)
     monkeypatch.setattr(main_mod.uvicorn, "run", lambda app, host, port: called.update({"host": host, "port": port}))
     main_mod.run_server()
     assert called["host"] == "0.0.0.0"
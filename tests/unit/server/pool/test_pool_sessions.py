@@ -0,0 +1,63 @@
+# tests/unit/server_pool/test_pool_sessions.py
+
+import pytest
+import llm_wrapper.server.pool as pool_mod
+from llm_wrapper.server.pool import PoolSettings, UpstreamPool, pool_lifespan, upstream_session
+
+SETTINGS = PoolSettings(limit=10, limit_per_host=5, keepalive_timeout=30, ttl_dns_cache=60)
+
+@pytest.mark.asyncio
+async def test_sessions_are_reused_per_origin():
+    pool = UpstreamPool()
+    try:
+        first = pool.session("http://host-a:8000/v1/chat/completions", SETTINGS, 60)
+        second = pool.session("http://host-a:8000/v1/other", SETTINGS, 60)
+        other_host = pool.session("http://host-b:8000/v1/chat/completions", SETTINGS, 60)
+        assert first is second
+        assert first is not other_host
+    finally:
+        await pool.close()
+
+@pytest.mark.asyncio
+async def test_timeouts_share_one_connector():
+    pool = UpstreamPool()
+    try:
+        short = pool.session("http://host-a:8000/x", SETTINGS, 60)
+        long = pool.session("http://host-a:8000/x", SETTINGS, 300)
+        assert short is not long
+        assert short.connector is long.connector
+        assert short.connector.limit == 10
+        assert short.connector.limit_per_host == 5
+    finally:
+        await pool.close()
+
+@pytest.mark.asyncio
+async def test_stats_report_per_origin():
+    pool = UpstreamPool()
+    try:
+        pool.session("http://host-a:8000/x", SETTINGS, 60)
+        assert pool.stats() == {"http://host-a:8000": {"in_use": 0, "idle": 0, "waiting": 0}}
+    finally:
+        await pool.close()
+    assert pool.stats() == {}
+
+@pytest.mark.asyncio
+async def test_upstream_session_uses_active_pool():
+    async with pool_lifespan() as pool:
+        assert pool_mod.get_pool() is pool
+        async with upstream_session("http://host-a:8000/x", {"url": "http://host-a:8000/x"}, 60) as session:
+            assert session is pool.session("http://host-a:8000/x", PoolSettings.from_api_config({}), 60)
+    assert pool_mod.get_pool() is None
+
+@pytest.mark.asyncio
+async def test_upstream_session_falls_back_without_pool(monkeypatch):
+    created = []
+
+    class DummySession:
+        async def __aenter__(self): return self
+        async def __aexit__(self, exc_type, exc, tb): created.append("closed")
+
+    monkeypatch.setattr(pool_mod.aiohttp, "ClientSession", lambda **kwargs: DummySession())
+    async with upstream_session("http://x", {"url": "http://x"}, 60) as session:
+        assert isinstance(session, DummySession)
+    assert created == ["closed"]
@@ -0,0 +1,20 @@
+# tests/unit/server_pool/test_pool_settings.py
+
+from llm_wrapper.server.pool import PoolSettings
+from llm_wrapper.server import config
+
+def test_settings_default_to_env_values():
+    settings = PoolSettings.from_api_config({"url": "http://x"})
+    assert settings.limit == config.UPSTREAM_POOL_LIMIT
+    assert settings.limit_per_host == config.UPSTREAM_POOL_LIMIT_PER_HOST
+    assert settings.keepalive_timeout == config.UPSTREAM_KEEPALIVE_TIMEOUT
+    assert settings.ttl_dns_cache == config.UPSTREAM_DNS_CACHE_TTL
+
+def test_settings_apply_model_overrides():
+    settings = PoolSettings.from_api_config({
+        "url": "http://x",
+        "pool": {"limit": 8, "limit_per_host": 4, "keepalive_timeout": None}
+    })
+    assert settings.limit == 8
+    assert settings.limit_per_host == 4
+    assert settings.keepalive_timeout == config.UPSTREAM_KEEPALIVE_TIMEOUT
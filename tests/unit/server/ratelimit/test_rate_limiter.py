@@ -0,0 +1,105 @@
+# tests/unit/server_ratelimit/test_rate_limiter.py
+
+import pytest
+from fastapi import HTTPException
+import llm_wrapper.server.api as api
+import llm_wrapper.server.main as main_mod
+import llm_wrapper.server.ratelimit as ratelimit_mod
+from llm_wrapper.server.context import RequestContext, _current_context
+from llm_wrapper.server.models import ChatCompletionRequest
+from llm_wrapper.server.ratelimit import RateLimiter, estimate_tokens
+
+
+def request(content: str = "hi", user: str | None = None, max_tokens: int | None = None) -> ChatCompletionRequest:
+    return ChatCompletionRequest(
+        model="m", messages=[{"role": "user", "content": content}], user=user, max_tokens=max_tokens
+    )
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ratelimit_mod.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def api_key():
+    token = _current_context.set(RequestContext(api_key="sk-tenant"))
+    yield
+    _current_context.reset(token)
+
+
+def test_requests_per_minute_returns_openai_429_with_reset_headers(clock, api_key):
+    limiter = RateLimiter(max_tenants=100, max_labels=10)
+    config = {"rate_limits": {"requests_per_minute": 2}}
+    limiter.check("m", config, request())
+    limiter.check("m", config, request())
+    with pytest.raises(HTTPException) as exc:
+        limiter.check("m", config, request())
+
+    assert exc.value.status_code == 429
+    assert exc.value.detail["code"] == "rate_limit_exceeded"
+    assert exc.value.detail["type"] == "requests"
+    assert exc.value.headers["Retry-After"] == "30"
+    assert exc.value.headers["x-ratelimit-limit-requests"] == "2"
+    assert exc.value.headers["x-ratelimit-remaining-requests"] == "0"
+    assert exc.value.headers["x-ratelimit-reset-requests"] == "1m0s"
+
+    clock[0] += 30
+    limiter.check("m", config, request())
+
+
+def test_tokens_per_minute_uses_estimated_prompt_and_max_tokens(clock, api_key):
+    limiter = RateLimiter(max_tenants=100, max_labels=10)
+    config = {"rate_limits": {"tokens_per_minute": 100}}
+    assert estimate_tokens(request("x" * 40, max_tokens=50)) == 60
+    limiter.check("m", config, request("x" * 40, max_tokens=50))
+    with pytest.raises(HTTPException) as exc:
+        limiter.check("m", config, request("x" * 40, max_tokens=50))
+    assert exc.value.detail["type"] == "tokens"
+    assert "x-ratelimit-limit-requests" not in exc.value.headers
+
+
+def test_tenants_are_limited_separately_by_user_when_configured(clock):
+    limiter = RateLimiter(max_tenants=100, max_labels=10)
+    config = {"rate_limits": {"requests_per_minute": 1, "key": "user"}}
+    limiter.check("m", config, request(user="alice"))
+    limiter.check("m", config, request(user="bob"))
+    with pytest.raises(HTTPException):
+        limiter.check("m", config, request(user="alice"))
+    # Other models have their own buckets
+    limiter.check("other", config, request(user="alice"))
+
+
+def test_metric_labels_and_tenants_are_bounded(clock):
+    limiter = RateLimiter(max_tenants=2, max_labels=1)
+    config = {"rate_limits": {"requests_per_minute": 1, "key": "user"}}
+    for user in ("a", "b", "c"):
+        limiter.check("m", config, request(user=user))
+    assert len(limiter) == 2
+    assert limiter.label("user:a") == "user:a"
+    assert limiter.label("user:b") == "other"
+
+
+def test_models_without_limits_are_not_tracked(clock):
+    limiter = RateLimiter(max_tenants=100, max_labels=10)
+    for _ in range(5):
+        limiter.check("m", {}, request())
+    assert len(limiter) == 0
+
+
+@pytest.mark.asyncio
+async def test_invalid_requests_are_not_charged(monkeypatch):
+    limiter = RateLimiter(max_tenants=100, max_labels=10)
+    monkeypatch.setattr(api, "rate_limiter", limiter)
+    monkeypatch.setattr(main_mod, "rate_limiter", limiter)
+    config = {"api": {"url": "http://x"}, "model": {"path": "m"}, "rate_limits": {"requests_per_minute": 1}}
+    system_only = ChatCompletionRequest(model="m", messages=[{"role": "system", "content": "sys"}])
+
+    for stream in (False, True):
+        system_only.stream = stream
+        with pytest.raises(HTTPException) as exc:
+            await main_mod.chat_completion(system_only, "sys", config)
+        assert exc.value.status_code == 400
+    assert len(limiter) == 0
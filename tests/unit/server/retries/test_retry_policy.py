@@ -0,0 +1,85 @@
+# tests/unit/server_retries/test_retry_policy.py
+
+import aiohttp
+import pytest
+from fastapi import HTTPException
+import llm_wrapper.server.retries as retries_mod
+from llm_wrapper.server.context import RequestContext, _current_context
+from llm_wrapper.server.retries import RetryBudget, RetryPolicy, retry_reason, with_retries
+
+CONFIG = {"retries": {"max_attempts": 3, "backoff": 0.001, "max_backoff": 0.002}}
+
+
+@pytest.fixture(autouse=True)
+def fresh_budget(monkeypatch):
+    monkeypatch.setattr(retries_mod, "retry_budget", RetryBudget(0.2, 0.0))
+
+
+def test_retry_reason_classification():
+    assert retry_reason(HTTPException(status_code=503)) == "status_503"
+    assert retry_reason(HTTPException(status_code=429)) == "status_429"
+    assert retry_reason(HTTPException(status_code=400)) is None
+    assert retry_reason(HTTPException(status_code=500)) is None
+    assert retry_reason(aiohttp.ClientConnectionError("reset")) == "connection"
+    assert retry_reason(ValueError("bad json")) is None
+
+
+@pytest.mark.asyncio
+async def test_retries_until_success_and_tracks_tried_replicas():
+    seen = []
+
+    async def call(tried):
+        seen.append(set(tried))
+        tried.add(f"http://r{len(seen)}")
+        if len(seen) < 3:
+            raise HTTPException(status_code=503)
+        return "ok"
+
+    assert await with_retries("m", CONFIG, call) == "ok"
+    assert seen == [set(), {"http://r1"}, {"http://r1", "http://r2"}]
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_attempts():
+    calls = []
+
+    async def call(tried):
+        calls.append(1)
+        raise aiohttp.ClientConnectionError("reset")
+
+    with pytest.raises(aiohttp.ClientConnectionError):
+        await with_retries("m", CONFIG, call)
+    assert len(calls) == 3
+
+
+def test_budget_limits_retries(monkeypatch):
+    monkeypatch.setattr(retries_mod, "retry_budget", RetryBudget(0.0, 0.0))
+    retries_mod.retry_budget.tokens = 1.0
+    assert RetryPolicy("m", CONFIG).delay(HTTPException(status_code=503)) is not None
+    assert RetryPolicy("m", CONFIG).delay(HTTPException(status_code=503)) is None
+
+
+def test_deadline_and_retry_after_are_respected():
+    token = _current_context.set(RequestContext(timeout=1.0))
+    try:
+        policy = RetryPolicy("m", CONFIG)
+        assert policy.delay(HTTPException(status_code=429, headers={"Retry-After": "0.5"})) == 0.5
+        assert policy.delay(HTTPException(status_code=429, headers={"Retry-After": "5"})) is None
+    finally:
+        _current_context.reset(token)
+
+
+@pytest.mark.asyncio
+async def test_backoff_uses_the_given_sleep():
+    sleeps = []
+
+    async def call(tried):
+        if not sleeps:
+            raise HTTPException(status_code=429, headers={"Retry-After": "7"})
+        return "ok"
+
+    async def sleep(delay):
+        sleeps.append(delay)
+
+    assert await with_retries("m", CONFIG, call, sleep) == "ok"
+    assert sleeps == [7.0]
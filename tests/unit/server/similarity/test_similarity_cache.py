@@ -0,0 +1,82 @@
+# tests/unit/server_similarity/test_similarity_cache.py
+
+import pytest
+import llm_wrapper.server.cache as cache_mod
+import llm_wrapper.server.similarity as similarity_mod
+from llm_wrapper.server.models import ChatCompletionResponse
+from llm_wrapper.server.similarity import SimilarityCache, SimilarKey, simhash
+
+PROMPT = "Explain the difference between OSPF and BGP routing protocols in two sentences please"
+
+
+def completion(content):
+    return ChatCompletionResponse(
+        id="id", created=1, model="p",
+        choices=[{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        usage={"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+    )
+
+
+def key(text, scope="s", max_distance=6, shadow=False, ttl=60.0):
+    return SimilarKey("m", scope, simhash(text), ttl, max_distance, shadow)
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(similarity_mod, "np", None)
+    return request.param
+
+
+def test_fingerprint_ignores_case_whitespace_and_punctuation(backend):
+    assert simhash(PROMPT) == simhash("  explain the DIFFERENCE between ospf and bgp routing protocols, in two sentences please! ")
+    assert bin(simhash(PROMPT) ^ simhash("What is the capital of France?")).count("1") > 6
+
+
+def test_near_duplicate_hits_and_unrelated_misses(backend):
+    cache = SimilarityCache(100, 1_000_000)
+    cache.put(key(PROMPT), completion("answer"), 100)
+    assert cache.lookup(key(PROMPT.upper() + "!!")).choices[0].message.content == "answer"
+    assert cache.lookup(key("What is the capital of France?")) is None
+    # Other scopes (system prompt, parameters) never match
+    assert cache.lookup(key(PROMPT, scope="other")) is None
+
+
+def test_shadow_mode_only_reports(backend):
+    cache = SimilarityCache(100, 1_000_000)
+    cache.put(key(PROMPT), completion("answer"), 100)
+    assert cache.lookup(key(PROMPT, shadow=True)) is None
+
+
+def test_bounds_and_expiry(backend):
+    cache = SimilarityCache(2, 1_000_000)
+    for i, text in enumerate(["first prompt about routing", "second prompt about switching", "third prompt about firewalls"]):
+        cache.put(key(text), completion(str(i)), 100)
+    assert len(cache) == 2
+    assert cache.lookup(key("first prompt about routing", max_distance=0)) is None
+
+    cache.put(key("expired prompt text", ttl=-1), completion("x"), 100)
+    assert len(cache) == 2
+    cache.put(key("short lived prompt", ttl=1e-9), completion("x"), 100)
+    assert cache.lookup(key("short lived prompt", max_distance=0)) is None
+    assert len(cache) == 1
+
+
+def test_lookup_response_falls_back_to_similarity(monkeypatch):
+    monkeypatch.setattr(similarity_mod, "similarity_cache", SimilarityCache(100, 1_000_000))
+    monkeypatch.setattr(cache_mod, "similarity_cache", similarity_mod.similarity_cache)
+    config = {"cache": {"enabled": False, "similarity": {"enabled": True, "threshold": 0.9}}}
+
+    def payload(text):
+        return {"model": "p", "messages": [{"role": "system", "content": "sp"}, {"role": "user", "content": text}]}
+
+    miss = cache_mod.lookup_response("m", payload(PROMPT), config)
+    assert miss.response is None and miss.key is None
+    cache_mod.store_response(miss, completion("answer"))
+
+    hit = cache_mod.lookup_response("m", payload(PROMPT.lower()), config)
+    assert hit.response.choices[0].message.content == "answer"
+    other_system = {**payload(PROMPT), "messages": [{"role": "system", "content": "other"}, {"role": "user", "content": PROMPT}]}
+    assert cache_mod.lookup_response("m", other_system, config).response is None
@@ -0,0 +1,18 @@
+# tests/unit/server_sse/conftest.py
+
+import pytest
+
+class ChunkedContent:
+    """Mimics aiohttp's StreamReader.iter_any() with arbitrary chunk boundaries."""
+    def __init__(self, chunks): self._chunks = chunks
+    def iter_any(self): return self._iterate()
+    async def _iterate(self):
+        for chunk in self._chunks:
+            yield chunk
+
+async def collect(agen):
+    return [item async for item in agen]
+
+@pytest.fixture
+def chunked():
+    return ChunkedContent
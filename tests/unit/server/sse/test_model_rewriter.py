@@ -0,0 +1,15 @@
+# tests/unit/server_sse/test_model_rewriter.py
+
+from llm_wrapper.server.sse import ModelRewriter
+
+def test_rewrites_model_field_with_any_spacing():
+    rewrite = ModelRewriter("/models/llama", "expert")
+    assert rewrite(b'{"id":"x","model":"/models/llama","choices":[]}') == b'{"id":"x","model": "expert","choices":[]}'
+    assert rewrite(b'{"model" : "/models/llama"}') == b'{"model": "expert"}'
+
+def test_leaves_other_payloads_untouched():
+    rewrite = ModelRewriter("/models/llama", "expert")
+    payload = b'{"model":"other","content":"/models/llama"}'
+    assert rewrite(payload) == payload
+    no_model = b'{"choices":[]}'
+    assert rewrite(no_model) is no_model
@@ -0,0 +1,33 @@
+# tests/unit/server_sse/test_relay_passthrough.py
+
+import pytest
+from llm_wrapper.server.sse import relay_passthrough
+from unit.server.sse.conftest import collect
+
+@pytest.mark.asyncio
+async def test_payloads_forwarded_unchanged(chunked):
+    content = chunked([b'data: {"a":1}\n\ndata: {"b": 2}\n\n', b'data: [DONE]\n\n'])
+    out = await collect(relay_passthrough(content))
+    assert b"".join(out) == b'data: {"a":1}\n\ndata: {"b": 2}\n\n'
+
+@pytest.mark.asyncio
+async def test_events_split_across_reads(chunked):
+    content = chunked([b'data: {"a"', b':1}\r\n\r', b'\n: keep-alive\n\nda', b'ta: {"b":2}\n\n'])
+    out = await collect(relay_passthrough(content))
+    assert out == [b'data: {"a":1}\n\n', b'data: {"b":2}\n\n']
+
+@pytest.mark.asyncio
+async def test_stops_at_done_and_flushes_trailing_line(chunked):
+    out = await collect(relay_passthrough(chunked([b'data: {"a":1}\n', b'data: [DONE]\n', b'data: {"late":1}\n'])))
+    assert out == [b'data: {"a":1}\n\n']
+
+    out = await collect(relay_passthrough(chunked([b'data: {"tail":1}'])))
+    assert out == [b'data: {"tail":1}\n\n']
+
+@pytest.mark.asyncio
+async def test_plain_line_iterables_are_supported():
+    async def lines():
+        yield b'data: {"k": "v"}\n'
+        yield b'data: [DONE]\n'
+    out = await collect(relay_passthrough(lines()))
+    assert out == [b'data: {"k": "v"}\n\n']
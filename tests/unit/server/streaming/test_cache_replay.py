@@ -0,0 +1,37 @@
+# tests/unit/server_streaming/test_cache_replay.py
+
+import json
+import pytest
+import llm_wrapper.server.api as api
+import llm_wrapper.server.cache as cache_mod
+from llm_wrapper.server.api import stream_completion
+from llm_wrapper.server.models import ChatCompletionResponse
+
+@pytest.mark.asyncio
+async def test_stream_completion_replays_cached_completion(monkeypatch, stream_request):
+    def fail_session(*args, **kwargs):
+        raise AssertionError("upstream should not be called on a cache hit")
+
+    monkeypatch.setattr(api, "get_config_or_raise", lambda model: {
+        "api": {"url": "http://x"},
+        "model": {"path": "p"},
+        "cache": {"enabled": True, "ttl": 30},
+    })
+    monkeypatch.setattr(api.aiohttp, "ClientSession", fail_session)
+    monkeypatch.setattr(cache_mod, "response_cache", cache_mod.ResponseCache(10, 100_000))
+
+    cached = ChatCompletionResponse(
+        id="id", created=1, model="p",
+        choices=[{"index": 0, "message": {"role": "assistant", "content": "Pong"}, "finish_reason": "stop"}],
+        usage={"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+    )
+    lookup = cache_mod.lookup_response("m", {"dummy": True}, {"cache": {"enabled": True, "ttl": 30}})
+    cache_mod.store_response(lookup, cached)
+
+    parts = [chunk async for chunk in stream_completion(stream_request)]
+    events = [json.loads(p[6:]) for p in parts[:-1]]
+    assert events[0]["choices"][0]["delta"] == {"role": "assistant"}
+    assert events[1]["choices"][0]["delta"] == {"content": "Pong"}
+    assert events[2]["choices"][0]["finish_reason"] == "stop"
+    assert len({e["id"] for e in events}) == 1
+    assert parts[-1].strip() == "data: [DONE]"
@@ -0,0 +1,30 @@
+# tests/unit/server_streaming/test_passthrough.py
+
+import pytest
+from llm_wrapper.server.api import stream_completion
+import llm_wrapper.server.api as api
+from unit.server.streaming.dummy_session import DummySession
+
+@pytest.mark.asyncio
+async def test_stream_completion_passthrough(monkeypatch, stream_request):
+    class DummyStreamResponse:
+        status = 200
+        def __init__(self, chunks):
+            async def iterate():
+                for chunk in chunks:
+                    yield chunk
+            self.content = type("Content", (), {"iter_any": lambda _: iterate()})()
+        async def __aenter__(self): return self
+        async def __aexit__(self, exc_type, exc, tb): pass
+
+    monkeypatch.setattr(api, "get_config_or_raise", lambda model: {
+        "api": {"url": "http://x"},
+        "model": {"path": "p"},
+        "streaming": {"passthrough": True, "rewrite_model": True},
+    })
+    chunks = [b'data: {"model":"p","choices":[]}\n\n', b'data: [DONE]\n\n']
+    monkeypatch.setattr(api.aiohttp, "ClientSession", lambda: DummySession(DummyStreamResponse(chunks)))
+
+    parts = [chunk async for chunk in stream_completion(stream_request)]
+    assert parts[1] == b'data: {"model": "m","choices":[]}\n\n'
+    assert parts[-1].strip() == "data: [DONE]"
@@ -0,0 +1,44 @@
+# tests/unit/server_streaming/test_retry.py
+
+import pytest
+import llm_wrapper.server.api as api
+from llm_wrapper.server.api import stream_completion
+from unit.server.streaming.dummy_session import DummySession
+
+
+class AsyncIter:
+    def __init__(self, lines): self._it = iter(lines)
+    def __aiter__(self): return self
+    async def __anext__(self):
+        try: return next(self._it)
+        except StopIteration: raise StopAsyncIteration
+
+
+class DummyStreamResponse:
+    def __init__(self, status, lines=()):
+        self.status = status
+        self.headers = {}
+        self.content = AsyncIter(lines)
+    async def text(self): return "unavailable"
+    async def __aenter__(self): return self
+    async def __aexit__(self, exc_type, exc, tb): pass
+
+
+@pytest.mark.asyncio
+async def test_stream_is_retried_before_the_first_event(monkeypatch, stream_request):
+    monkeypatch.setattr(api, "get_config_or_raise", lambda model: {
+        "api": {"url": "http://x"},
+        "model": {"path": "p"},
+        "retries": {"max_attempts": 2, "backoff": 0.001},
+    })
+    responses = iter([
+        DummyStreamResponse(503),
+        DummyStreamResponse(200, [b'data: {"k": "v"}\n', b'data: [DONE]\n']),
+    ])
+    monkeypatch.setattr(api.aiohttp, "ClientSession", lambda: DummySession(next(responses)))
+
+    parts = [chunk async for chunk in stream_completion(stream_request)]
+
+    assert not any("unavailable" in p for p in parts)
+    assert any('"k"' in p for p in parts)
+    assert parts[-1].strip() == "data: [DONE]"
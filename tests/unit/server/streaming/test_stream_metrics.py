@@ -0,0 +1,107 @@
+# tests/unit/server_streaming/test_stream_metrics.py
+
+import pytest
+import llm_wrapper.server.api as api
+from llm_wrapper.server.api import stream_completion
+from llm_wrapper.server.stream_metrics import StreamRecorder
+from unit.server.streaming.dummy_session import DummySession
+
+
+class AsyncIter:
+    def __init__(self, lines): self._it = iter(lines)
+    def __aiter__(self): return self
+    async def __anext__(self):
+        try: return next(self._it)
+        except StopIteration: raise StopAsyncIteration
+
+
+class DummyStreamResponse:
+    def __init__(self, status, lines):
+        self.status = status
+        self.content = AsyncIter(lines)
+    async def text(self): return "boom"
+    async def __aenter__(self): return self
+    async def __aexit__(self, exc_type, exc, tb): pass
+
+
+@pytest.fixture
+def recorders(monkeypatch):
+    created = []
+
+    class CapturingRecorder(StreamRecorder):
+        def __init__(self, model_id):
+            super().__init__(model_id)
+            self.finished = False
+            created.append(self)
+
+        def finish(self):
+            self.finished = True
+            super().finish()
+
+    monkeypatch.setattr(api, "StreamRecorder", CapturingRecorder)
+    return created
+
+
+def use_upstream(monkeypatch, status, lines):
+    monkeypatch.setattr(api.aiohttp, "ClientSession", lambda: DummySession(DummyStreamResponse(status, lines)))
+
+
+@pytest.mark.asyncio
+async def test_finished_stream_counts_upstream_events(monkeypatch, stream_request, recorders):
+    lines = [b'data: {"a": 1}\n', b'data: {"b": 2}\n', b'data: {"c": 3}\n', b'data: [DONE]\n']
+    use_upstream(monkeypatch, 200, lines)
+
+    [chunk async for chunk in stream_completion(stream_request)]
+
+    (recorder,) = recorders
+    assert recorder.finished
+    assert recorder.outcome == "finished"
+    assert recorder.tokens == 3
+    assert recorder.replica == "http://x"
+
+
+@pytest.mark.asyncio
+async def test_upstream_error_outcome(monkeypatch, stream_request, recorders):
+    use_upstream(monkeypatch, 500, [])
+
+    [chunk async for chunk in stream_completion(stream_request)]
+
+    assert recorders[0].outcome == "upstream_error"
+    assert recorders[0].tokens == 0
+
+
+@pytest.mark.asyncio
+async def test_client_disconnect_outcome(monkeypatch, stream_request, recorders):
+    lines = [b'data: {"a": 1}\n', b'data: {"b": 2}\n', b'data: [DONE]\n']
+    use_upstream(monkeypatch, 200, lines)
+
+    stream = stream_completion(stream_request)
+    await stream.__anext__()
+    await stream.__anext__()
+    await stream.aclose()
+
+    assert recorders[0].finished
+    assert recorders[0].outcome == "client_disconnected"
+
+
+def test_passthrough_chunks_count_each_event():
+    recorder = StreamRecorder("m")
+    recorder.observe(b'data: {"a": 1}\n\ndata: {"b": 2}\n\n')
+    recorder.observe(b'data: {"c": 3}\n\ndata: [DONE]\n\n')
+    assert recorder.tokens == 3
+    assert recorder.outcome == "finished"
+
+
+def test_passthrough_error_events_are_upstream_errors():
+    recorder = StreamRecorder("m")
+    recorder.observe(b'data: {"a": 1}\n\ndata: {"error":{"message":"overloaded"}}\n\n')
+    assert recorder.outcome == "upstream_error"
+    assert recorder.tokens == 1
+
+    recorder = StreamRecorder("m")
+    recorder.observe(b'data: { "error" : "boom"}\n\n')
+    assert recorder.outcome == "upstream_error" and recorder.tokens == 0
+
+    recorder = StreamRecorder("m")
+    recorder.observe(b'data: {"choices":[{"delta":{"content":"\\"error\\""}}]}\n\n')
+    assert recorder.outcome == "finished" and recorder.tokens == 1
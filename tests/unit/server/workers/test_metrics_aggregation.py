@@ -0,0 +1,49 @@
+# tests/unit/server/workers/test_metrics_aggregation.py
+
+from prometheus_client import CollectorRegistry, generate_latest
+from llm_wrapper.server.workers import WorkerMetricsCollector
+
+def worker_metrics(requests: float, in_flight: float, fast: float, slow: float) -> str:
+    return (
+        '# HELP requests_total Requests\n# TYPE requests_total counter\n'
+        f'requests_total{{route="/a"}} {requests}\n'
+        '# HELP requests_created Requests\n# TYPE requests_created gauge\nrequests_created{route="/a"} 1.7e9\n'
+        '# HELP in_flight In flight\n# TYPE in_flight gauge\n'
+        f'in_flight {in_flight}\n'
+        '# HELP latency_seconds Latency\n# TYPE latency_seconds histogram\n'
+        f'latency_seconds_bucket{{le="0.1"}} {fast}\nlatency_seconds_bucket{{le="+Inf"}} {fast + slow}\n'
+        f'latency_seconds_count {fast + slow}\nlatency_seconds_sum {fast * 0.05 + slow}\n'
+    )
+
+
+WORKER_METRICS = {
+    9001: worker_metrics(3, 1, 2, 1),
+    9002: worker_metrics(4, 2, 1, 0),
+}
+
+
+def test_counters_and_histograms_are_summed_gauges_keep_the_worker(tmp_path, monkeypatch):
+    (tmp_path / "worker-0.port").write_text("9001")
+    (tmp_path / "worker-1.port").write_text("9002")
+    (tmp_path / "worker-2.port").write_text("9003")  # gone: scrape fails
+    collector = WorkerMetricsCollector(str(tmp_path))
+
+    def fake_scrape(port):
+        if port not in WORKER_METRICS:
+            raise ConnectionRefusedError(port)
+        return WORKER_METRICS[port]
+
+    monkeypatch.setattr(collector, "_scrape", fake_scrape)
+    registry = CollectorRegistry(auto_describe=False)
+    registry.register(collector)
+    text = generate_latest(registry).decode()
+
+    assert text.count("# TYPE requests_total counter") == 1
+    assert 'requests_total{route="/a"} 7.0' in text
+    assert "requests_created" not in text
+    assert 'latency_seconds_bucket{le="0.1"} 3.0' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 4.0' in text
+    assert "latency_seconds_count 4.0" in text
+    assert 'in_flight{worker="0"} 1.0' in text
+    assert 'in_flight{worker="1"} 2.0' in text
+    assert 'worker="' not in "".join(line for line in text.splitlines() if not line.startswith("in_flight"))
@@ -0,0 +1,19 @@
+# tests/unit/server/workers/test_reuseport_socket.py
+
+import socket
+import pytest
+from llm_wrapper.server.workers import _reuseport_socket
+
+
+@pytest.mark.skipif(not hasattr(socket, "SO_REUSEPORT"), reason="SO_REUSEPORT not supported")
+def test_workers_can_bind_the_same_port():
+    first = _reuseport_socket("127.0.0.1", 0)
+    port = first.getsockname()[1]
+    second = _reuseport_socket("127.0.0.1", port)
+    try:
+        first.listen()
+        second.listen()
+        assert second.getsockname()[1] == port
+    finally:
+        first.close()
+        second.close()